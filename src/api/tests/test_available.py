@@ -3,19 +3,23 @@
 import json
 
 from django.contrib.auth import get_user_model
-from django.test import RequestFactory
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, override_settings
 
-from ..views import available, check_domain_available
+from ..throttle import AvailabilityThrottle, client_id
+from ..views import AVAILABLE_BATCH_MAX_DOMAINS, available, available_batch, check_domain_available
 from .common import less_console_noise
 from registrar.tests.common import MockEppLib
 from registrar.utility.errors import GenericError, GenericErrorCodes
-from unittest.mock import call
+from unittest.mock import MagicMock, call, patch
 
 from epplibwrapper import (
     commands,
+    responses,
 )
 
 API_BASE_PATH = "/api/v1/available/?domain="
+API_BATCH_PATH = "/api/v1/available/batch"
 
 
 class AvailableViewTest(MockEppLib):
@@ -120,6 +124,47 @@ class AvailableViewTest(MockEppLib):
             json.loads(error_domain_response.content)["message"],
         )
 
+    def test_unavailable_domain_suggestions(self):
+        """Asking for suggestions about a taken domain lists available variants, checked in one command"""
+
+        def side_effect(_request, cleaned):
+            return MagicMock(
+                res_data=[
+                    responses.check.CheckDomainResultData(
+                        name=name, avail=name not in ["fort-bend-co.gov", "ftbendco.gov"], reason=None
+                    )
+                    for name in _request.names
+                ],
+            )
+
+        request = self.factory.get(API_BASE_PATH + "gsa&suggest=true")
+        request.user = self.user
+        response_object = json.loads(available(request).content)
+        self.assertEqual(response_object["code"], "unavailable")
+        # gsa has no variants
+        self.assertEqual(response_object["suggestions"], [])
+
+        request = self.factory.get(API_BASE_PATH + "gsa&suggest=false")
+        request.user = self.user
+        self.assertNotIn("suggestions", json.loads(available(request).content))
+
+        self.mockedSendFunction.reset_mock()
+        self.mockedSendFunction.side_effect = side_effect
+        # the name asked about is taken, so it counts as unavailable
+        request = self.factory.get(API_BASE_PATH + "fort-bend-co&suggest=true&state=TX")
+        request.user = self.user
+        response_object = json.loads(available(request).content)
+        self.assertEqual(
+            response_object["suggestions"],
+            ["fortbendco.gov", "ft-bend-co.gov", "fort-bend-cotx.gov", "fort-bend-co-tx.gov", "fortbendcotx.gov"],
+        )
+        # one check of the name asked about, and one of all its variants
+        self.assertEqual(self.mockedSendFunction.call_count, 2)
+
+        request = self.factory.get(API_BASE_PATH + "igorville&suggest=true")
+        request.user = self.user
+        self.assertNotIn("suggestions", json.loads(available(request).content))
+
 
 class AvailableAPITest(MockEppLib):
     """Test that the API can be called as expected."""
@@ -143,3 +188,146 @@ class AvailableAPITest(MockEppLib):
         with less_console_noise():
             response = self.client.post(API_BASE_PATH + "nonsense")
         self.assertEqual(response.status_code, 405)
+
+
+class AvailableBatchViewTest(MockEppLib):
+    """Test that the batch view function checks domains together."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create(username="username")
+        self.factory = RequestFactory()
+
+    def get(self, domains):
+        request = self.factory.get(API_BATCH_PATH, {"domain": domains})
+        request.user = self.user
+        return available_batch(request)
+
+    def test_domains_checked_together(self):
+        """Valid domains are checked in one command, and each domain given gets a result"""
+
+        def side_effect(_request, cleaned):
+            return MagicMock(
+                res_data=[
+                    responses.check.CheckDomainResultData(name=name, avail=name != "gsa.gov", reason=None)
+                    for name in _request.names
+                ],
+            )
+
+        self.mockedSendFunction.side_effect = side_effect
+        response = self.get(["GSA", "igorville.gov", "blah!;", "", "city.sub"])
+
+        self.mockedSendFunction.assert_called_once_with(
+            commands.CheckDomain(["gsa.gov", "igorville.gov"]), cleaned=True
+        )
+        results = json.loads(response.content)["domains"]
+        self.assertEqual([result["domain"] for result in results], ["GSA", "igorville.gov", "blah!;", "", "city.sub"])
+        self.assertEqual(
+            [result["code"] for result in results], ["unavailable", "success", "invalid", "required", "extra_dots"]
+        )
+        self.assertEqual([result["available"] for result in results], [False, True, False, False, False])
+
+    def test_error_handling(self):
+        """Error thrown while checking domains returns error for the valid ones, without checking them again"""
+        with less_console_noise():
+            response = self.get(["errordomain.gov", "igorville.gov", "blah!;"])
+        self.mockedSendFunction.assert_called_once()
+        results = json.loads(response.content)["domains"]
+        self.assertEqual([result["code"] for result in results], ["error", "error", "invalid"])
+
+    def test_too_many_domains(self):
+        """Asking about too many domains at once is refused without contacting the registry"""
+        response = self.get([f"city{i}" for i in range(AVAILABLE_BATCH_MAX_DOMAINS + 1)])
+        self.assertEqual(response.status_code, 400)
+        self.mockedSendFunction.assert_not_called()
+
+
+class AvailabilityThrottleTest(MockEppLib):
+    """Test that clients are limited in how fast they check availability."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create(username="username")
+        self.factory = RequestFactory()
+        patcher = patch("api.views.availability_throttle", AvailabilityThrottle())
+        self.throttle = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, domain, user=None, field="id_requested_domain"):
+        request = self.factory.get(API_BASE_PATH + domain + "&field=" + field)
+        request.user = user or self.user
+        return available(request)
+
+    @override_settings(AVAILABILITY_RATE_LIMIT=1, AVAILABILITY_RATE_BURST=2, AVAILABILITY_MAX_WAIT=0)
+    def test_checks_over_the_limit_are_refused(self):
+        """Each client may check up to the burst at once, then is refused without contacting the registry"""
+        with less_console_noise():
+            self.assertEqual(self.get("igorville").status_code, 200)
+            self.assertEqual(self.get("igorville").status_code, 200)
+            response = self.get("igorville")
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(json.loads(response.content)["code"], "limited")
+            self.assertEqual(self.mockedSendFunction.call_count, 2)
+
+            # another client has its own bucket
+            other = get_user_model().objects.create(username="other")
+            self.assertEqual(self.get("igorville", user=other).status_code, 200)
+
+    @override_settings(AVAILABILITY_RATE_LIMIT=1, AVAILABILITY_RATE_BURST=1, AVAILABILITY_MAX_WAIT=5)
+    def test_waiting_check_is_superseded(self):
+        """A check waiting for a token is dropped when a newer check for the same field comes in"""
+        self.assertEqual(self.get("gsa").status_code, 200)
+
+        responses = []
+
+        def type_again(_seconds):
+            """While the second check waits, the user types again; that check waits behind it"""
+            if not responses:
+                responses.append(None)
+                responses[0] = self.get("igorville")
+
+        with patch("api.throttle.time.sleep", side_effect=type_again):
+            first = self.get("igorvil")
+
+        self.assertEqual(first.status_code, 409)
+        self.assertEqual(json.loads(first.content)["code"], "superseded")
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(self.mockedSendFunction.call_count, 2)
+
+    @override_settings(AVAILABILITY_RATE_LIMIT=1, AVAILABILITY_RATE_BURST=1, AVAILABILITY_MAX_WAIT=5)
+    def test_checks_without_a_field_are_not_superseded(self):
+        """Checks which don't name a field each wait their turn, rather than superseding one another"""
+        self.assertEqual(self.get("gsa", field="").status_code, 200)
+
+        responses = []
+
+        def check_again(_seconds):
+            if not responses:
+                responses.append(None)
+                responses[0] = self.get("igorville", field="")
+
+        with patch("api.throttle.time.sleep", side_effect=check_again):
+            first = self.get("igorvil", field="")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(self.mockedSendFunction.call_count, 3)
+
+    def anonymous_client(self, forwarded):
+        request = self.factory.get(API_BASE_PATH + "igorville", HTTP_X_FORWARDED_FOR=forwarded, REMOTE_ADDR="10.0.0.9")
+        request.user = AnonymousUser()
+        return client_id(request)
+
+    @override_settings(AVAILABILITY_PROXY_HOPS=2)
+    def test_anonymous_clients_are_told_apart_by_address(self):
+        """The client's address is the one the first of the platform's proxies appended,
+        whatever the client itself put in X-Forwarded-For"""
+        # the load balancer appended the client's address, then the router the load balancer's
+        self.assertEqual(self.anonymous_client("203.0.113.5, 10.0.0.1"), "address:203.0.113.5")
+        self.assertEqual(self.anonymous_client("203.0.113.6, 10.0.0.1"), "address:203.0.113.6")
+        self.assertEqual(self.anonymous_client("1.1.1.1, 203.0.113.5, 10.0.0.1"), "address:203.0.113.5")
+        self.assertEqual(self.anonymous_client("203.0.113.5"), "address:203.0.113.5")
+        self.assertEqual(self.anonymous_client(""), "address:10.0.0.9")
+
+        with override_settings(AVAILABILITY_PROXY_HOPS=1):
+            self.assertEqual(self.anonymous_client("203.0.113.5, 10.0.0.1"), "address:10.0.0.1")
@@ -0,0 +1,105 @@
+"""Limit how fast each client can check the availability of domains."""
+
+import time
+from threading import Lock
+
+from cachetools import TTLCache
+from django.conf import settings
+
+
+class AvailabilityThrottle:
+    """
+    A token bucket for each client, holding up to AVAILABILITY_RATE_BURST
+    tokens and refilled with AVAILABILITY_RATE_LIMIT tokens a second. Each
+    registry command an availability check may send costs a token.
+
+    A check made while its client's bucket is empty waits for its tokens, for
+    up to AVAILABILITY_MAX_WAIT seconds; checks which would wait longer are
+    refused. While a check waits, a newer check from the same client for the
+    same field supersedes it, so that only the value last typed is checked.
+    Checks which don't name a field are never superseded.
+
+    Buckets are kept by each process, for clients seen in the last 10 minutes.
+    """
+
+    OK = "ok"
+    LIMITED = "limited"
+    SUPERSEDED = "superseded"
+
+    MAX_CLIENTS = 10000
+
+    def __init__(self):
+        # client -> [tokens, when they were counted]
+        self._buckets: TTLCache = TTLCache(self.MAX_CLIENTS, 600)
+        # (client, field) -> number of the newest check
+        self._latest: TTLCache = TTLCache(self.MAX_CLIENTS, 600)
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.AVAILABILITY_RATE_LIMIT > 0
+
+    def acquire(self, client: str, field: str = "", cost: int = 1) -> str:
+        """Take `cost` tokens from the client's bucket, waiting for them if need be.
+        Returns OK if the check may go ahead, otherwise LIMITED or SUPERSEDED."""
+        if not self.enabled:
+            return self.OK
+        key = (client, field)
+        with self._lock:
+            tokens = self._refill(client)
+            wait = max(0.0, (cost - tokens) / settings.AVAILABILITY_RATE_LIMIT)
+            if wait > settings.AVAILABILITY_MAX_WAIT:
+                return self.LIMITED
+            # take the tokens now, so that later checks wait behind this one
+            self._buckets[client][0] = tokens - cost
+            if field:
+                number = self._latest[key] = self._latest.get(key, 0) + 1
+        if not wait:
+            return self.OK
+
+        time.sleep(wait)
+        if not field:
+            return self.OK
+        with self._lock:
+            if self._latest.get(key) == number:
+                return self.OK
+            # give back the tokens of the check which was superseded
+            if client in self._buckets:
+                self._buckets[client][0] += cost
+        return self.SUPERSEDED
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._latest.clear()
+
+    def _refill(self, client: str) -> float:
+        """Add the tokens earned since the bucket was last counted, returning how many it holds."""
+        now = time.monotonic()
+        tokens, counted = self._buckets.get(client, (settings.AVAILABILITY_RATE_BURST, now))
+        tokens = min(settings.AVAILABILITY_RATE_BURST, tokens + (now - counted) * settings.AVAILABILITY_RATE_LIMIT)
+        # set again, rather than changed in place, so that the client is kept for longer
+        self._buckets[client] = [tokens, now]
+        return tokens
+
+
+availability_throttle = AvailabilityThrottle()
+
+
+def client_id(request) -> str:
+    """Identify the client which made the request: the user, if logged in,
+    otherwise the address which the first of the platform's proxies received
+    it from (see AVAILABILITY_PROXY_HOPS)."""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    forwarded = [entry.strip() for entry in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")]
+    forwarded = [entry for entry in forwarded if entry]
+    hops = max(1, settings.AVAILABILITY_PROXY_HOPS)
+    if not forwarded:
+        address = request.META.get("REMOTE_ADDR", "")
+    elif len(forwarded) < hops:
+        # fewer proxies than expected appended to it, so the first entry is the nearest to the client
+        address = forwarded[0]
+    else:
+        address = forwarded[-hops]
+    return f"address:{address}"
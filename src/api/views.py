@@ -1,13 +1,17 @@
 """Internal API views"""
 
+import math
+
 from django.apps import apps
+from django.conf import settings
 from django.views.decorators.http import require_http_methods
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.utils.safestring import mark_safe
 
 from registrar.templatetags.url_helpers import public_site_url
 from registrar.utility.enums import ValidationReturnType
 from registrar.utility.errors import GenericError, GenericErrorCodes
+from epplibwrapper.errors import RegistryError
 
 import requests
 
@@ -17,9 +21,14 @@ from cachetools.func import ttl_cache
 
 from registrar.utility.s3_bucket import S3ClientError, S3ClientHelper
 
+from .throttle import AvailabilityThrottle, availability_throttle, client_id
+
 
 DOMAIN_FILE_URL = "https://raw.githubusercontent.com/cisagov/dotgov-data/main/current-full.csv"
 
+# most domains which can be checked in one request to available_batch
+AVAILABLE_BATCH_MAX_DOMAINS = 20
+
 
 DOMAIN_API_MESSAGES = {
     "required": "Enter the .gov domain you want. Don’t include “www” or “.gov.”"
@@ -38,6 +47,8 @@ DOMAIN_API_MESSAGES = {
                but it's not guaranteed. After you complete this form, we’ll \
                evaluate whether your request meets our requirements.",
     "error": GenericError.get_error_message(GenericErrorCodes.CANNOT_CONTACT_REGISTRY),
+    "limited": "You’re checking domains too quickly. Wait a moment, then try again.",
+    "superseded": "A newer check of this domain was made.",
 }
 
 
@@ -81,22 +92,121 @@ def check_domain_available(domain):
         return Domain.available(domain + ".gov")
 
 
+def _throttle(request, cost=1):
+    """Take the tokens for an availability check made by the request (see
+    AvailabilityThrottle). Returns the response to send instead of checking,
+    or None to go ahead."""
+    result = availability_throttle.acquire(client_id(request), request.GET.get("field", ""), cost)
+    if result == AvailabilityThrottle.OK:
+        return None
+    status = 429 if result == AvailabilityThrottle.LIMITED else 409
+    return JsonResponse({"available": False, "code": result, "message": DOMAIN_API_MESSAGES[result]}, status=status)
+
+
 @require_http_methods(["GET"])
 @login_not_required
 def available(request, domain=""):
     """Is a given domain available or not.
 
     Response is a JSON dictionary with the key "available" and value true or
-    false.
+    false. Clients which check too quickly get a 429 response instead, and a
+    check superseded by a newer one for the same `field` gets a 409 response.
+
+    If the `suggest` query parameter is "true" and the domain is unavailable,
+    the key "suggestions" lists some similar domains which are available,
+    adding the abbreviation of the `state` query parameter to some of them.
     """
     Domain = apps.get_model("registrar.Domain")
     domain = request.GET.get("domain", "")
+    suggest = request.GET.get("suggest", "").lower() == "true"
+
+    throttled = _throttle(request, cost=2 if suggest else 1)
+    if throttled is not None:
+        return throttled
 
-    _, json_response = Domain.validate_and_handle_errors(
+    _, result = Domain.validate_and_handle_errors(
         domain=domain,
-        return_type=ValidationReturnType.JSON_RESPONSE,
+        return_type=ValidationReturnType.JSON_DICT,
     )
-    return json_response
+    if suggest and result["code"] == "unavailable":
+        result["suggestions"] = _suggestions(domain, request.GET.get("state"))
+    return JsonResponse(result)
+
+
+def _suggestions(domain, state=None):
+    """Return available domains like the given domain, or none if the registry can't be reached."""
+    Domain = apps.get_model("registrar.Domain")
+    DomainRequest = apps.get_model("registrar.DomainRequest")
+    if state not in DomainRequest.StateTerritoryChoices.values:
+        state = None
+    try:
+        return Domain.suggest_available(f"{Domain._validate_domain_string(domain, blank_ok=False)}.gov", state)
+    except RegistryError:
+        return []
+
+
+def check_domains_available(domains):
+    """Return the availability of each of the given domains, keyed by its full
+    name, lowercased.
+
+    ".gov" is added to the domains which don't end with it. The domains are
+    checked together, in as few registry commands as possible. If the check
+    fails, throws a RegistryError.
+    """
+    Domain = apps.get_model("registrar.Domain")
+    return Domain.available_many([domain if domain.endswith(".gov") else domain + ".gov" for domain in domains])
+
+
+@require_http_methods(["GET"])
+@login_not_required
+def available_batch(request):
+    """Are the given domains available or not.
+
+    Takes up to AVAILABLE_BATCH_MAX_DOMAINS `domain` query parameters. Response
+    is a JSON dictionary with the key "domains": a list of dictionaries, one
+    for each domain in the order given, with the keys "domain", "available",
+    "code" and "message" (see the `available` view).
+    """
+    Domain = apps.get_model("registrar.Domain")
+    domains = request.GET.getlist("domain")
+    if len(domains) > AVAILABLE_BATCH_MAX_DOMAINS:
+        return JsonResponse(
+            {"error": f"Check at most {AVAILABLE_BATCH_MAX_DOMAINS} domains at once."},
+            status=400,
+        )
+
+    # look up every valid domain at once; the invalid ones are reported on below
+    valid = {}
+    for domain in domains:
+        try:
+            valid[domain] = Domain._validate_domain_string(domain, blank_ok=False)
+        except ValueError:
+            continue
+
+    # one token for each registry command the check may send
+    throttled = _throttle(request, cost=math.ceil(len(valid) / max(1, settings.REGISTRY_CHECK_BATCH_SIZE)))
+    if throttled is not None:
+        return throttled
+
+    try:
+        availability = check_domains_available(list(valid.values()))
+    except RegistryError:
+        # the registry couldn't answer, so report an error for every valid
+        # domain rather than asking about each of them again
+        availability = None
+
+    results = []
+    for domain in domains:
+        if availability is None and domain in valid:
+            result = {"available": False, "code": "error", "message": DOMAIN_API_MESSAGES["error"]}
+        else:
+            _, result = Domain.validate_and_handle_errors(
+                domain=domain,
+                return_type=ValidationReturnType.JSON_DICT,
+                availability=availability,
+            )
+        results.append({"domain": domain, **result})
+    return JsonResponse({"domains": results})
 
 
 @require_http_methods(["GET"])
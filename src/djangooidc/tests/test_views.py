@@ -6,6 +6,7 @@ from django.urls import reverse
 
 from api.tests.common import less_console_noise_decorator
 from djangooidc.exceptions import StateMismatch, InternalError
+from .. import views
 from ..views import login_callback
 from registrar.models import User, Contact, VerifiedByStaff, DomainInvitation, TransitionDomain, Domain
 
@@ -112,6 +113,18 @@ class ViewsTest(TestCase):
                     self.assertTemplateUsed(response, "500.html")
                     self.assertIn("Server error", response.content.decode("utf-8"))
 
+    def test_warm_up_initializes_client_only_once(self, mock_client):
+        """Test that warm_up initializes the client when it is None, leaves an
+        initialized client alone and does not raise if initialization fails."""
+        with less_console_noise():
+            with patch("djangooidc.views._initialize_client") as mock_init:
+                views.warm_up()
+                mock_init.assert_not_called()
+                with patch("djangooidc.views.CLIENT", None):
+                    mock_init.side_effect = InternalError
+                    views.warm_up()
+                    mock_init.assert_called_once()
+
     def test_openid_initializes_client_and_calls_create_authn_request(self, mock_client):
         """Test that openid re-initializes the client when the client had not
         been previously initiated."""
@@ -35,15 +35,22 @@ def _client_is_none():
     return CLIENT is None
 
 
-# Initialize CLIENT
-try:
-    _initialize_client()
-except Exception as err:
-    # In the event of an exception, log the error and allow the app load to continue
-    # without the OIDC Client. Subsequent login attempts will attempt to initialize
-    # again if Client is None
-    logger.error(err)
-    logger.error("Unable to configure OpenID Connect provider. Users cannot log in.")
+def warm_up():
+    """Initialize CLIENT ahead of the first login, unless it already is.
+
+    CLIENT is not initialized on import, as that fetches the provider's
+    configuration. Views initialize it on demand, and gunicorn workers call
+    this in the background once they start (see gunicorn.conf.py)."""
+    if not _client_is_none():
+        return
+    try:
+        _initialize_client()
+    except Exception as err:
+        # In the event of an exception, log the error and carry on without the
+        # OIDC Client. Subsequent login attempts will attempt to initialize
+        # again if Client is None
+        logger.error(err)
+        logger.error("Unable to configure OpenID Connect provider. Users cannot log in.")
 
 
 def error_page(request, error):
@@ -181,6 +188,10 @@ def logout(request, next_page=None):
     """Redirect the user to the authentication provider (OP) logout page."""
     try:
         user = request.user
+        # If the CLIENT is none, attempt to reinitialize before handling the request
+        if _client_is_none():
+            logger.debug("OIDC client is None, attempting to initialize")
+            _initialize_client()
         request_args = {
             "client_id": CLIENT.client_id,
         }
@@ -46,6 +46,7 @@ except NameError:
 try:
     from .client import CLIENT, commands
     from .errors import RegistryError, ErrorCode
+    from .pool import Priority
     from epplib.models import common, info
     from epplib.responses import extensions
     from epplib import responses
@@ -60,5 +61,6 @@ __all__ = [
     "responses",
     "info",
     "ErrorCode",
+    "Priority",
     "RegistryError",
 ]
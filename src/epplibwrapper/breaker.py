@@ -0,0 +1,86 @@
+"""Provide a circuit breaker which stops sending commands while the registry is down."""
+
+import logging
+from time import monotonic
+
+from .errors import ErrorCode, LoginError, RegistryError
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the registry cannot be reached.
+
+    The breaker starts closed and lets every command through. After
+    `failure_threshold` commands in a row fail to reach the registry
+    (transport and login errors), it opens: commands fail at once with a
+    TRANSPORT_ERROR instead of each waiting on a connection which will not
+    come. After `reset_timeout` seconds it half opens and lets a single
+    command through as a probe. If the probe reaches the registry the breaker
+    closes, otherwise it opens again.
+
+    A `failure_threshold` of 0 turns the breaker off.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        # when the breaker last opened, or last let a probe through
+        self._changed_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    def before_send(self) -> None:
+        """Raise RegistryError with a TRANSPORT_ERROR code, unless a command may be sent now."""
+        if not self.enabled or self.state == self.CLOSED:
+            return
+        # a probe which never reported back (because its caller was killed,
+        # say) must not keep the breaker half open forever, so let another
+        # one through once the timeout has passed again
+        if monotonic() - self._changed_at >= self.reset_timeout:
+            logger.info("Letting one command through to find out whether the registry is back")
+            self.state = self.HALF_OPEN
+            self._changed_at = monotonic()
+            return
+        raise RegistryError(
+            "Not sending the command, as the registry could not be reached recently.",
+            code=ErrorCode.TRANSPORT_ERROR,
+        )
+
+    def record_success(self) -> None:
+        """Record that a command reached the registry."""
+        if self.state != self.CLOSED:
+            logger.info("Reached the registry again, sending commands as normal")
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """Record that a command could not reach the registry."""
+        self.failures += 1
+        if not self.enabled:
+            return
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.error(
+                    f"Could not reach the registry for {self.failures} commands in a row. "
+                    f"Failing commands for the next {self.reset_timeout} seconds."
+                )
+            self.state = self.OPEN
+            self._changed_at = monotonic()
+
+    def record_error(self, err: RegistryError) -> None:
+        """Record the outcome of a command which raised `err`. A registry which
+        answered with an error code was still reached."""
+        if err.is_transport_error() or isinstance(err, LoginError):
+            self.record_failure()
+        elif err.code is not None:
+            self.record_success()
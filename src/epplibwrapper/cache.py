@@ -0,0 +1,143 @@
+"""Provide a cache of registry info responses shared between requests."""
+
+import logging
+from copy import deepcopy
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Commands whose responses may be cached, and the kind of object they describe
+INFO_COMMANDS = {
+    "InfoDomain": "domain",
+    "InfoContact": "contact",
+    "InfoHost": "host",
+}
+
+# Commands which change an object, and so make its cached info stale
+WRITE_COMMANDS = {
+    "CreateDomain": "domain",
+    "UpdateDomain": "domain",
+    "DeleteDomain": "domain",
+    "RenewDomain": "domain",
+    "CreateContact": "contact",
+    "UpdateContact": "contact",
+    "DeleteContact": "contact",
+    "CreateHost": "host",
+    "UpdateHost": "host",
+    "DeleteHost": "host",
+}
+
+
+class InfoCache:
+    """
+    A read-through cache for InfoDomain, InfoContact and InfoHost responses.
+
+    Entries are keyed by object type and id and expire after `ttl` seconds.
+    `EPPLibWrapper` drops an object's entry whenever it sends a command which
+    changes that object.
+
+    If `alias` names a Django cache, entries are kept there and so are shared
+    by every worker. Otherwise they are kept in this process's memory, which is
+    faster but leaves other workers with stale entries until they expire.
+    A `ttl` of 0 turns the cache off.
+
+    Django caches pickle what they store, so a database cache would keep
+    pickled epplib objects in a shared table, and cost a query for every info
+    command. An alias naming a database cache is ignored in favor of memory.
+    """
+
+    # most entries a process-local cache will hold before evicting the oldest
+    MAX_LOCAL_ENTRIES = 2000
+
+    def __init__(self, ttl=0, alias=None) -> None:
+        self.ttl = ttl
+        self.alias = alias or None
+        if self.alias and self._is_database_cache(self.alias):
+            logger.warning(f"Not caching registry info in the database cache {self.alias}; using memory instead")
+            self.alias = None
+        self._local: dict[str, tuple[float, object]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def _is_database_cache(alias: str) -> bool:
+        backend = settings.CACHES.get(alias, {}).get("BACKEND", "")
+        return backend == "django.core.cache.backends.db.DatabaseCache"
+
+    @staticmethod
+    def key(object_type: str, object_id: str) -> str:
+        """The cache key for an object. Domain and host names are case insensitive."""
+        if object_type in ("domain", "host"):
+            object_id = object_id.lower()
+        return f"epp-info:{object_type}:{object_id}"
+
+    def key_for(self, command, commands=INFO_COMMANDS):
+        """The cache key for the object a command is about, if it is in `commands`."""
+        object_type = commands.get(command.__class__.__name__)
+        if object_type is None:
+            return None
+        object_id = getattr(command, "id" if object_type == "contact" else "name", None)
+        if not isinstance(object_id, str):
+            return None
+        return self.key(object_type, object_id)
+
+    def get(self, command):
+        """Return the cached response to an info command, or None."""
+        if not self.enabled:
+            return None
+        key = self.key_for(command)
+        if key is None:
+            return None
+        try:
+            if self.alias:
+                return caches[self.alias].get(key)
+            expires, response = self._local.get(key, (0.0, None))
+            if expires <= monotonic():
+                self._local.pop(key, None)
+                return None
+            # callers may modify what they are given, so never hand out the cached copy
+            return deepcopy(response)
+        except Exception as err:
+            logger.warning(f"Unable to read registry info from cache: {err}")
+            return None
+
+    def update(self, command, response=None):
+        """Bring the cache up to date after a command was sent: store the response
+        to an info command, or drop the entry for an object a command changed."""
+        if not self.enabled:
+            return
+        write_key = self.key_for(command, WRITE_COMMANDS)
+        if write_key is not None:
+            self._delete(write_key)
+            return
+        key = self.key_for(command)
+        if key is None or response is None:
+            return
+        try:
+            if self.alias:
+                caches[self.alias].set(key, response, timeout=self.ttl)
+            else:
+                if len(self._local) >= self.MAX_LOCAL_ENTRIES:
+                    # dicts keep insertion order, so this is the oldest entry
+                    self._local.pop(next(iter(self._local)))
+                self._local[key] = (monotonic() + self.ttl, deepcopy(response))
+        except Exception as err:
+            logger.warning(f"Unable to write registry info to cache: {err}")
+
+    def invalidate(self, object_type: str, object_id: str):
+        """Drop the cached info for one object, so that it is next read from the registry."""
+        if self.enabled:
+            self._delete(self.key(object_type, object_id))
+
+    def _delete(self, key: str):
+        self._local.pop(key, None)
+        if self.alias:
+            try:
+                caches[self.alias].delete(key)
+            except Exception as err:
+                logger.warning(f"Unable to remove registry info from cache: {err}")
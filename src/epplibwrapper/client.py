@@ -1,7 +1,12 @@
 """Provide a wrapper around epplib to handle authentication and errors."""
 
 import logging
-from gevent.lock import BoundedSemaphore
+import gevent
+from contextlib import contextmanager
+from time import monotonic
+from gevent import monkey
+from gevent.local import local
+from gevent.pool import Pool
 
 try:
     from epplib.client import Client
@@ -12,9 +17,16 @@ except ImportError:
     pass
 
 from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
 
+from .breaker import CircuitBreaker
+from .cache import InfoCache
 from .cert import Cert, Key
 from .errors import ErrorCode, LoginError, RegistryError
+from .metrics import CommandEvent, RegistryMetrics
+from .pool import EPPConnectionPool, EPPSession, Priority
+from .singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -35,15 +47,18 @@ class EPPLibWrapper:
     """
     A wrapper over epplib's client.
 
+    Commands are sent over a pool of logged-in sessions, so that several
+    commands can be in flight at once (one per session).
+
+    Unless `warm_up` is False, the pool's first sessions are connected when
+    the wrapper is created. Otherwise they are connected by a later call to
+    `warm_up()`, or on demand by the first commands sent.
+
     ATTN: This should not be used directly. Use `Domain` from domain.py.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, warm_up=True) -> None:
         """Initialize settings which will be used for all connections."""
-        # set _client to None initially. In the event that the __init__ fails
-        # before _client initializes, app should still start and be in a state
-        # that it can attempt _client initialization on send attempts
-        self._client = None  # type: ignore
         # prepare (but do not send) a Login command
         self._login = commands.Login(
             cl_id=settings.SECRET_REGISTRY_CL_ID,
@@ -53,89 +68,174 @@ class EPPLibWrapper:
                 "urn:ietf:params:xml:ns:contact-1.0",
             ],
         )
-        # We should only ever have one active connection at a time
-        self.connection_lock = BoundedSemaphore(1)
+        self.info_cache = InfoCache(
+            ttl=settings.REGISTRY_INFO_CACHE_TTL,
+            alias=settings.REGISTRY_INFO_CACHE_ALIAS,
+        )
+        # fail fast rather than wait on a registry which cannot be reached
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.REGISTRY_BREAKER_THRESHOLD,
+            reset_timeout=settings.REGISTRY_BREAKER_RESET_TIMEOUT,
+        )
+        self.metrics = RegistryMetrics(hook=self._load_metrics_hook())
+        # identical reads in flight at the same time share one request
+        self.in_flight = SingleFlight()
+        self._pool = EPPConnectionPool(
+            min_size=settings.REGISTRY_POOL_MIN_SIZE,
+            max_size=settings.REGISTRY_POOL_MAX_SIZE,
+            timeout=settings.REGISTRY_POOL_CHECKOUT_TIMEOUT,
+            batch_share=settings.REGISTRY_POOL_BATCH_SHARE,
+        )
+        # the priority of the commands each greenlet sends, see `priority`
+        self._local = local()
+        self._keepalive = None
 
-        self.connection_lock.acquire()
+        if warm_up:
+            self.warm_up()
+
+    def warm_up(self):
+        """Open the pool's minimum number of sessions and start the keepalive
+        greenlet. In the event that connecting fails, the wrapper is still in a
+        state that it can attempt client initialization on send attempts."""
+        for _ in range(self._pool.min_size - self._pool.size):
+            session = EPPSession()
+            try:
+                self._initialize_client(session)
+            except Exception:
+                logger.warning("Unable to configure the connection to the registry.")
+            try:
+                self._pool.add(session)
+            except ValueError:
+                # commands sent meanwhile have grown the pool to its maximum size
+                self._close_client(session)
+                break
+        self._start_keepalive_if_enabled()
+
+    def _start_keepalive_if_enabled(self):
+        """Start the keepalive greenlet, unless it is turned off or already running."""
+        # the keepalive greenlet can only run if sockets yield to gevent,
+        # which is the case under gunicorn's gevent worker
+        if settings.REGISTRY_KEEPALIVE_INTERVAL and monkey.is_module_patched("socket"):
+            self.start_keepalive()
+
+    def _load_metrics_hook(self):
+        """Import the callable named by REGISTRY_METRICS_HOOK, if there is one."""
+        if not settings.REGISTRY_METRICS_HOOK:
+            return None
         try:
-            self._initialize_client()
-        except Exception:
-            logger.warning("Unable to configure the connection to the registry.")
+            return import_string(settings.REGISTRY_METRICS_HOOK)
+        except ImportError as err:
+            logger.warning(f"Unable to load the registry metrics hook: {err}")
+            return None
+
+    @property
+    def current_priority(self) -> Priority:
+        """The priority of commands sent from the current greenlet."""
+        return getattr(self._local, "priority", Priority.INTERACTIVE)
+
+    @contextmanager
+    def priority(self, priority: Priority):
+        """Send the commands sent within this block with the given priority.
+
+        Commands are INTERACTIVE unless sent within such a block. For example,
+        a script sending many commands should use:
+
+            with registry.priority(Priority.BATCH):
+                ...
+        """
+        previous = self.current_priority
+        self._local.priority = priority
+        try:
+            yield
         finally:
-            self.connection_lock.release()
+            self._local.priority = previous
 
-    def _initialize_client(self) -> None:
-        """Initialize a client, assuming _login defined. Sets _client to initialized
-        client. Raises errors if initialization fails.
-        This method will be called at app initialization, and also during retries."""
+    def _initialize_client(self, session: EPPSession | None = None) -> EPPSession:
+        """Initialize a client on a session, assuming _login defined. Sets the
+        session's client to an initialized client. Raises errors if initialization fails.
+        This method will be called at app initialization, and also during retries.
+        If no session is given a new one is created. Returns the session."""
+        if session is None:
+            session = EPPSession()
         # establish a client object with a TCP socket transport
         # note that type: ignore added in several places because linter complains
-        # about _client initially being set to None, and None type doesn't match code
-        self._client = Client(  # type: ignore
+        # about the client initially being set to None, and None type doesn't match code
+        session.client = Client(  # type: ignore
             SocketTransport(
                 settings.SECRET_REGISTRY_HOSTNAME,
+                port=settings.REGISTRY_PORT,
                 cert_file=CERT.filename,
                 key_file=KEY.filename,
                 password=settings.SECRET_REGISTRY_KEY_PASSPHRASE,
             )
         )
         try:
-            # use the _client object to connect
-            self._connect()
+            # use the client object to connect
+            self._connect(session)
         except TransportError as err:
+            session.mark_unhealthy()
             message = "_initialize_client failed to execute due to a connection error."
             logger.error(f"{message} Error: {err}")
             raise RegistryError(message, code=ErrorCode.TRANSPORT_ERROR) from err
         except LoginError as err:
+            session.mark_unhealthy()
             raise err
         except Exception as err:
+            session.mark_unhealthy()
             message = "_initialize_client failed to execute due to an unknown error."
             logger.error(f"{message} Error: {err}")
             raise RegistryError(message) from err
+        session.mark_connected()
+        if session.event is not None:
+            session.event.reconnects += 1
+        return session
 
-    def _connect(self) -> None:
+    def _connect(self, session: EPPSession) -> None:
         """Connects to EPP. Sends a login command. If an invalid response is returned,
         the client will be closed and a LoginError raised."""
-        self._client.connect()  # type: ignore
-        response = self._client.send(self._login)  # type: ignore
+        session.client.connect()  # type: ignore
+        response = session.client.send(self._login)  # type: ignore
         if response.code >= 2000:  # type: ignore
-            self._client.close()  # type: ignore
+            session.client.close()  # type: ignore
             raise LoginError(response.msg)  # type: ignore
 
-    def _disconnect(self) -> None:
+    def _disconnect(self, session: EPPSession) -> None:
         """Close the connection. Sends a logout command and closes the connection."""
-        self._send_logout_command()
-        self._close_client()
+        self._send_logout_command(session)
+        self._close_client(session)
 
-    def _send_logout_command(self):
+    def _send_logout_command(self, session: EPPSession):
         """Sends a logout command to epp"""
         try:
-            self._client.send(commands.Logout())  # type: ignore
+            session.client.send(commands.Logout())  # type: ignore
         except Exception as err:
             logger.warning(f"Logout command not sent successfully: {err}")
 
-    def _close_client(self):
+    def _close_client(self, session: EPPSession):
         """Closes an active client connection"""
         try:
-            self._client.close()
+            session.client.close()  # type: ignore
         except Exception as err:
             logger.warning(f"Connection to registry was not cleanly closed: {err}")
 
-    def _send(self, command):
+    def _send(self, command, session: EPPSession):
         """Helper function used by `send`."""
         cmd_type = command.__class__.__name__
 
         try:
-            # check for the condition that the _client was not initialized properly
-            # at app initialization
-            if self._client is None:
-                self._initialize_client()
-            response = self._client.send(command)
+            # check for the condition that the session's client was not
+            # initialized yet, either at app initialization or because the
+            # pool has just grown
+            if session.client is None:
+                self._initialize_client(session)
+            session.touch()
+            response = self._send_on_client(command, session)
         except (ValueError, ParsingError) as err:
             message = f"{cmd_type} failed to execute due to some syntax error."
             logger.error(f"{message} Error: {err}")
             raise RegistryError(message) from err
         except TransportError as err:
+            session.mark_unhealthy()
             message = f"{cmd_type} failed to execute due to a connection error."
             logger.error(f"{message} Error: {err}")
             raise RegistryError(message, code=ErrorCode.TRANSPORT_ERROR) from err
@@ -144,7 +244,8 @@ class EPPLibWrapper:
             text = "failed to execute due to a registry login error."
             message = f"{cmd_type} {text}"
             logger.error(f"{message} Error: {err}")
-            raise RegistryError(message) from err
+            # keep the type, so that the circuit breaker counts it as a failure to reach the registry
+            raise LoginError(message) from err
         except Exception as err:
             message = f"{cmd_type} failed to execute due to an unknown error."
             logger.error(f"{message} Error: {err}")
@@ -155,24 +256,170 @@ class EPPLibWrapper:
             else:
                 return response
 
-    def _retry(self, command):
-        """Retry sending a command through EPP by re-initializing the client
-        and then sending the command."""
+    def _send_on_client(self, command, session: EPPSession):
+        """Send the command over the session's client, timing how long the registry takes to answer."""
+        started = monotonic()
+        try:
+            return session.client.send(command)  # type: ignore
+        finally:
+            if session.event is not None:
+                session.event.wire_time += monotonic() - started
+
+    def _retry(self, command, session: EPPSession):
+        """Retry sending a command through EPP by re-initializing the session's
+        client and then sending the command."""
+        if session.event is not None:
+            session.event.retries += 1
         # re-initialize by disconnecting and initial
-        self._disconnect()
-        self._initialize_client()
-        return self._send(command)
+        self._disconnect(session)
+        self._initialize_client(session)
+        return self._send(command, session)
+
+    def _release(self, session: EPPSession):
+        """Return a session to the pool. A session which could not be
+        (re)connected is closed, so that the next user initializes it afresh
+        rather than sending over a broken connection."""
+        if not session.healthy and session.client is not None:
+            self._close_client(session)
+            session.client = None
+        self._pool.checkin(session)
+
+    def start_keepalive(self):
+        """Start the background greenlet which keeps idle sessions alive,
+        unless it is already running."""
+        if self._keepalive is None or self._keepalive.dead:
+            self._keepalive = gevent.spawn(self._keepalive_loop)
+
+    def stop_keepalive(self):
+        """Stop the background keepalive greenlet, if it is running."""
+        if self._keepalive is not None:
+            self._keepalive.kill()
+            self._keepalive = None
+
+    def _keepalive_loop(self):
+        """Tend the idle sessions every REGISTRY_KEEPALIVE_INTERVAL seconds."""
+        while True:
+            gevent.sleep(settings.REGISTRY_KEEPALIVE_INTERVAL)
+            self._tend_sessions()
+
+    def _tend_sessions(self):
+        """Look after every session which is not in use, so that requests
+        don't pay for reconnecting to the registry. Sessions in use are skipped:
+        a caller is already finding out whether they work."""
+        for session in self._pool.sessions():
+            if not self._pool.take(session):
+                continue
+            try:
+                self._tend_session(session)
+            except Exception as err:
+                logger.warning(f"Unable to reconnect an idle registry session: {err}")
+            finally:
+                self._release(session)
+
+    def _tend_session(self, session: EPPSession):
+        """Keep one idle session usable. A broken session is reconnected, a session
+        older than REGISTRY_SESSION_MAX_AGE is logged out and in again, and a session
+        idle for REGISTRY_KEEPALIVE_IDLE seconds is sent a hello so the registry
+        does not time it out. Raises errors if reconnecting fails."""
+        if session.client is not None and session.healthy:
+            if session.age_seconds() >= settings.REGISTRY_SESSION_MAX_AGE:
+                logger.info("Recycling a registry session which has reached its maximum age")
+                self._disconnect(session)
+            elif session.idle_seconds() >= settings.REGISTRY_KEEPALIVE_IDLE:
+                if self._send_hello(session):
+                    return
+                self._close_client(session)
+            else:
+                return
+        elif session.client is not None:
+            self._close_client(session)
+        self._initialize_client(session)
+
+    def _send_hello(self, session: EPPSession) -> bool:
+        """Sends a hello command to epp. Returns whether the registry answered."""
+        session.touch()
+        try:
+            session.client.send(commands.Hello())  # type: ignore
+        except Exception as err:
+            session.mark_unhealthy()
+            logger.warning(f"Hello command not sent successfully, reconnecting: {err}")
+            return False
+        return True
 
     def send(self, command, *, cleaned=False):
-        """Login, the send the command. Retry once if an error is found"""
+        """Login, the send the command. Retry once if an error is found.
+        Info commands are answered from the info cache when possible, and a read
+        identical to one already in flight waits for that one's response."""
         # try to prevent use of this method without appropriate safeguards
-        cmd_type = command.__class__.__name__
         if not cleaned:
             raise ValueError("Please sanitize user input before sending it.")
 
-        self.connection_lock.acquire()
+        cached = self.info_cache.get(command)
+        if cached is not None:
+            return cached
+
+        return self.in_flight.do(command, self._send_through_cache)
+
+    def _send_through_cache(self, command):
+        """Send the command and bring the info cache up to date with the outcome."""
+        response = None
+        try:
+            response = self._send_over_pool(command)
+            return response
+        finally:
+            # a failed write still invalidates, as its outcome is unknown
+            self.info_cache.update(command, response)
+
+    def _send_over_pool(self, command):
+        """Check out a session and send the command over it, unless the circuit
+        breaker is open. Retry once if an error is found. Records metrics for the command."""
+        if self._keepalive is None:
+            # the wrapper was not warmed up, so the keepalive starts with the first command
+            self._start_keepalive_if_enabled()
+        event = CommandEvent(command=command.__class__.__name__, priority=self.current_priority.name.lower())
+        try:
+            response = self._send_recording(command, event)
+        except RegistryError as err:
+            event.code = err.code
+            raise err
+        else:
+            event.code = response.code
+            return response
+        finally:
+            self.metrics.record(event)
+
+    def _send_recording(self, command, event: CommandEvent):
+        """Helper function used by `_send_over_pool`. Fills in the event as it goes."""
         try:
-            return self._send(command)
+            self.breaker.before_send()
+        except RegistryError:
+            event.fast_failed = True
+            raise
+
+        started = monotonic()
+        try:
+            session = self._pool.checkout(priority=self.current_priority)
+        finally:
+            event.queue_wait = monotonic() - started
+
+        session.event = event
+        try:
+            response = self._send_with_retry(command, session)
+        except RegistryError as err:
+            self.breaker.record_error(err)
+            raise err
+        finally:
+            session.event = None
+            self._release(session)
+        self.breaker.record_success()
+        return response
+
+    def _send_with_retry(self, command, session: EPPSession):
+        """Helper function used by `_send_over_pool`. Send the command over
+        the session. Retry once if an error is found"""
+        cmd_type = command.__class__.__name__
+        try:
+            return self._send(command, session)
         except RegistryError as err:
             if (
                 err.is_transport_error()
@@ -183,16 +430,91 @@ class EPPLibWrapper:
             ):
                 message = f"{cmd_type} failed and will be retried"
                 logger.info(f"{message} Error: {err}")
-                return self._retry(command)
+                return self._retry(command, session)
             else:
                 raise err
+
+    def metrics_snapshot(self) -> dict:
+        """Metrics for the commands sent by this process, and the state of its
+        session pool and circuit breaker, in a form which can be serialized to JSON."""
+        return {
+            **self.metrics.snapshot(),
+            "pool": {
+                "size": self._pool.size,
+                "in_use": self._pool.in_use,
+                "max_size": self._pool.max_size,
+                "waiting": self._pool.waiting(),
+            },
+            "breaker": self.breaker.state,
+        }
+
+    def send_many(self, command_list, *, cleaned=False):
+        """Send several commands which do not depend on one another, spreading
+        them across the pool's sessions so they are in flight at the same time.
+
+        Returns a list with, for each command in order, either its response or
+        the RegistryError it raised. Any other error is raised."""
+        # try to prevent use of this method without appropriate safeguards
+        if not cleaned:
+            raise ValueError("Please sanitize user input before sending it.")
+
+        # no more greenlets than sessions, so none of them wait on checkout
+        group = Pool(self._pool.max_size)
+        # greenlets do not inherit the priority of the greenlet which spawned them
+        priority = self.current_priority
+        greenlets = [group.spawn(self._send_capturing_error, command, priority) for command in command_list]
+        group.join()
+
+        results = [greenlet.value for greenlet in greenlets]
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, RegistryError):
+                raise result
+        return results
+
+    def check_domains(self, names, *, cleaned=False) -> dict[str, bool]:
+        """Check whether each of the given domain names is available, sending
+        up to REGISTRY_CHECK_BATCH_SIZE names in each CheckDomain command.
+
+        Returns a dict of each name, lowercased, to its availability.
+        Raises the first RegistryError, if any command fails."""
+        if not cleaned:
+            raise ValueError("Please sanitize user input before sending it.")
+
+        size = max(1, settings.REGISTRY_CHECK_BATCH_SIZE)
+        requests = [commands.CheckDomain(names[i : i + size]) for i in range(0, len(names), size)]
+        if len(requests) == 1:
+            responses = [self.send(requests[0], cleaned=True)]
+        else:
+            responses = self.send_many(requests, cleaned=True)
+
+        available = {}
+        for response in responses:
+            if isinstance(response, RegistryError):
+                raise response
+            for data in response.res_data:
+                available[data.name.lower()] = data.avail
+        return available
+
+    def _send_capturing_error(self, command, priority=Priority.INTERACTIVE):
+        """Helper function used by `send_many`. Returns errors instead of raising them,
+        so that one failed command does not lose the results of the others."""
+        try:
+            with self.priority(priority):
+                return self.send(command, cleaned=True)
+        except Exception as err:
+            return err
         finally:
-            self.connection_lock.release()
+            # under gevent's monkey patching, database connections belong to the
+            # greenlet which opened them (such as for the info cache). Nothing else
+            # will close them once this greenlet is done.
+            if monkey.is_module_patched("threading"):
+                connections.close_all()
 
 
 try:
-    # Initialize epplib
-    CLIENT = EPPLibWrapper()
+    # Initialize epplib. Nothing is connected yet, so importing this module
+    # does not wait on the registry: see warm_up
+    CLIENT = EPPLibWrapper(warm_up=False)
     logger.info("registry client initialized")
 except Exception:
     logger.warning("Unable to configure epplib. Registrar cannot contact registry.")
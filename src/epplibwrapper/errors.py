@@ -72,9 +72,10 @@ class RegistryError(Exception):
     def is_transport_error(self):
         return self.code == ErrorCode.TRANSPORT_ERROR
 
-    # connection errors have error code of None and [Errno 99] in the err message
+    # connection errors have error code of None and [Errno 99] in the err message,
+    # or are transport errors, raised when the registry could not be reached at all
     def is_connection_error(self):
-        return self.code is None
+        return self.code is None or self.is_transport_error()
 
     def is_session_error(self):
         return self.code is not None and (self.code >= 2501 and self.code <= 2502)
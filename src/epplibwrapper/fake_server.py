@@ -0,0 +1,648 @@
+"""
+A fake EPP registry server, for developing and load testing against on a laptop.
+
+It speaks enough of EPP (RFC 5730-5734) for the commands the registrar sends:
+login, logout and hello, poll requests, and check, info, create, update,
+delete and renew of domains, contacts and hosts, including DNSSEC data.
+Objects are kept in memory and are lost when the server stops.
+
+Latency and failures can be injected to see how the app behaves when the
+registry is slow or unreliable. Run it with `./manage.py run_fake_registry`.
+"""
+
+import logging
+import random
+import struct
+from datetime import datetime, timedelta, timezone
+from itertools import count
+
+# the server only reads requests from the registrar running on the same machine,
+# and ElementTree doesn't resolve external entities, so the stdlib parser will do
+from xml.etree import ElementTree  # nosec B405
+
+import gevent
+from gevent.server import StreamServer
+
+logger = logging.getLogger(__name__)
+
+NS = {
+    "epp": "urn:ietf:params:xml:ns:epp-1.0",
+    "domain": "urn:ietf:params:xml:ns:domain-1.0",
+    "contact": "urn:ietf:params:xml:ns:contact-1.0",
+    "host": "urn:ietf:params:xml:ns:host-1.0",
+    "secDNS": "urn:ietf:params:xml:ns:secDNS-1.1",
+}
+
+# object type for each object namespace
+OBJECT_TYPES = {uri: prefix for prefix, uri in NS.items() if prefix in ("domain", "contact", "host")}
+
+MESSAGES = {
+    1000: "Command completed successfully",
+    1300: "Command completed successfully; no messages",
+    1500: "Command completed successfully; ending session",
+    2001: "Command syntax error",
+    2002: "Command use error",
+    2101: "Unimplemented command",
+    2200: "Authentication error",
+    2302: "Object exists",
+    2303: "Object does not exist",
+    2304: "Object status prohibits operation",
+    2305: "Object association prohibits operation",
+    2306: "Parameter value policy error",
+    2400: "Command failed",
+    2502: "Session limit exceeded; server closing connection",
+}
+
+# the order of the elements of a contact's infData, after id, roid and status
+CONTACT_FIELDS = ("postalInfo", "voice", "fax", "email")
+CONTACT_TRAILING_FIELDS = ("authInfo", "disclose")
+
+for _prefix, _uri in NS.items():
+    ElementTree.register_namespace(_prefix, _uri)
+
+
+def q(prefix, tag):
+    """The qualified name of a tag in one of the EPP namespaces."""
+    return f"{{{NS[prefix]}}}{tag}"
+
+
+def timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def add_years(value: datetime, years: int) -> datetime:
+    try:
+        return value.replace(year=value.year + years)
+    except ValueError:
+        # 29 February
+        return value.replace(year=value.year + years, day=28)
+
+
+class CommandError(Exception):
+    """Raised by a command handler to answer with an error result code."""
+
+    def __init__(self, code, msg=None):
+        super().__init__(msg or MESSAGES.get(code, ""))
+        self.code = code
+
+
+class CloseConnection(Exception):
+    """Raised to close the connection once the response has been written."""
+
+
+class FakeRegistry:
+    """The registry's objects, shared by every connection."""
+
+    def __init__(self, cl_id="fake-registrar") -> None:
+        self.cl_id = cl_id
+        self.domains: dict[str, dict] = {}
+        self.contacts: dict[str, dict] = {}
+        self.hosts: dict[str, dict] = {}
+        self._roids = count(1)
+
+    def roid(self, suffix):
+        return f"{next(self._roids)}-{suffix}"
+
+    def domain(self, name):
+        try:
+            return self.domains[name.lower()]
+        except KeyError:
+            raise CommandError(2303)
+
+    def contact(self, id):
+        try:
+            return self.contacts[id]
+        except KeyError:
+            raise CommandError(2303)
+
+    def host(self, name):
+        try:
+            return self.hosts[name.lower()]
+        except KeyError:
+            raise CommandError(2303)
+
+    def host_is_linked(self, name):
+        return any(name.lower() in domain["hosts"] for domain in self.domains.values())
+
+    def contact_is_linked(self, id):
+        return any(
+            domain["registrant"] == id or id in (contact_id for _, contact_id in domain["contacts"])
+            for domain in self.domains.values()
+        )
+
+    def subordinate_hosts(self, domain_name):
+        return [name for name in self.hosts if name.endswith(f".{domain_name.lower()}")]
+
+
+class FakeEPPServer(StreamServer):
+    """
+    A gevent server which answers EPP commands from a `FakeRegistry`.
+
+    Every command waits `latency` seconds, plus up to `jitter` more, before
+    being answered. A `failure_rate` share of commands are answered with
+    2400 "Command failed" and a `drop_rate` share have their connection
+    closed without an answer. Logins beyond `session_limit` concurrent
+    sessions are refused, and connections idle for `idle_timeout` seconds
+    are closed, as the real registry does. Pass `certfile` and `keyfile`
+    to serve over TLS.
+    """
+
+    def __init__(
+        self,
+        listener=("127.0.0.1", 7000),
+        registry=None,
+        latency=0.0,
+        jitter=0.0,
+        failure_rate=0.0,
+        drop_rate=0.0,
+        session_limit=None,
+        idle_timeout=None,
+        seed=None,
+        **ssl_args,
+    ) -> None:
+        super().__init__(listener, **ssl_args)
+        self.registry = registry or FakeRegistry()
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.session_limit = session_limit
+        self.idle_timeout = idle_timeout
+        self.random = random.Random(seed)  # nosec B311 - not used for security
+        self.sessions = 0
+        self._transaction_ids = count(1)
+
+    def handle(self, sock, address):
+        """Serve one connection: send a greeting, then answer commands until logout."""
+        logger.info(f"Connection from {address}")
+        sock.settimeout(self.idle_timeout)
+        session = {"logged_in": False}
+        try:
+            self.write(sock, self.greeting())
+            while True:
+                request = self.read(sock)
+                if request is None:
+                    break
+                response = self.respond(request, session)
+                if response is None:
+                    logger.info(f"Dropping connection from {address}")
+                    break
+                self.write(sock, response[0])
+                if response[1]:
+                    break
+        except OSError as err:
+            logger.info(f"Connection from {address} ended: {err}")
+        finally:
+            if session["logged_in"]:
+                self.sessions -= 1
+            sock.close()
+
+    @staticmethod
+    def read(sock):
+        """Read one EPP data unit, which is prefixed by its length (RFC 5734).
+        Returns None when the client has closed the connection."""
+        header = FakeEPPServer._read_exactly(sock, 4)
+        if header is None:
+            return None
+        (length,) = struct.unpack(">I", header)
+        return FakeEPPServer._read_exactly(sock, length - 4)
+
+    @staticmethod
+    def _read_exactly(sock, size):
+        data = b""
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    @staticmethod
+    def write(sock, element):
+        data = ElementTree.tostring(element, encoding="UTF-8", xml_declaration=True)
+        sock.sendall(struct.pack(">I", len(data) + 4) + data)
+
+    def respond(self, request, session):
+        """Answer one request. Returns the response and whether to close the
+        connection afterwards, or None to drop the connection without answering."""
+        gevent.sleep(self.latency + self.random.uniform(0, self.jitter))
+        if self.random.random() < self.drop_rate:
+            return None
+
+        try:
+            root = ElementTree.fromstring(request)  # nosec B314
+        except Exception:
+            return self.result(2001), False
+
+        if root.find(q("epp", "hello")) is not None:
+            return self.greeting(), False
+        command = root.find(q("epp", "command"))
+        if command is None or len(command) == 0:
+            return self.result(2001), False
+        cl_tr_id = command.findtext(q("epp", "clTRID"))
+
+        if self.random.random() < self.failure_rate:
+            return self.result(2400, cl_tr_id=cl_tr_id), False
+
+        try:
+            res_data, extension, code = self.dispatch(command, session)
+        except CloseConnection as err:
+            return self.result(err.args[0], cl_tr_id=cl_tr_id), True
+        except CommandError as err:
+            return self.result(err.code, str(err), cl_tr_id=cl_tr_id), False
+        return self.result(code, res_data=res_data, extension=extension, cl_tr_id=cl_tr_id), False
+
+    def dispatch(self, command, session):
+        """Call the handler for a command. Returns its resData and extension
+        elements (either may be None) and the result code."""
+        verb = command[0]
+        action = verb.tag.split("}")[-1]
+        if action == "login":
+            return self.login(session)
+        if not session["logged_in"]:
+            raise CommandError(2002, "Not logged in")
+        if action == "logout":
+            raise CloseConnection(1500)
+        if action == "poll":
+            return None, None, 1300
+        if len(verb) == 0 or verb[0].tag.split("}")[0][1:] not in OBJECT_TYPES:
+            raise CommandError(2001)
+
+        obj = verb[0]
+        object_type = OBJECT_TYPES[obj.tag.split("}")[0][1:]]
+        handler = getattr(self, f"{action}_{object_type}", None)
+        if handler is None:
+            raise CommandError(2101)
+        res_data, extension = handler(obj, command.find(q("epp", "extension")))
+        return res_data, extension, 1000
+
+    def login(self, session):
+        if session["logged_in"]:
+            raise CommandError(2002, "Already logged in")
+        if self.session_limit is not None and self.sessions >= self.session_limit:
+            raise CloseConnection(2502)
+        session["logged_in"] = True
+        self.sessions += 1
+        return None, None, 1000
+
+    def greeting(self):
+        epp = ElementTree.Element(q("epp", "epp"))
+        greeting = ElementTree.SubElement(epp, q("epp", "greeting"))
+        ElementTree.SubElement(greeting, q("epp", "svID")).text = "Fake EPP registry"
+        ElementTree.SubElement(greeting, q("epp", "svDate")).text = timestamp(datetime.now(timezone.utc))
+        menu = ElementTree.SubElement(greeting, q("epp", "svcMenu"))
+        ElementTree.SubElement(menu, q("epp", "version")).text = "1.0"
+        ElementTree.SubElement(menu, q("epp", "lang")).text = "en"
+        for prefix in ("domain", "contact", "host"):
+            ElementTree.SubElement(menu, q("epp", "objURI")).text = NS[prefix]
+        extensions = ElementTree.SubElement(menu, q("epp", "svcExtension"))
+        ElementTree.SubElement(extensions, q("epp", "extURI")).text = NS["secDNS"]
+        dcp = ElementTree.SubElement(greeting, q("epp", "dcp"))
+        ElementTree.SubElement(ElementTree.SubElement(dcp, q("epp", "access")), q("epp", "all"))
+        statement = ElementTree.SubElement(dcp, q("epp", "statement"))
+        ElementTree.SubElement(ElementTree.SubElement(statement, q("epp", "purpose")), q("epp", "prov"))
+        ElementTree.SubElement(ElementTree.SubElement(statement, q("epp", "recipient")), q("epp", "ours"))
+        ElementTree.SubElement(ElementTree.SubElement(statement, q("epp", "retention")), q("epp", "stated"))
+        return epp
+
+    def result(self, code, msg=None, res_data=None, extension=None, cl_tr_id=None):
+        epp = ElementTree.Element(q("epp", "epp"))
+        response = ElementTree.SubElement(epp, q("epp", "response"))
+        result = ElementTree.SubElement(response, q("epp", "result"), code=str(code))
+        ElementTree.SubElement(result, q("epp", "msg")).text = msg or MESSAGES.get(code, "")
+        if res_data is not None:
+            ElementTree.SubElement(response, q("epp", "resData")).append(res_data)
+        if extension is not None:
+            ElementTree.SubElement(response, q("epp", "extension")).append(extension)
+        tr_id = ElementTree.SubElement(response, q("epp", "trID"))
+        if cl_tr_id:
+            ElementTree.SubElement(tr_id, q("epp", "clTRID")).text = cl_tr_id
+        ElementTree.SubElement(tr_id, q("epp", "svTRID")).text = f"fake-{next(self._transaction_ids)}"
+        return epp
+
+    # == Checks == #
+
+    def _check(self, obj, prefix, field, existing):
+        chk_data = ElementTree.Element(q(prefix, "chkData"))
+        for element in obj.findall(q(prefix, field)):
+            cd = ElementTree.SubElement(chk_data, q(prefix, "cd"))
+            key = element.text if prefix == "contact" else element.text.lower()
+            available = key not in existing
+            ElementTree.SubElement(cd, q(prefix, field), avail="1" if available else "0").text = element.text
+            if not available:
+                ElementTree.SubElement(cd, q(prefix, "reason")).text = "In use"
+        return chk_data, None
+
+    def check_domain(self, obj, extension):
+        return self._check(obj, "domain", "name", self.registry.domains)
+
+    def check_contact(self, obj, extension):
+        return self._check(obj, "contact", "id", self.registry.contacts)
+
+    def check_host(self, obj, extension):
+        return self._check(obj, "host", "name", self.registry.hosts)
+
+    # == Domains == #
+
+    def info_domain(self, obj, extension):
+        domain = self.registry.domain(obj.findtext(q("domain", "name")))
+        inf_data = ElementTree.Element(q("domain", "infData"))
+        ElementTree.SubElement(inf_data, q("domain", "name")).text = domain["name"]
+        ElementTree.SubElement(inf_data, q("domain", "roid")).text = domain["roid"]
+        statuses = set(domain["statuses"])
+        if not domain["hosts"]:
+            statuses.add("inactive")
+        for status in sorted(statuses) or ["ok"]:
+            ElementTree.SubElement(inf_data, q("domain", "status"), s=status)
+        if domain["registrant"]:
+            ElementTree.SubElement(inf_data, q("domain", "registrant")).text = domain["registrant"]
+        for contact_type, contact_id in domain["contacts"]:
+            ElementTree.SubElement(inf_data, q("domain", "contact"), type=contact_type).text = contact_id
+        if domain["hosts"]:
+            ns = ElementTree.SubElement(inf_data, q("domain", "ns"))
+            for host in domain["hosts"]:
+                ElementTree.SubElement(ns, q("domain", "hostObj")).text = host
+        for host in self.registry.subordinate_hosts(domain["name"]):
+            ElementTree.SubElement(inf_data, q("domain", "host")).text = host
+        self._add_history(inf_data, "domain", domain)
+        ElementTree.SubElement(inf_data, q("domain", "exDate")).text = timestamp(domain["ex_date"])
+        auth_info = ElementTree.SubElement(inf_data, q("domain", "authInfo"))
+        ElementTree.SubElement(auth_info, q("domain", "pw")).text = domain["auth"]
+
+        ds_extension = None
+        if domain["ds_data"]:
+            ds_extension = ElementTree.Element(q("secDNS", "infData"))
+            ds_extension.extend(domain["ds_data"])
+        return inf_data, ds_extension
+
+    def create_domain(self, obj, extension):
+        name = obj.findtext(q("domain", "name"))
+        if name.lower() in self.registry.domains:
+            raise CommandError(2302)
+        hosts, contacts = self._domain_links(obj)
+        registrant = obj.findtext(q("domain", "registrant"))
+        self._check_references(hosts, [contact_id for _, contact_id in contacts] + [registrant] * bool(registrant))
+
+        now = datetime.now(timezone.utc)
+        period = int(obj.findtext(q("domain", "period")) or 1)
+        domain = {
+            "name": name.lower(),
+            "roid": self.registry.roid("GOV"),
+            "statuses": set(),
+            "registrant": registrant,
+            "contacts": contacts,
+            "hosts": hosts,
+            "auth": obj.findtext(f"{q('domain', 'authInfo')}/{q('domain', 'pw')}") or "",
+            "cr_date": now,
+            "up_date": None,
+            "ex_date": add_years(now, period),
+            "ds_data": [],
+        }
+        self.registry.domains[domain["name"]] = domain
+
+        cre_data = ElementTree.Element(q("domain", "creData"))
+        ElementTree.SubElement(cre_data, q("domain", "name")).text = domain["name"]
+        ElementTree.SubElement(cre_data, q("domain", "crDate")).text = timestamp(now)
+        ElementTree.SubElement(cre_data, q("domain", "exDate")).text = timestamp(domain["ex_date"])
+        return cre_data, None
+
+    def update_domain(self, obj, extension):
+        domain = self.registry.domain(obj.findtext(q("domain", "name")))
+        add = self._find(obj, q("domain", "add"))
+        rem = self._find(obj, q("domain", "rem"))
+        chg = self._find(obj, q("domain", "chg"))
+
+        added_hosts, added_contacts = self._domain_links(add)
+        removed_hosts, removed_contacts = self._domain_links(rem)
+        registrant = chg.findtext(q("domain", "registrant"))
+        self._check_references(
+            added_hosts, [contact_id for _, contact_id in added_contacts] + [registrant] * bool(registrant)
+        )
+
+        domain["hosts"] = [host for host in domain["hosts"] if host not in removed_hosts]
+        domain["hosts"].extend(host for host in added_hosts if host not in domain["hosts"])
+        domain["contacts"] = [contact for contact in domain["contacts"] if contact not in removed_contacts]
+        domain["contacts"].extend(contact for contact in added_contacts if contact not in domain["contacts"])
+        domain["statuses"] = (domain["statuses"] - self._statuses(rem, "domain")) | self._statuses(add, "domain")
+        if registrant:
+            domain["registrant"] = registrant
+        auth = chg.findtext(f"{q('domain', 'authInfo')}/{q('domain', 'pw')}")
+        if auth is not None:
+            domain["auth"] = auth
+
+        ds_update = extension.find(q("secDNS", "update")) if extension is not None else None
+        if ds_update is not None:
+            self._update_ds_data(domain, ds_update)
+        domain["up_date"] = datetime.now(timezone.utc)
+        return None, None
+
+    @staticmethod
+    def _find(element, tag):
+        """The child with this tag, or an empty element if there is none."""
+        found = element.find(tag)
+        return found if found is not None else ElementTree.Element(tag)
+
+    @staticmethod
+    def _domain_links(element):
+        """The host names and (type, id) contacts listed in a domain create, add or rem element."""
+        hosts = [host.text.lower() for host in element.iterfind(f"{q('domain', 'ns')}/{q('domain', 'hostObj')}")]
+        contacts = [(contact.get("type"), contact.text) for contact in element.findall(q("domain", "contact"))]
+        return hosts, contacts
+
+    @staticmethod
+    def _statuses(element, prefix):
+        return {status.get("s") for status in element.findall(q(prefix, "status"))}
+
+    def _update_ds_data(self, domain, ds_update):
+        def key(ds_data):
+            return tuple((child.text or "").strip().lower() for child in ds_data)
+
+        rem = ds_update.find(q("secDNS", "rem"))
+        if rem is not None:
+            if (rem.findtext(q("secDNS", "all")) or "").strip() in ("1", "true"):
+                domain["ds_data"] = []
+            removed = {key(ds_data) for ds_data in rem.findall(q("secDNS", "dsData"))}
+            domain["ds_data"] = [ds_data for ds_data in domain["ds_data"] if key(ds_data) not in removed]
+        add = ds_update.find(q("secDNS", "add"))
+        if add is not None:
+            existing = {key(ds_data) for ds_data in domain["ds_data"]}
+            domain["ds_data"].extend(
+                ds_data for ds_data in add.findall(q("secDNS", "dsData")) if key(ds_data) not in existing
+            )
+
+    def delete_domain(self, obj, extension):
+        domain = self.registry.domain(obj.findtext(q("domain", "name")))
+        if domain["statuses"] & {"clientDeleteProhibited", "serverDeleteProhibited"}:
+            raise CommandError(2304)
+        if self.registry.subordinate_hosts(domain["name"]):
+            raise CommandError(2305)
+        del self.registry.domains[domain["name"]]
+        return None, None
+
+    def renew_domain(self, obj, extension):
+        domain = self.registry.domain(obj.findtext(q("domain", "name")))
+        if obj.findtext(q("domain", "curExpDate")) != domain["ex_date"].strftime("%Y-%m-%d"):
+            raise CommandError(2306, "Current expiration date does not match")
+        period = obj.find(q("domain", "period"))
+        years = int(period.text) if period is not None else 1
+        if period is not None and period.get("unit") == "m":
+            domain["ex_date"] += timedelta(days=30 * years)
+        else:
+            domain["ex_date"] = add_years(domain["ex_date"], years)
+        domain["up_date"] = datetime.now(timezone.utc)
+
+        ren_data = ElementTree.Element(q("domain", "renData"))
+        ElementTree.SubElement(ren_data, q("domain", "name")).text = domain["name"]
+        ElementTree.SubElement(ren_data, q("domain", "exDate")).text = timestamp(domain["ex_date"])
+        return ren_data, None
+
+    def _check_references(self, hosts, contact_ids):
+        """Raise 2303 if a domain would refer to hosts or contacts which do not exist."""
+        for host in hosts:
+            self.registry.host(host)
+        for contact_id in contact_ids:
+            self.registry.contact(contact_id)
+
+    def _add_history(self, inf_data, prefix, obj):
+        """Add the clID, crID, crDate, upID and upDate elements of an infData."""
+        ElementTree.SubElement(inf_data, q(prefix, "clID")).text = self.registry.cl_id
+        ElementTree.SubElement(inf_data, q(prefix, "crID")).text = self.registry.cl_id
+        ElementTree.SubElement(inf_data, q(prefix, "crDate")).text = timestamp(obj["cr_date"])
+        if obj["up_date"]:
+            ElementTree.SubElement(inf_data, q(prefix, "upID")).text = self.registry.cl_id
+            ElementTree.SubElement(inf_data, q(prefix, "upDate")).text = timestamp(obj["up_date"])
+
+    # == Contacts == #
+
+    def info_contact(self, obj, extension):
+        contact = self.registry.contact(obj.findtext(q("contact", "id")))
+        inf_data = ElementTree.Element(q("contact", "infData"))
+        ElementTree.SubElement(inf_data, q("contact", "id")).text = contact["id"]
+        ElementTree.SubElement(inf_data, q("contact", "roid")).text = contact["roid"]
+        statuses = set(contact["statuses"])
+        if self.registry.contact_is_linked(contact["id"]):
+            statuses.add("linked")
+        for status in sorted(statuses) or ["ok"]:
+            ElementTree.SubElement(inf_data, q("contact", "status"), s=status)
+        for field in CONTACT_FIELDS:
+            inf_data.extend(contact["fields"].get(field, []))
+        self._add_history(inf_data, "contact", contact)
+        for field in CONTACT_TRAILING_FIELDS:
+            inf_data.extend(contact["fields"].get(field, []))
+        return inf_data, None
+
+    def create_contact(self, obj, extension):
+        id = obj.findtext(q("contact", "id"))
+        if id in self.registry.contacts:
+            raise CommandError(2302)
+        now = datetime.now(timezone.utc)
+        self.registry.contacts[id] = {
+            "id": id,
+            "roid": self.registry.roid("GOV"),
+            "statuses": set(),
+            "fields": self._contact_fields(obj),
+            "cr_date": now,
+            "up_date": None,
+        }
+        cre_data = ElementTree.Element(q("contact", "creData"))
+        ElementTree.SubElement(cre_data, q("contact", "id")).text = id
+        ElementTree.SubElement(cre_data, q("contact", "crDate")).text = timestamp(now)
+        return cre_data, None
+
+    def update_contact(self, obj, extension):
+        contact = self.registry.contact(obj.findtext(q("contact", "id")))
+        add = obj.find(q("contact", "add"))
+        rem = obj.find(q("contact", "rem"))
+        chg = obj.find(q("contact", "chg"))
+        if rem is not None:
+            contact["statuses"] -= self._statuses(rem, "contact")
+        if add is not None:
+            contact["statuses"] |= self._statuses(add, "contact")
+        if chg is not None:
+            contact["fields"].update(self._contact_fields(chg))
+        contact["up_date"] = datetime.now(timezone.utc)
+        return None, None
+
+    def delete_contact(self, obj, extension):
+        contact = self.registry.contact(obj.findtext(q("contact", "id")))
+        if self.registry.contact_is_linked(contact["id"]):
+            raise CommandError(2305)
+        del self.registry.contacts[contact["id"]]
+        return None, None
+
+    @staticmethod
+    def _contact_fields(element):
+        """The elements describing a contact, such as its postalInfo and email, by tag."""
+        fields: dict[str, list] = {}
+        for child in element:
+            tag = child.tag.split("}")[-1]
+            if tag in CONTACT_FIELDS or tag in CONTACT_TRAILING_FIELDS:
+                fields.setdefault(tag, []).append(child)
+        return fields
+
+    # == Hosts == #
+
+    def info_host(self, obj, extension):
+        host = self.registry.host(obj.findtext(q("host", "name")))
+        inf_data = ElementTree.Element(q("host", "infData"))
+        ElementTree.SubElement(inf_data, q("host", "name")).text = host["name"]
+        ElementTree.SubElement(inf_data, q("host", "roid")).text = host["roid"]
+        statuses = set(host["statuses"])
+        if self.registry.host_is_linked(host["name"]):
+            statuses.add("linked")
+        for status in sorted(statuses) or ["ok"]:
+            ElementTree.SubElement(inf_data, q("host", "status"), s=status)
+        for ip, addr in host["addrs"]:
+            ElementTree.SubElement(inf_data, q("host", "addr"), ip=ip).text = addr
+        self._add_history(inf_data, "host", host)
+        return inf_data, None
+
+    def create_host(self, obj, extension):
+        name = obj.findtext(q("host", "name")).lower()
+        if name in self.registry.hosts:
+            raise CommandError(2302)
+        now = datetime.now(timezone.utc)
+        self.registry.hosts[name] = {
+            "name": name,
+            "roid": self.registry.roid("GOV"),
+            "statuses": set(),
+            "addrs": [(addr.get("ip", "v4"), addr.text) for addr in obj.findall(q("host", "addr"))],
+            "cr_date": now,
+            "up_date": None,
+        }
+        cre_data = ElementTree.Element(q("host", "creData"))
+        ElementTree.SubElement(cre_data, q("host", "name")).text = name
+        ElementTree.SubElement(cre_data, q("host", "crDate")).text = timestamp(now)
+        return cre_data, None
+
+    def update_host(self, obj, extension):
+        host = self.registry.host(obj.findtext(q("host", "name")))
+        add = obj.find(q("host", "add"))
+        rem = obj.find(q("host", "rem"))
+        chg = obj.find(q("host", "chg"))
+        if rem is not None:
+            removed = {(addr.get("ip", "v4"), addr.text) for addr in rem.findall(q("host", "addr"))}
+            host["addrs"] = [addr for addr in host["addrs"] if addr not in removed]
+            host["statuses"] -= self._statuses(rem, "host")
+        if add is not None:
+            added = [(addr.get("ip", "v4"), addr.text) for addr in add.findall(q("host", "addr"))]
+            host["addrs"].extend(addr for addr in added if addr not in host["addrs"])
+            host["statuses"] |= self._statuses(add, "host")
+        new_name = chg.findtext(q("host", "name")) if chg is not None else None
+        if new_name and new_name.lower() != host["name"]:
+            if new_name.lower() in self.registry.hosts:
+                raise CommandError(2302)
+            del self.registry.hosts[host["name"]]
+            for domain in self.registry.domains.values():
+                domain["hosts"] = [new_name.lower() if name == host["name"] else name for name in domain["hosts"]]
+            host["name"] = new_name.lower()
+            self.registry.hosts[host["name"]] = host
+        host["up_date"] = datetime.now(timezone.utc)
+        return None, None
+
+    def delete_host(self, obj, extension):
+        host = self.registry.host(obj.findtext(q("host", "name")))
+        if self.registry.host_is_linked(host["name"]):
+            raise CommandError(2305)
+        del self.registry.hosts[host["name"]]
+        return None, None
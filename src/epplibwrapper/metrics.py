@@ -0,0 +1,128 @@
+"""Record how long registry commands take and how they turn out."""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# upper bounds, in seconds, of the histogram buckets. The last bucket is unbounded
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+@dataclass
+class CommandEvent:
+    """What happened to one command sent through `EPPLibWrapper`."""
+
+    # command type, such as "InfoDomain"
+    command: str
+    # name of the priority the command was sent with, such as "interactive"
+    priority: str = "interactive"
+    # seconds spent waiting for a session from the pool
+    queue_wait: float = 0.0
+    # seconds spent sending the command and waiting on the registry's response,
+    # over every attempt (but not counting reconnects)
+    wire_time: float = 0.0
+    # result code of the response or error, or None for errors without a code
+    code: int | None = None
+    # whether the command was refused because the circuit breaker is open
+    fast_failed: bool = False
+    retries: int = 0
+    # sessions connected and logged in while sending this command
+    reconnects: int = 0
+
+
+class Histogram:
+    """Counts of observed values, bucketed by BUCKETS."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def as_dict(self) -> dict:
+        buckets = {str(bound): count for bound, count in zip(BUCKETS, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "buckets": buckets,
+        }
+
+
+@dataclass
+class CommandStats:
+    """Totals for every command of one type."""
+
+    count: int = 0
+    results: Counter = field(default_factory=Counter)
+    retries: int = 0
+    reconnects: int = 0
+    queue_wait: Histogram = field(default_factory=Histogram)
+    wire_time: Histogram = field(default_factory=Histogram)
+
+    def add(self, event: CommandEvent) -> None:
+        self.count += 1
+        if event.fast_failed:
+            self.results["fast_failed"] += 1
+        else:
+            self.results[str(event.code) if event.code is not None else "error"] += 1
+        self.retries += event.retries
+        self.reconnects += event.reconnects
+        self.queue_wait.observe(event.queue_wait)
+        self.wire_time.observe(event.wire_time)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "results": dict(self.results),
+            "retries": self.retries,
+            "reconnects": self.reconnects,
+            "queue_wait": self.queue_wait.as_dict(),
+            "wire_time": self.wire_time.as_dict(),
+        }
+
+
+class RegistryMetrics:
+    """
+    Per command type counters and histograms for the commands sent by this process.
+
+    If a `hook` is given, it is called with every `CommandEvent` as well, so
+    that the events can be sent on to a metrics service. Errors raised by the
+    hook are logged and otherwise ignored.
+    """
+
+    def __init__(self, hook=None) -> None:
+        self.hook = hook
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        self.since = datetime.now(timezone.utc)
+        self._stats: dict[str, CommandStats] = {}
+
+    def record(self, event: CommandEvent) -> None:
+        self._stats.setdefault(event.command, CommandStats()).add(event)
+        if self.hook is not None:
+            try:
+                self.hook(event)
+            except Exception as err:
+                logger.warning(f"Registry metrics hook failed: {err}")
+
+    def snapshot(self) -> dict:
+        """Everything recorded so far, in a form which can be serialized to JSON."""
+        return {
+            "since": self.since.isoformat(),
+            "commands": {command: stats.as_dict() for command, stats in sorted(self._stats.items())},
+        }
@@ -0,0 +1,236 @@
+"""Provide a pool of registry sessions which can be used concurrently."""
+
+import logging
+from collections import Counter, deque
+from enum import IntEnum
+from time import monotonic
+
+from gevent.event import Event
+
+from .errors import ErrorCode, RegistryError
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Lanes for registry traffic. Lower values are served first."""
+
+    # requests from registrants, who are waiting on the page
+    INTERACTIVE = 0
+    # actions taken by analysts in the admin site
+    ADMIN = 1
+    # scripts and other bulk jobs
+    BATCH = 2
+
+
+class EPPSession:
+    """
+    A single connection to the registry.
+
+    The session holds an epplib `Client`. Connecting, logging in and logging
+    out are the job of `EPPLibWrapper`; the session only records what the pool
+    needs to know to decide whether it can be handed out again.
+    """
+
+    def __init__(self) -> None:
+        # set client to None initially. It is set by EPPLibWrapper when the
+        # session is first used (or when the pool is warmed up)
+        self.client = None  # type: ignore
+        # a session is healthy once it has connected and logged in, and stays
+        # healthy until a connection or login error is seen on it
+        self.healthy = False
+        self.connected_at = monotonic()
+        self.last_used = self.connected_at
+        # metrics for the command being sent on this session, while there is one
+        self.event = None
+        # the lane the session was checked out for, while it is checked out
+        self.priority = None
+
+    def mark_connected(self) -> None:
+        """Record a successful connect and login."""
+        self.healthy = True
+        self.connected_at = monotonic()
+        self.last_used = self.connected_at
+
+    def mark_unhealthy(self) -> None:
+        """Record that the connection can no longer be trusted."""
+        self.healthy = False
+
+    def touch(self) -> None:
+        """Record that a command was just sent on this session."""
+        self.last_used = monotonic()
+
+    def idle_seconds(self) -> float:
+        """Seconds since a command was last sent on this session."""
+        return monotonic() - self.last_used
+
+    def age_seconds(self) -> float:
+        """Seconds since this session last logged in."""
+        return monotonic() - self.connected_at
+
+
+class EPPConnectionPool:
+    """
+    A bounded pool of `EPPSession` objects.
+
+    A caller checks a session out, has exclusive use of it, and then checks
+    it back in. The pool grows on demand up to `max_size` sessions. When
+    every session is in use, `checkout` waits up to `timeout` seconds for
+    one to be returned before giving up.
+
+    Callers check out sessions for a `Priority`. Returned sessions go to
+    waiting INTERACTIVE callers first, then ADMIN, then BATCH, and BATCH
+    callers never hold more than `batch_share` of the sessions between them
+    (but always at least one), so bulk jobs cannot crowd out people.
+    """
+
+    def __init__(self, min_size=1, max_size=1, timeout=None, batch_share=1.0) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_batch = max(1, int(max_size * batch_share))
+
+        # every session the pool owns, whether idle or checked out
+        self._sessions: list[EPPSession] = []
+        # sessions ready to be checked out, most recently used on the right
+        self._idle: deque[EPPSession] = deque()
+        # sessions which may still be checked out
+        self._free = max_size
+        # sessions checked out, by priority
+        self._in_use_by: Counter = Counter()
+        # callers waiting for a session, by priority, longest waiting on the left
+        self._waiters: dict[Priority, deque[Event]] = {priority: deque() for priority in Priority}
+
+    @property
+    def size(self) -> int:
+        """Number of sessions owned by the pool."""
+        return len(self._sessions)
+
+    @property
+    def in_use(self) -> int:
+        """Number of sessions currently checked out."""
+        return len(self._sessions) - len(self._idle)
+
+    def waiting(self) -> dict[str, int]:
+        """Number of callers waiting for a session, by priority."""
+        return {priority.name.lower(): len(waiters) for priority, waiters in self._waiters.items()}
+
+    def sessions(self) -> list[EPPSession]:
+        """All sessions owned by the pool, idle or not."""
+        return list(self._sessions)
+
+    def add(self, session: EPPSession) -> None:
+        """Give the pool an (idle) session it does not yet own."""
+        if len(self._sessions) >= self.max_size:
+            raise ValueError("The registry connection pool is full")
+        self._sessions.append(session)
+        self._idle.append(session)
+
+    def checkout(self, timeout=None, priority=Priority.INTERACTIVE) -> EPPSession:
+        """
+        Take a session for exclusive use.
+
+        Prefers the most recently used healthy session, so that a small
+        set of connections stays warm. Creates a new, not yet connected
+        session when none are idle and the pool is below `max_size`.
+
+        Raises RegistryError with a TRANSPORT_ERROR code if no session
+        becomes available within the timeout.
+        """
+        if timeout is None:
+            timeout = self.timeout
+
+        if not self._acquire(priority, timeout):
+            message = "Timed out waiting for a connection to the registry."
+            logger.error(f"{message} {self.in_use} of {self.max_size} connections are in use.")
+            raise RegistryError(message, code=ErrorCode.TRANSPORT_ERROR)
+
+        session = self._take_idle()
+        if session is None:
+            # holding a slot guarantees the pool is below max_size here
+            session = EPPSession()
+            self._sessions.append(session)
+        session.priority = priority
+        return session
+
+    def take(self, session: EPPSession) -> bool:
+        """
+        Check out a specific idle session without waiting.
+
+        Returns False, and takes nothing, if the session is in use, if
+        every slot is taken or if anyone is waiting for a session.
+        """
+        if session not in self._idle:
+            return False
+        if self._free < 1 or any(self._waiters.values()):
+            return False
+        self._grant(None)
+        self._idle.remove(session)
+        return True
+
+    def checkin(self, session: EPPSession) -> None:
+        """Return a checked out session to the pool."""
+        if session in self._sessions and session not in self._idle:
+            self._idle.append(session)
+        priority, session.priority = session.priority, None
+        self._free += 1
+        self._in_use_by[priority] -= 1
+        self._dispatch()
+
+    def _can_grant(self, priority) -> bool:
+        """Whether a caller with this priority may have a slot now."""
+        if self._free < 1:
+            return False
+        return priority != Priority.BATCH or self._in_use_by[Priority.BATCH] < self.max_batch
+
+    def _grant(self, priority) -> None:
+        self._free -= 1
+        self._in_use_by[priority] += 1
+
+    def _acquire(self, priority, timeout) -> bool:
+        """Take a slot for a caller with this priority, waiting if others are ahead
+        of it. Returns False if no slot was granted within the timeout."""
+        waiting_ahead = any(self._waiters[p] for p in Priority if p <= priority)
+        if not waiting_ahead and self._can_grant(priority):
+            self._grant(priority)
+            return True
+
+        waiter = Event()
+        self._waiters[priority].append(waiter)
+        try:
+            granted = waiter.wait(timeout)
+        except BaseException:
+            # the caller was killed while waiting. Give back any slot it was
+            # handed, so that the slot is not lost
+            if waiter.is_set():
+                self._free += 1
+                self._in_use_by[priority] -= 1
+                self._dispatch()
+            raise
+        finally:
+            if waiter in self._waiters[priority]:
+                self._waiters[priority].remove(waiter)
+        return granted
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting callers, highest priority first."""
+        for priority in Priority:
+            waiters = self._waiters[priority]
+            while waiters and self._can_grant(priority):
+                self._grant(priority)
+                waiters.popleft().set()
+
+    def _take_idle(self):
+        """Pop the most recently used healthy idle session, else any idle one."""
+        for session in reversed(self._idle):
+            if session.healthy:
+                self._idle.remove(session)
+                return session
+        if self._idle:
+            return self._idle.pop()
+        return None
@@ -0,0 +1,76 @@
+"""Let concurrent identical registry reads share one in-flight request."""
+
+import logging
+from copy import deepcopy
+
+import gevent
+from gevent.event import AsyncResult
+
+logger = logging.getLogger(__name__)
+
+# Commands which only read from the registry, and so can safely be shared
+READ_COMMANDS = (
+    "InfoDomain",
+    "InfoContact",
+    "InfoHost",
+    "CheckDomain",
+    "CheckContact",
+    "CheckHost",
+)
+
+
+class SingleFlight:
+    """
+    Coalesce identical read commands which are in flight at the same time.
+
+    The first caller to send a command (the leader) sends it to the registry.
+    Callers who send an identical command before the leader has its answer
+    wait for that answer instead of queueing another request, and receive a
+    copy of the leader's response, or the error it raised.
+
+    Commands are identical when they are of the same type and have equal
+    fields. Commands which are not in `commands` are always sent.
+    """
+
+    def __init__(self, commands=READ_COMMANDS) -> None:
+        self.commands = commands
+        # key -> (hub, result) for every command with a leader in flight
+        self._calls: dict[str, tuple[object, AsyncResult]] = {}
+
+    def key_for(self, command):
+        """The key which identical commands share, or None if the command is not a read."""
+        cmd_type = command.__class__.__name__
+        if cmd_type not in self.commands:
+            return None
+        # epplib commands are dataclasses, so their repr lists every field
+        return f"{cmd_type}:{command!r}"
+
+    def do(self, command, send):
+        """Call `send(command)`, unless an identical command is already in flight,
+        in which case wait for and return (a copy of) its response."""
+        key = self.key_for(command)
+        if key is None:
+            return send(command)
+
+        hub = gevent.get_hub()
+        in_flight = self._calls.get(key)
+        # a result can only be waited on from the thread (hub) which created it
+        if in_flight is not None and in_flight[0] is hub:
+            logger.debug(f"Waiting on an identical {command.__class__.__name__} already in flight")
+            # callers may modify what they are given, so never share the leader's response
+            return deepcopy(in_flight[1].get())
+
+        result = AsyncResult()
+        self._calls[key] = (hub, result)
+        try:
+            response = send(command)
+        except BaseException as err:
+            # wake the followers even if the leader was killed
+            result.set_exception(err)
+            raise
+        else:
+            result.set(response)
+            return response
+        finally:
+            if self._calls.get(key, (None, None))[1] is result:
+                del self._calls[key]
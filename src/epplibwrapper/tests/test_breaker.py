@@ -0,0 +1,84 @@
+from unittest.mock import patch
+from django.test import TestCase
+from epplibwrapper.breaker import CircuitBreaker
+from epplibwrapper.errors import ErrorCode, LoginError, RegistryError
+from .common import less_console_noise
+
+
+class TestCircuitBreaker(TestCase):
+    """Test the circuit breaker which fails fast while the registry is down"""
+
+    def open_breaker(self, breaker):
+        """Helper function to record enough failures to open the breaker"""
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+    def test_opens_after_threshold_failures_in_a_row(self):
+        """Test that the breaker only opens once failures reach the threshold"""
+        with less_console_noise():
+            breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+            breaker.record_failure()
+            breaker.record_failure()
+            breaker.before_send()
+            breaker.record_failure()
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            with self.assertRaises(RegistryError) as context:
+                breaker.before_send()
+            self.assertTrue(context.exception.is_transport_error())
+            self.assertTrue(context.exception.is_connection_error())
+
+    def test_success_resets_failure_count(self):
+        """Test that only failures in a row open the breaker"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_opens_with_a_single_probe(self):
+        """Test that after the reset timeout one command is let through, and others still fail fast"""
+        with less_console_noise():
+            breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+            with patch("epplibwrapper.breaker.monotonic", return_value=1000):
+                self.open_breaker(breaker)
+            with patch("epplibwrapper.breaker.monotonic", return_value=1031):
+                breaker.before_send()
+                self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+                with self.assertRaises(RegistryError):
+                    breaker.before_send()
+
+    def test_probe_outcome_closes_or_reopens(self):
+        """Test that a successful probe closes the breaker and a failed one opens it again"""
+        with less_console_noise():
+            breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+            with patch("epplibwrapper.breaker.monotonic", return_value=1000):
+                self.open_breaker(breaker)
+            with patch("epplibwrapper.breaker.monotonic", return_value=1031):
+                breaker.before_send()
+                breaker.record_failure()
+                self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            with patch("epplibwrapper.breaker.monotonic", return_value=1062):
+                breaker.before_send()
+                breaker.record_success()
+                self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+                breaker.before_send()
+
+    def test_record_error_only_counts_unreachable_registry(self):
+        """Test that transport and login errors count as failures, and registry error codes do not"""
+        with less_console_noise():
+            breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+            breaker.record_error(RegistryError("Object does not exist", code=ErrorCode.OBJECT_DOES_NOT_EXIST))
+            breaker.record_error(LoginError("Authentication error"))
+            breaker.record_error(RegistryError("Object does not exist", code=ErrorCode.OBJECT_DOES_NOT_EXIST))
+            breaker.record_error(RegistryError("Connection refused", code=ErrorCode.TRANSPORT_ERROR))
+            self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+            breaker.record_error(LoginError("Authentication error"))
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_threshold_of_zero_turns_breaker_off(self):
+        """Test that a disabled breaker never fails fast"""
+        breaker = CircuitBreaker(failure_threshold=0, reset_timeout=30)
+        for _ in range(10):
+            breaker.record_failure()
+        breaker.before_send()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
@@ -0,0 +1,101 @@
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from epplibwrapper.cache import InfoCache
+
+
+class InfoDomain:
+    """Stands in for epplib's InfoDomain, which the cache recognizes by name"""
+
+    def __init__(self, name):
+        self.name = name
+
+
+class UpdateDomain(InfoDomain):
+    """Stands in for epplib's UpdateDomain"""
+
+
+class InfoContact:
+    """Stands in for epplib's InfoContact"""
+
+    def __init__(self, id):
+        self.id = id
+
+
+class UpdateContact(InfoContact):
+    """Stands in for epplib's UpdateContact"""
+
+
+class TestInfoCache(TestCase):
+    """Test the cache of registry info responses"""
+
+    def test_disabled_cache_stores_nothing(self):
+        """Test that a ttl of 0 turns the cache off"""
+        cache = InfoCache(ttl=0)
+        cache.update(InfoDomain("igorville.gov"), {"name": "igorville.gov"})
+        self.assertIsNone(cache.get(InfoDomain("igorville.gov")))
+
+    def test_local_cache_returns_copy_of_response(self):
+        """Test that a cached response is returned, but not the cached object itself"""
+        cache = InfoCache(ttl=60)
+        response = {"name": "igorville.gov", "statuses": ["ok"]}
+        cache.update(InfoDomain("igorville.gov"), response)
+
+        cached = cache.get(InfoDomain("IGORVILLE.gov"))
+        self.assertEqual(cached, response)
+        cached["statuses"].append("clientHold")
+        self.assertEqual(cache.get(InfoDomain("igorville.gov"))["statuses"], ["ok"])
+
+    def test_local_cache_entries_expire(self):
+        """Test that entries are not returned after their ttl"""
+        cache = InfoCache(ttl=60)
+        with patch("epplibwrapper.cache.monotonic", return_value=1000):
+            cache.update(InfoDomain("igorville.gov"), {"name": "igorville.gov"})
+        with patch("epplibwrapper.cache.monotonic", return_value=1059):
+            self.assertIsNotNone(cache.get(InfoDomain("igorville.gov")))
+        with patch("epplibwrapper.cache.monotonic", return_value=1061):
+            self.assertIsNone(cache.get(InfoDomain("igorville.gov")))
+
+    def test_write_command_invalidates_same_object(self):
+        """Test that changing an object drops its entry and no other"""
+        cache = InfoCache(ttl=60)
+        cache.update(InfoDomain("igorville.gov"), {"name": "igorville.gov"})
+        cache.update(InfoDomain("city.gov"), {"name": "city.gov"})
+        cache.update(InfoContact("sec123"), {"id": "sec123"})
+
+        cache.update(UpdateDomain("igorville.gov"))
+        cache.update(UpdateContact("sec123"))
+
+        self.assertIsNone(cache.get(InfoDomain("igorville.gov")))
+        self.assertIsNone(cache.get(InfoContact("sec123")))
+        self.assertIsNotNone(cache.get(InfoDomain("city.gov")))
+
+    def test_unknown_commands_are_not_cached(self):
+        """Test that only info commands are cached"""
+        cache = InfoCache(ttl=60)
+        cache.update("InfoDomainCommand", {"name": "igorville.gov"})
+        self.assertIsNone(cache.get("InfoDomainCommand"))
+        self.assertEqual(cache._local, {})
+
+    @override_settings(
+        CACHES={"registry-info": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test"}}
+    )
+    def test_django_cache_is_shared(self):
+        """Test that entries kept in a Django cache are seen by another cache instance,
+        as they would be by another worker"""
+        writer = InfoCache(ttl=60, alias="registry-info")
+        reader = InfoCache(ttl=60, alias="registry-info")
+        writer.update(InfoDomain("igorville.gov"), {"name": "igorville.gov"})
+        self.assertEqual(reader.get(InfoDomain("igorville.gov")), {"name": "igorville.gov"})
+
+        reader.invalidate("domain", "igorville.gov")
+        self.assertIsNone(writer.get(InfoDomain("igorville.gov")))
+
+    def test_database_cache_is_not_used(self):
+        """Test that an alias naming the database cache keeps entries in memory instead"""
+        with self.assertLogs("epplibwrapper.cache", level="WARNING"):
+            cache = InfoCache(ttl=60, alias="default")
+        self.assertIsNone(cache.alias)
+        with patch("epplibwrapper.cache.caches") as caches:
+            cache.update(InfoDomain("igorville.gov"), {"name": "igorville.gov"})
+            self.assertEqual(cache.get(InfoDomain("igorville.gov")), {"name": "igorville.gov"})
+        caches.__getitem__.assert_not_called()
@@ -1,9 +1,11 @@
 import datetime
+import gevent
 from dateutil.tz import tzlocal  # type: ignore
 from unittest.mock import MagicMock, patch
 from pathlib import Path
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from gevent.exceptions import ConcurrentObjectUseError
+from epplibwrapper.breaker import CircuitBreaker
 from epplibwrapper.client import EPPLibWrapper
 from epplibwrapper.errors import RegistryError, LoginError
 from .common import less_console_noise
@@ -50,8 +52,29 @@ class TestClient(TestCase):
 
             # Assert that connect method is called once
             mock_connect.assert_called_once()
-            # Assert that _client is not None after initialization
-            self.assertIsNotNone(wrapper._client)
+            # Assert that the warmed up session has a client after initialization
+            session = wrapper._pool.sessions()[0]
+            self.assertIsNotNone(session.client)
+            self.assertTrue(session.healthy)
+
+    @patch("epplibwrapper.client.Client")
+    def test_warm_up_is_deferred(self, mock_client):
+        """Test that a wrapper created with warm_up=False does not connect
+        until warm_up is called"""
+        with less_console_noise():
+            mock_client.return_value.send = MagicMock(return_value=self.fake_result(1000, "Command completed"))
+            wrapper = EPPLibWrapper(warm_up=False)
+            mock_client.return_value.connect.assert_not_called()
+            self.assertEqual(wrapper._pool.size, 0)
+
+            wrapper.warm_up()
+            mock_client.return_value.connect.assert_called_once()
+            self.assertEqual(wrapper._pool.size, 1)
+            self.assertTrue(wrapper._pool.sessions()[0].healthy)
+
+            # the pool is already warm
+            wrapper.warm_up()
+            mock_client.return_value.connect.assert_called_once()
 
     @patch("epplibwrapper.client.Client")
     def test_initialize_client_transport_error(self, mock_client):
@@ -263,6 +286,268 @@ class TestClient(TestCase):
             # send() is called 5 times: send(login), send(command) fail, send(logout), send(login), send(command)
             self.assertEquals(mock_send.call_count, 5)
 
+    @override_settings(REGISTRY_POOL_MIN_SIZE=1, REGISTRY_POOL_MAX_SIZE=2)
+    @patch("epplibwrapper.client.Client")
+    def test_concurrent_sends_use_separate_sessions(self, mock_client):
+        """Test that two commands sent at the same time are each given their own
+        session, rather than the second waiting for the first to complete.
+        Flow:
+        Initialization opens one session
+        Two greenlets send a command at the same time
+        The pool opens a second session for the second command"""
+        with less_console_noise():
+            in_flight = 0
+            max_in_flight = 0
+
+            def send_side_effect(command, *args, **kwargs):
+                nonlocal in_flight, max_in_flight
+                if command == "InfoDomainCommand":
+                    in_flight += 1
+                    max_in_flight = max(max_in_flight, in_flight)
+                    # yield to the other greenlet, as a socket read would
+                    gevent.sleep(0.01)
+                    in_flight -= 1
+                return self.fake_result(1000, "Command completed successfully")
+
+            mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+
+            wrapper = EPPLibWrapper()
+            greenlets = [gevent.spawn(wrapper.send, "InfoDomainCommand", cleaned=True) for _ in range(2)]
+            gevent.joinall(greenlets, raise_error=True)
+
+            # both commands were on the wire at the same time
+            self.assertEqual(max_in_flight, 2)
+            # a second client was created on demand
+            self.assertEqual(mock_client.call_count, 2)
+            self.assertEqual(wrapper._pool.size, 2)
+            self.assertEqual(wrapper._pool.in_use, 0)
+
+    @override_settings(REGISTRY_KEEPALIVE_IDLE=60, REGISTRY_SESSION_MAX_AGE=3600)
+    @patch("epplibwrapper.client.Client")
+    def test_keepalive_sends_hello_on_idle_session(self, mock_client):
+        """Test that a session idle for longer than REGISTRY_KEEPALIVE_IDLE is sent a
+        hello, and that a recently used session is left alone."""
+        with less_console_noise():
+            mock_client.return_value.send = MagicMock(return_value=self.fake_result(1000, "Command completed"))
+            wrapper = EPPLibWrapper()
+            session = wrapper._pool.sessions()[0]
+            # login only
+            self.assertEqual(mock_client.return_value.send.call_count, 1)
+
+            wrapper._tend_sessions()
+            # recently used, so nothing is sent
+            self.assertEqual(mock_client.return_value.send.call_count, 1)
+
+            session.last_used -= 120
+            wrapper._tend_sessions()
+            self.assertEqual(mock_client.return_value.send.call_count, 2)
+            self.assertIsInstance(mock_client.return_value.send.call_args[0][0], commands.Hello)
+            self.assertLess(session.idle_seconds(), 60)
+            self.assertTrue(session.healthy)
+
+    @override_settings(REGISTRY_KEEPALIVE_IDLE=60, REGISTRY_SESSION_MAX_AGE=3600)
+    @patch("epplibwrapper.client.Client")
+    def test_keepalive_reconnects_when_hello_fails(self, mock_client):
+        """Test that a session which does not answer a hello is reconnected in the
+        background, rather than by the next caller."""
+        with less_console_noise():
+            success = self.fake_result(1000, "Command completed")
+
+            def send_side_effect(command, *args, **kwargs):
+                if isinstance(command, commands.Hello):
+                    raise TransportError("Connection reset")
+                return success
+
+            mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+            wrapper = EPPLibWrapper()
+            session = wrapper._pool.sessions()[0]
+            session.last_used -= 120
+
+            wrapper._tend_sessions()
+            # connect() once during initialization, once to reconnect
+            self.assertEqual(mock_client.return_value.connect.call_count, 2)
+            mock_client.return_value.close.assert_called_once()
+            self.assertTrue(session.healthy)
+            self.assertEqual(wrapper._pool.in_use, 0)
+
+    @override_settings(REGISTRY_KEEPALIVE_IDLE=60, REGISTRY_SESSION_MAX_AGE=3600)
+    @patch("epplibwrapper.client.Client")
+    def test_keepalive_recycles_old_session(self, mock_client):
+        """Test that a session older than REGISTRY_SESSION_MAX_AGE logs out and in again."""
+        with less_console_noise():
+            mock_client.return_value.send = MagicMock(return_value=self.fake_result(1000, "Command completed"))
+            wrapper = EPPLibWrapper()
+            session = wrapper._pool.sessions()[0]
+            session.connected_at -= 7200
+
+            wrapper._tend_sessions()
+            # send() is called 3 times: send(login), send(logout), send(login)
+            self.assertEqual(mock_client.return_value.send.call_count, 3)
+            self.assertIsInstance(mock_client.return_value.send.call_args_list[1][0][0], commands.Logout)
+            self.assertEqual(mock_client.return_value.connect.call_count, 2)
+            self.assertLess(session.age_seconds(), 3600)
+
+    @override_settings(REGISTRY_KEEPALIVE_IDLE=60, REGISTRY_SESSION_MAX_AGE=3600)
+    @patch("epplibwrapper.client.Client")
+    def test_keepalive_skips_session_in_use(self, mock_client):
+        """Test that the keepalive does not touch a session a caller has checked out."""
+        with less_console_noise():
+            mock_client.return_value.send = MagicMock(return_value=self.fake_result(1000, "Command completed"))
+            wrapper = EPPLibWrapper()
+            session = wrapper._pool.checkout()
+            session.last_used -= 120
+
+            wrapper._tend_sessions()
+            # login only
+            self.assertEqual(mock_client.return_value.send.call_count, 1)
+            self.assertEqual(wrapper._pool.in_use, 1)
+
+    @patch("epplibwrapper.client.Client")
+    def test_send_many_returns_results_in_order(self, mock_client):
+        """Test that send_many returns one result per command, in order,
+        with a failed command's error in its place rather than raised."""
+        with less_console_noise():
+            results = {
+                "InfoHost1": self.fake_result(1000, "Host 1"),
+                "InfoHost2": self.fake_result(2303, "Object does not exist"),
+                "InfoHost3": self.fake_result(1000, "Host 3"),
+            }
+
+            def send_side_effect(command, *args, **kwargs):
+                return results.get(command, self.fake_result(1000, "Command completed successfully"))
+
+            mock_client.return_value.send = MagicMock(side_effect=send_side_effect)
+            wrapper = EPPLibWrapper()
+            responses = wrapper.send_many(["InfoHost1", "InfoHost2", "InfoHost3"], cleaned=True)
+
+            self.assertEqual(len(responses), 3)
+            self.assertEqual(responses[0].msg, "Host 1")
+            self.assertIsInstance(responses[1], RegistryError)
+            self.assertEqual(responses[1].code, 2303)
+            self.assertEqual(responses[2].msg, "Host 3")
+            self.assertEqual(wrapper._pool.in_use, 0)
+
+    def test_send_many_requires_cleaned(self):
+        """Test that send_many refuses input which has not been attested as sanitized."""
+        with less_console_noise():
+            with patch("epplibwrapper.client.Client"):
+                wrapper = EPPLibWrapper()
+            with self.assertRaises(ValueError):
+                wrapper.send_many(["InfoDomainCommand"])
+
+    @override_settings(REGISTRY_INFO_CACHE_TTL=60, REGISTRY_INFO_CACHE_ALIAS="")
+    @patch("epplibwrapper.client.Client")
+    def test_info_responses_are_cached_until_object_changes(self, mock_client):
+        """Test that a repeated InfoDomain is answered from the info cache, and
+        that an UpdateDomain for the same domain sends the next InfoDomain to the registry."""
+        with less_console_noise():
+            mock_send = MagicMock(return_value=self.fake_result(1000, "Command completed successfully"))
+            mock_client.return_value.send = mock_send
+            wrapper = EPPLibWrapper()
+            info = commands.InfoDomain(name="igorville.gov")
+
+            wrapper.send(info, cleaned=True)
+            wrapper.send(info, cleaned=True)
+            # send() is called 2 times: send(login), send(info)
+            self.assertEqual(mock_send.call_count, 2)
+
+            wrapper.send(commands.UpdateDomain(name="igorville.gov"), cleaned=True)
+            wrapper.send(info, cleaned=True)
+            # and then 2 more times: send(update), send(info)
+            self.assertEqual(mock_send.call_count, 4)
+
+    @override_settings(REGISTRY_INFO_CACHE_TTL=0)
+    @patch("epplibwrapper.client.Client")
+    def test_identical_concurrent_reads_send_once(self, mock_client):
+        """Test that an InfoDomain sent while an identical one is in flight
+        waits for that one's response instead of being sent again."""
+        with less_console_noise():
+
+            def slow_send(command):
+                gevent.sleep(0.01)
+                return self.fake_result(1000, "Command completed successfully")
+
+            mock_send = MagicMock(side_effect=slow_send)
+            mock_client.return_value.send = mock_send
+            wrapper = EPPLibWrapper()
+            info = commands.InfoDomain(name="igorville.gov")
+
+            greenlets = [gevent.spawn(wrapper.send, info, cleaned=True) for _ in range(3)]
+            gevent.joinall(greenlets, raise_error=True)
+
+            # send() is called 2 times: send(login), send(info)
+            self.assertEqual(mock_send.call_count, 2)
+            for greenlet in greenlets:
+                self.assertEqual(greenlet.value.code, 1000)
+
+    @override_settings(REGISTRY_BREAKER_THRESHOLD=2)
+    @patch("epplibwrapper.client.Client")
+    def test_send_fails_fast_while_registry_unreachable(self, mock_client):
+        """Test that once commands repeatedly fail to reach the registry,
+        further commands fail with a transport error without being sent."""
+        with less_console_noise():
+            mock_connect = MagicMock(side_effect=TransportError("Connection refused"))
+            mock_client.return_value.connect = mock_connect
+            wrapper = EPPLibWrapper()
+
+            for _ in range(2):
+                with self.assertRaises(RegistryError):
+                    wrapper.send("InfoDomainCommand", cleaned=True)
+            attempts = mock_connect.call_count
+
+            with self.assertRaises(RegistryError) as context:
+                wrapper.send("InfoDomainCommand", cleaned=True)
+            self.assertTrue(context.exception.is_transport_error())
+            # no connection was attempted for the last command
+            self.assertEqual(mock_connect.call_count, attempts)
+
+    @override_settings(REGISTRY_BREAKER_THRESHOLD=1)
+    @patch("epplibwrapper.client.Client")
+    def test_login_errors_open_breaker(self, mock_client):
+        """Test that a registry which rejects every login is counted as unreachable,
+        whether the login fails on sending a command or on retrying it."""
+        with less_console_noise():
+            mock_client.return_value.send = MagicMock(return_value=self.fake_result(2400, "Login failed"))
+            wrapper = EPPLibWrapper(warm_up=False)
+
+            session = wrapper._pool.checkout()
+            with self.assertRaises(LoginError) as context:
+                wrapper._send(commands.InfoDomain(name="igorville.gov"), session)
+            wrapper._release(session)
+            wrapper.breaker.record_error(context.exception)
+            self.assertEqual(wrapper.breaker.state, CircuitBreaker.OPEN)
+
+            wrapper.breaker.record_success()
+            with self.assertRaises(LoginError):
+                wrapper.send(commands.InfoDomain(name="igorville.gov"), cleaned=True)
+            self.assertEqual(wrapper.breaker.state, CircuitBreaker.OPEN)
+
+    @override_settings(REGISTRY_INFO_CACHE_TTL=0)
+    @patch("epplibwrapper.client.Client")
+    def test_send_records_metrics(self, mock_client):
+        """Test that a command which fails, is retried over a new connection and then
+        succeeds is recorded once, with its retry, reconnect and final result code."""
+        with less_console_noise():
+            send_call_count = 0
+
+            def side_effect(*args, **kwargs):
+                nonlocal send_call_count
+                send_call_count += 1
+                if send_call_count == 2:
+                    return self.fake_result(2400, "Command failed")
+                return self.fake_result(1000, "Command completed successfully")
+
+            mock_client.return_value.send = MagicMock(side_effect=side_effect)
+            wrapper = EPPLibWrapper()
+            wrapper.send(commands.InfoDomain(name="igorville.gov"), cleaned=True)
+
+            stats = wrapper.metrics_snapshot()["commands"]["InfoDomain"]
+            self.assertEqual(stats["count"], 1)
+            self.assertEqual(stats["results"], {"1000": 1})
+            self.assertEqual(stats["retries"], 1)
+            self.assertEqual(stats["reconnects"], 1)
+            self.assertEqual(stats["wire_time"]["count"], 1)
+
     def fake_failure_send_concurrent_threads(self, command=None, cleaned=None):
         """
         Raises a ConcurrentObjectUseError, which gevent throws when accessing
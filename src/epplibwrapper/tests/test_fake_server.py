@@ -0,0 +1,118 @@
+import struct
+from gevent import socket
+from django.test import TestCase
+from xml.etree.ElementTree import fromstring  # nosec B405
+from epplibwrapper.fake_server import FakeEPPServer, NS
+from .common import less_console_noise
+
+LOGIN = """<epp xmlns="urn:ietf:params:xml:ns:epp-1.0"><command><login>
+<clID>registrar</clID><pw>password</pw></login><clTRID>1</clTRID></command></epp>"""
+
+CHECK_DOMAIN = """<epp xmlns="urn:ietf:params:xml:ns:epp-1.0"><command><check>
+<domain:check xmlns:domain="urn:ietf:params:xml:ns:domain-1.0">
+<domain:name>igorville.gov</domain:name></domain:check></check><clTRID>2</clTRID></command></epp>"""
+
+CREATE_HOST = """<epp xmlns="urn:ietf:params:xml:ns:epp-1.0"><command><create>
+<host:create xmlns:host="urn:ietf:params:xml:ns:host-1.0"><host:name>ns1.igorville.gov</host:name>
+<host:addr ip="v4">1.2.3.4</host:addr></host:create></create><clTRID>3</clTRID></command></epp>"""
+
+CREATE_DOMAIN = """<epp xmlns="urn:ietf:params:xml:ns:epp-1.0"><command><create>
+<domain:create xmlns:domain="urn:ietf:params:xml:ns:domain-1.0"><domain:name>igorville.gov</domain:name>
+<domain:period unit="y">1</domain:period><domain:ns><domain:hostObj>ns1.igorville.gov</domain:hostObj></domain:ns>
+<domain:authInfo><domain:pw>2fooBAR123fooBaz</domain:pw></domain:authInfo>
+</domain:create></create><clTRID>4</clTRID></command></epp>"""
+
+INFO_DOMAIN = """<epp xmlns="urn:ietf:params:xml:ns:epp-1.0"><command><info>
+<domain:info xmlns:domain="urn:ietf:params:xml:ns:domain-1.0"><domain:name>igorville.gov</domain:name></domain:info>
+</info><clTRID>5</clTRID></command></epp>"""
+
+DELETE_HOST = """<epp xmlns="urn:ietf:params:xml:ns:epp-1.0"><command><delete>
+<host:delete xmlns:host="urn:ietf:params:xml:ns:host-1.0"><host:name>ns1.igorville.gov</host:name></host:delete>
+</delete><clTRID>6</clTRID></command></epp>"""
+
+
+class TestFakeEPPServer(TestCase):
+    """Test the fake registry server over a real socket"""
+
+    def connect(self, **kwargs):
+        """Helper function to start a server on a free port and connect to it, reading its greeting"""
+        self.server = FakeEPPServer(("127.0.0.1", 0), **kwargs)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        sock = socket.create_connection(("127.0.0.1", self.server.server_port), timeout=5)
+        self.addCleanup(sock.close)
+        greeting = self.receive(sock)
+        self.assertIsNotNone(greeting.find(f"{{{NS['epp']}}}greeting"))
+        return sock
+
+    def send(self, sock, xml):
+        """Helper function to send a command and return the response, or None if the connection closed"""
+        data = xml.encode()
+        sock.sendall(struct.pack(">I", len(data) + 4) + data)
+        return self.receive(sock)
+
+    def receive(self, sock):
+        header = sock.recv(4)
+        if not header:
+            return None
+        (length,) = struct.unpack(">I", header)
+        data = b""
+        while len(data) < length - 4:
+            data += sock.recv(length - 4 - len(data))
+        return fromstring(data)  # nosec B314
+
+    def code(self, response):
+        return int(response.find(f".//{{{NS['epp']}}}result").get("code"))
+
+    def test_commands_require_login(self):
+        """Test that commands are refused until the session logs in"""
+        with less_console_noise():
+            sock = self.connect()
+            self.assertEqual(self.code(self.send(sock, CHECK_DOMAIN)), 2002)
+            self.assertEqual(self.code(self.send(sock, LOGIN)), 1000)
+            self.assertEqual(self.code(self.send(sock, CHECK_DOMAIN)), 1000)
+
+    def test_domain_lifecycle(self):
+        """Test that created objects can be checked and read back, and that
+        a host in use by a domain cannot be deleted"""
+        with less_console_noise():
+            sock = self.connect()
+            self.send(sock, LOGIN)
+
+            name = self.send(sock, CHECK_DOMAIN).find(f".//{{{NS['domain']}}}name")
+            self.assertEqual(name.get("avail"), "1")
+
+            # the domain cannot refer to a host which does not exist yet
+            self.assertEqual(self.code(self.send(sock, CREATE_DOMAIN)), 2303)
+            self.assertEqual(self.code(self.send(sock, CREATE_HOST)), 1000)
+            self.assertEqual(self.code(self.send(sock, CREATE_DOMAIN)), 1000)
+            self.assertEqual(self.code(self.send(sock, CREATE_DOMAIN)), 2302)
+
+            name = self.send(sock, CHECK_DOMAIN).find(f".//{{{NS['domain']}}}name")
+            self.assertEqual(name.get("avail"), "0")
+            info = self.send(sock, INFO_DOMAIN)
+            self.assertEqual(info.findtext(f".//{{{NS['domain']}}}hostObj"), "ns1.igorville.gov")
+            self.assertEqual(info.findtext(f".//{{{NS['domain']}}}pw"), "2fooBAR123fooBaz")
+
+            self.assertEqual(self.code(self.send(sock, DELETE_HOST)), 2305)
+
+    def test_injected_failures(self):
+        """Test that failures are injected at the configured rates"""
+        with less_console_noise():
+            sock = self.connect(failure_rate=1.0)
+            self.assertEqual(self.code(self.send(sock, LOGIN)), 2400)
+
+            sock = self.connect(drop_rate=1.0)
+            self.assertIsNone(self.send(sock, LOGIN))
+
+    def test_session_limit(self):
+        """Test that logins beyond the session limit are refused and disconnected"""
+        with less_console_noise():
+            first = self.connect(session_limit=1)
+            self.assertEqual(self.code(self.send(first, LOGIN)), 1000)
+
+            second = socket.create_connection(("127.0.0.1", self.server.server_port), timeout=5)
+            self.addCleanup(second.close)
+            self.receive(second)
+            self.assertEqual(self.code(self.send(second, LOGIN)), 2502)
+            self.assertIsNone(self.receive(second))
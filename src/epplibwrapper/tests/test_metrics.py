@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock
+from django.test import TestCase
+from epplibwrapper.metrics import CommandEvent, Histogram, RegistryMetrics
+from .common import less_console_noise
+
+
+class TestRegistryMetrics(TestCase):
+    """Test the recording of registry command metrics"""
+
+    def test_histogram_buckets_values(self):
+        """Test that values are counted in the first bucket they fit in"""
+        histogram = Histogram()
+        histogram.observe(0.003)
+        histogram.observe(0.2)
+        histogram.observe(60)
+
+        result = histogram.as_dict()
+        self.assertEqual(result["count"], 3)
+        self.assertEqual(result["buckets"]["0.005"], 1)
+        self.assertEqual(result["buckets"]["0.25"], 1)
+        self.assertEqual(result["buckets"]["+Inf"], 1)
+
+    def test_record_totals_by_command_type(self):
+        """Test that events are totalled per command type and result"""
+        metrics = RegistryMetrics()
+        metrics.record(CommandEvent(command="InfoDomain", code=1000, wire_time=0.1))
+        metrics.record(CommandEvent(command="InfoDomain", code=2303, retries=1, reconnects=1))
+        metrics.record(CommandEvent(command="InfoDomain", fast_failed=True, code=0))
+        metrics.record(CommandEvent(command="CheckDomain", code=None))
+
+        commands = metrics.snapshot()["commands"]
+        self.assertEqual(commands["InfoDomain"]["count"], 3)
+        self.assertEqual(commands["InfoDomain"]["results"], {"1000": 1, "2303": 1, "fast_failed": 1})
+        self.assertEqual(commands["InfoDomain"]["retries"], 1)
+        self.assertEqual(commands["InfoDomain"]["reconnects"], 1)
+        self.assertEqual(commands["CheckDomain"]["results"], {"error": 1})
+
+    def test_hook_receives_events_and_errors_are_ignored(self):
+        """Test that the hook is called with each event, and that a failing hook does not lose the event"""
+        with less_console_noise():
+            hook = MagicMock(side_effect=Exception("metrics service is down"))
+            metrics = RegistryMetrics(hook=hook)
+            event = CommandEvent(command="InfoDomain", code=1000)
+            metrics.record(event)
+
+            hook.assert_called_once_with(event)
+            self.assertEqual(metrics.snapshot()["commands"]["InfoDomain"]["count"], 1)
@@ -0,0 +1,117 @@
+import gevent
+from django.test import TestCase
+from epplibwrapper.errors import ErrorCode, RegistryError
+from epplibwrapper.pool import EPPConnectionPool, EPPSession, Priority
+from .common import less_console_noise
+
+
+class TestConnectionPool(TestCase):
+    """Test the pool of registry sessions"""
+
+    def test_invalid_sizes_raise(self):
+        """Test that a pool cannot be created with nonsensical sizes"""
+        with self.assertRaises(ValueError):
+            EPPConnectionPool(min_size=0, max_size=0)
+        with self.assertRaises(ValueError):
+            EPPConnectionPool(min_size=3, max_size=2)
+
+    def test_checkout_grows_pool_up_to_max_size(self):
+        """Test that new sessions are created on demand until max_size is reached"""
+        pool = EPPConnectionPool(min_size=0, max_size=2, timeout=0.01)
+        first = pool.checkout()
+        second = pool.checkout()
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(pool.in_use, 2)
+
+    def test_checkout_times_out_when_pool_exhausted(self):
+        """Test that checkout raises a transport error when no session frees up in time"""
+        with less_console_noise():
+            pool = EPPConnectionPool(min_size=0, max_size=1, timeout=0.01)
+            pool.checkout()
+            with self.assertRaises(RegistryError) as context:
+                pool.checkout()
+            self.assertEqual(context.exception.code, ErrorCode.TRANSPORT_ERROR)
+            self.assertTrue(context.exception.is_transport_error())
+
+    def test_checkout_waits_for_checkin(self):
+        """Test that a waiting caller is handed the session another caller returns"""
+        pool = EPPConnectionPool(min_size=0, max_size=1, timeout=1)
+        session = pool.checkout()
+        waiter = gevent.spawn(pool.checkout)
+        gevent.sleep(0)
+        pool.checkin(session)
+        self.assertIs(waiter.get(timeout=1), session)
+        self.assertEqual(pool.size, 1)
+
+    def test_checkout_prefers_healthy_sessions(self):
+        """Test that a healthy idle session is handed out before an unhealthy one"""
+        pool = EPPConnectionPool(min_size=2, max_size=2)
+        healthy = EPPSession()
+        healthy.mark_connected()
+        unhealthy = EPPSession()
+        pool.add(healthy)
+        pool.add(unhealthy)
+        self.assertIs(pool.checkout(), healthy)
+        self.assertIs(pool.checkout(), unhealthy)
+
+    def test_add_refuses_sessions_beyond_max_size(self):
+        """Test that the pool never owns more than max_size sessions"""
+        pool = EPPConnectionPool(min_size=1, max_size=1)
+        pool.add(EPPSession())
+        with self.assertRaises(ValueError):
+            pool.add(EPPSession())
+
+    def test_take_only_takes_idle_sessions(self):
+        """Test that a specific session can be taken while idle, but not while in use"""
+        pool = EPPConnectionPool(min_size=1, max_size=1)
+        session = EPPSession()
+        pool.add(session)
+        self.assertTrue(pool.take(session))
+        self.assertFalse(pool.take(session))
+        pool.checkin(session)
+        self.assertTrue(pool.take(session))
+
+    def test_returned_session_goes_to_highest_priority_waiter(self):
+        """Test that interactive callers are served before admin and batch callers
+        which have been waiting longer"""
+        pool = EPPConnectionPool(min_size=0, max_size=1, timeout=1)
+        session = pool.checkout()
+        served = []
+
+        def wait_for_session(priority):
+            pool.checkout(priority=priority)
+            served.append(priority)
+
+        waiters = [gevent.spawn(wait_for_session, priority) for priority in reversed(Priority)]
+        gevent.sleep(0)
+        self.assertEqual(pool.waiting(), {"interactive": 1, "admin": 1, "batch": 1})
+
+        pool.checkin(session)
+        gevent.sleep(0)
+        self.assertEqual(served, [Priority.INTERACTIVE])
+        gevent.killall(waiters)
+
+    def test_batch_callers_are_capped(self):
+        """Test that batch callers cannot take more than their share of sessions,
+        while interactive callers can take the rest"""
+        with less_console_noise():
+            pool = EPPConnectionPool(min_size=0, max_size=4, timeout=0.01, batch_share=0.5)
+            pool.checkout(priority=Priority.BATCH)
+            pool.checkout(priority=Priority.BATCH)
+            with self.assertRaises(RegistryError):
+                pool.checkout(priority=Priority.BATCH)
+            pool.checkout(priority=Priority.INTERACTIVE)
+            pool.checkout(priority=Priority.INTERACTIVE)
+            self.assertEqual(pool.in_use, 4)
+
+    def test_timed_out_waiter_leaves_queue(self):
+        """Test that a caller which gives up waiting is not handed a session later"""
+        with less_console_noise():
+            pool = EPPConnectionPool(min_size=0, max_size=1, timeout=0.01)
+            session = pool.checkout()
+            with self.assertRaises(RegistryError):
+                pool.checkout(priority=Priority.ADMIN)
+            self.assertEqual(pool.waiting()["admin"], 0)
+            pool.checkin(session)
+            self.assertIs(pool.checkout(priority=Priority.BATCH), session)
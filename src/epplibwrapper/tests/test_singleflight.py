@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from unittest.mock import MagicMock
+
+import gevent
+from gevent.event import Event
+from django.test import TestCase
+from epplibwrapper.errors import RegistryError
+from epplibwrapper.singleflight import SingleFlight
+from .common import less_console_noise
+
+
+@dataclass
+class InfoDomain:
+    """Stands in for epplib's InfoDomain, which single flight recognizes by name"""
+
+    name: str
+
+
+@dataclass
+class UpdateDomain:
+    """Stands in for epplib's UpdateDomain"""
+
+    name: str
+
+
+class TestSingleFlight(TestCase):
+    """Test the coalescing of identical registry reads"""
+
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.release = Event()
+
+    def slow_send(self, response):
+        """A send which waits until the test releases it, then returns `response`"""
+
+        def send(command):
+            self.release.wait()
+            return response
+
+        return MagicMock(side_effect=send)
+
+    def test_identical_reads_share_one_request(self):
+        """Test that concurrent identical reads send once, and every caller gets the response"""
+        send = self.slow_send({"name": "igorville.gov"})
+        greenlets = [gevent.spawn(self.single_flight.do, InfoDomain("igorville.gov"), send) for _ in range(3)]
+        gevent.sleep(0)
+        self.release.set()
+        gevent.joinall(greenlets, raise_error=True)
+
+        send.assert_called_once()
+        for greenlet in greenlets:
+            self.assertEqual(greenlet.value, {"name": "igorville.gov"})
+        # followers get copies, so they cannot change what the leader was given
+        self.assertIsNot(greenlets[0].value, greenlets[1].value)
+        self.assertEqual(self.single_flight._calls, {})
+
+    def test_different_reads_are_not_coalesced(self):
+        """Test that reads of different objects are sent separately"""
+        send = self.slow_send({})
+        greenlets = [
+            gevent.spawn(self.single_flight.do, InfoDomain("igorville.gov"), send),
+            gevent.spawn(self.single_flight.do, InfoDomain("city.gov"), send),
+        ]
+        gevent.sleep(0)
+        self.release.set()
+        gevent.joinall(greenlets, raise_error=True)
+        self.assertEqual(send.call_count, 2)
+
+    def test_writes_are_not_coalesced(self):
+        """Test that commands which change the registry are always sent"""
+        send = self.slow_send({})
+        greenlets = [gevent.spawn(self.single_flight.do, UpdateDomain("igorville.gov"), send) for _ in range(2)]
+        gevent.sleep(0)
+        self.release.set()
+        gevent.joinall(greenlets, raise_error=True)
+        self.assertEqual(send.call_count, 2)
+
+    def test_error_is_raised_to_every_caller(self):
+        """Test that the leader's error reaches the callers waiting on it,
+        and that the next read is sent afresh"""
+        with less_console_noise():
+
+            def send(command):
+                self.release.wait()
+                raise RegistryError("Object does not exist", code=2303)
+
+            greenlets = [gevent.spawn(self.single_flight.do, InfoDomain("igorville.gov"), send) for _ in range(2)]
+            gevent.sleep(0)
+            self.release.set()
+            gevent.joinall(greenlets)
+
+            for greenlet in greenlets:
+                self.assertIsInstance(greenlet.exception, RegistryError)
+            self.assertEqual(self.single_flight._calls, {})
+            self.assertEqual(self.single_flight.do(InfoDomain("igorville.gov"), lambda command: "ok"), "ok")
@@ -0,0 +1,27 @@
+"""Gunicorn hooks. Gunicorn reads this file from its working directory (see run.sh)."""
+
+import logging
+
+import gevent
+
+logger = logging.getLogger(__name__)
+
+
+def post_worker_init(worker):
+    """Once a worker has loaded the app, connect to the registry and the login
+    provider in the background, so that the worker's first requests need not
+    wait on them. Skipped if WARM_UP_CLIENTS is False."""
+    from django.conf import settings
+
+    if not settings.WARM_UP_CLIENTS:
+        return
+
+    from djangooidc.views import warm_up as warm_up_oidc
+
+    gevent.spawn(warm_up_oidc)
+    try:
+        from epplibwrapper import CLIENT as registry
+    except ImportError:
+        logger.warning("Unable to warm up the registry client, which failed to configure.")
+    else:
+        gevent.spawn(registry.warm_up)
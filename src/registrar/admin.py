@@ -14,6 +14,7 @@ from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
 from dateutil.relativedelta import relativedelta  # type: ignore
+from epplibwrapper import CLIENT as registry, Priority
 from epplibwrapper.errors import ErrorCode, RegistryError
 from waffle.admin import FlagAdmin
 from waffle.models import Sample, Switch
@@ -1945,10 +1946,12 @@ class DomainAdmin(ListHeaderAdmin, ImportExportModelAdmin):
             "_extend_expiration_date": self.do_extend_expiration_date,
         }
 
-        # Check which action button was pressed and call the corresponding function
+        # Check which action button was pressed and call the corresponding function.
+        # Registry commands from the admin site wait behind registrants' requests
         for action, function in ACTION_FUNCTIONS.items():
             if action in request.POST:
-                return function(request, obj)
+                with registry.priority(Priority.ADMIN):
+                    return function(request, obj)
 
         # If no matching action button is found, return the super method
         return super().response_change(request, obj)
@@ -2088,6 +2091,8 @@ class DomainAdmin(ListHeaderAdmin, ImportExportModelAdmin):
 
     def do_get_status(self, request, obj):
         try:
+            # analysts asking for the status want the registry's current answer
+            obj._invalidate_shared_cache()
             statuses = obj.statuses
         except Exception as err:
             self.message_user(request, err, messages.ERROR)
@@ -71,13 +71,16 @@ function debounce(handler, cooldown=600) {
   }
 }
 
-/** Asyncronously fetches JSON. No error handling. */
-function fetchJSON(endpoint, callback, url="/api/v1/") {
+/**
+ * Asyncronously fetches JSON. No error handling.
+ * Responses with a status other than those in `statuses` are dropped.
+ */
+function fetchJSON(endpoint, callback, url="/api/v1/", statuses=[200]) {
     const xhr = new XMLHttpRequest();
     xhr.open('GET', url + endpoint);
     xhr.send();
     xhr.onload = function() {
-      if (xhr.status != 200) return;
+      if (!statuses.includes(xhr.status)) return;
       callback(JSON.parse(xhr.response));
     };
     // nothing, don't care
@@ -132,6 +135,12 @@ function inlineToast(el, id, style, msg) {
 
 function checkDomainAvailability(el) {
   const callback = (response) => {
+    if (response.code == "limited") {
+      // checked too quickly (429): say so, without judging what was typed
+      announce(el.id, response.message);
+      inlineToast(el.parentElement, el.id, WARNING, response.message);
+      return;
+    }
     toggleInputValidity(el, (response && response.available), msg=response.message);
     announce(el.id, response.message);
 
@@ -151,7 +160,8 @@ function checkDomainAvailability(el) {
       inlineToast(el.parentElement, el.id, ERROR, response.message);
     }
   }
-  fetchJSON(`available/?domain=${el.value}`, callback);
+  // a 409 means a newer check of this field was made, so only its answer is shown
+  fetchJSON(`available/?domain=${el.value}&field=${el.id}`, callback, "/api/v1/", [200, 429]);
 }
 
 /** Hides the toast message and clears the aira live region. */
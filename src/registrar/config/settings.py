@@ -60,6 +60,29 @@ env_log_level = env.str("DJANGO_LOG_LEVEL", "DEBUG")
 env_base_url = env.str("DJANGO_BASE_URL")
 env_getgov_public_site_url = env.str("GETGOV_PUBLIC_SITE_URL", "")
 env_oidc_active_provider = env.str("OIDC_ACTIVE_PROVIDER", "identity sandbox")
+env_registry_port = env.int("REGISTRY_PORT", 700)
+env_registry_pool_min_size = env.int("REGISTRY_POOL_MIN_SIZE", 1)
+env_registry_pool_max_size = env.int("REGISTRY_POOL_MAX_SIZE", 3)
+env_registry_pool_checkout_timeout = env.float("REGISTRY_POOL_CHECKOUT_TIMEOUT", 10)
+env_registry_pool_batch_share = env.float("REGISTRY_POOL_BATCH_SHARE", 0.5)
+env_registry_keepalive_interval = env.float("REGISTRY_KEEPALIVE_INTERVAL", 30)
+env_registry_keepalive_idle = env.float("REGISTRY_KEEPALIVE_IDLE", 240)
+env_registry_session_max_age = env.float("REGISTRY_SESSION_MAX_AGE", 3600)
+env_registry_info_cache_ttl = env.float("REGISTRY_INFO_CACHE_TTL", 60)
+env_registry_info_cache_alias = env.str("REGISTRY_INFO_CACHE_ALIAS", "")
+env_registry_breaker_threshold = env.int("REGISTRY_BREAKER_THRESHOLD", 5)
+env_registry_breaker_reset_timeout = env.float("REGISTRY_BREAKER_RESET_TIMEOUT", 30)
+env_registry_metrics_hook = env.str("REGISTRY_METRICS_HOOK", "")
+env_registry_check_batch_size = env.int("REGISTRY_CHECK_BATCH_SIZE", 10)
+env_warm_up_clients = env.bool("WARM_UP_CLIENTS", default=True)
+env_registry_snapshot_max_age = env.float("REGISTRY_SNAPSHOT_MAX_AGE", 120)
+env_registered_name_index_ttl = env.float("REGISTERED_NAME_INDEX_TTL", 300)
+env_availability_cache_taken_ttl = env.float("AVAILABILITY_CACHE_TAKEN_TTL", 600)
+env_availability_cache_available_ttl = env.float("AVAILABILITY_CACHE_AVAILABLE_TTL", 30)
+env_availability_rate_limit = env.float("AVAILABILITY_RATE_LIMIT", 2)
+env_availability_rate_burst = env.float("AVAILABILITY_RATE_BURST", 10)
+env_availability_max_wait = env.float("AVAILABILITY_MAX_WAIT", 2)
+env_availability_proxy_hops = env.int("AVAILABILITY_PROXY_HOPS", 2)
 
 secret_login_key = b64decode(secret("DJANGO_SECRET_LOGIN_KEY", ""))
 secret_key = secret("DJANGO_SECRET_KEY")
@@ -628,6 +651,93 @@ SECRET_REGISTRY_CERT = secret_registry_cert
 SECRET_REGISTRY_KEY = secret_registry_key
 SECRET_REGISTRY_KEY_PASSPHRASE = secret_registry_key_passphrase
 SECRET_REGISTRY_HOSTNAME = secret_registry_hostname
+# EPP's well known port. Override to use a fake registry (see run_fake_registry)
+REGISTRY_PORT = env_registry_port
+
+# Each process keeps a pool of logged-in registry sessions so that commands
+# from different requests do not wait on one another. MIN_SIZE sessions are
+# opened when a worker starts (see WARM_UP_CLIENTS) and more are opened on
+# demand, up to MAX_SIZE.
+# Mind the registry's limit on concurrent sessions: every gunicorn worker
+# has its own pool.
+REGISTRY_POOL_MIN_SIZE = env_registry_pool_min_size
+REGISTRY_POOL_MAX_SIZE = env_registry_pool_max_size
+# Seconds to wait for a free session before failing with a connection error
+REGISTRY_POOL_CHECKOUT_TIMEOUT = env_registry_pool_checkout_timeout
+# Sessions go to waiting interactive commands first, then admin commands, then
+# batch commands (see EPPLibWrapper.priority). Batch commands may use at most
+# this share of the sessions at once, and always at least one.
+REGISTRY_POOL_BATCH_SHARE = env_registry_pool_batch_share
+
+# A background greenlet checks idle sessions every INTERVAL seconds (0 turns
+# it off). It reconnects broken sessions, sends a hello on sessions idle for
+# KEEPALIVE_IDLE seconds (keep this below the registry's idle timeout) and
+# logs in afresh on sessions older than SESSION_MAX_AGE seconds.
+REGISTRY_KEEPALIVE_INTERVAL = env_registry_keepalive_interval
+REGISTRY_KEEPALIVE_IDLE = env_registry_keepalive_idle
+REGISTRY_SESSION_MAX_AGE = env_registry_session_max_age
+
+# InfoDomain, InfoContact and InfoHost responses are cached for TTL seconds
+# (0 turns the cache off) and dropped whenever we change the object.
+# They are kept in each process's memory, or if ALIAS is set, in the Django
+# cache it names, so that all workers see the same entries. That can't be a
+# database cache, as the entries are pickled epplib objects.
+REGISTRY_INFO_CACHE_TTL = env_registry_info_cache_ttl
+REGISTRY_INFO_CACHE_ALIAS = env_registry_info_cache_alias
+
+# After THRESHOLD commands in a row fail to reach the registry (0 turns this
+# off), commands fail at once with a connection error instead of waiting on
+# the registry. After RESET_TIMEOUT seconds a single command is let through
+# to find out whether the registry is back.
+REGISTRY_BREAKER_THRESHOLD = env_registry_breaker_threshold
+REGISTRY_BREAKER_RESET_TIMEOUT = env_registry_breaker_reset_timeout
+
+# Every command sent to the registry is timed and counted; see /admin/registry/metrics/.
+# HOOK is the dotted path of a callable which is also given each
+# epplibwrapper.metrics.CommandEvent, to forward them to a metrics service.
+REGISTRY_METRICS_HOOK = env_registry_metrics_hook
+
+# Most domain names the registry accepts in one CheckDomain command.
+# Longer lists are split into several commands, sent at the same time.
+REGISTRY_CHECK_BATCH_SIZE = env_registry_check_batch_size
+
+# The info fetched from the registry about a domain is kept in the database
+# (see DomainRegistrySnapshot) and read by every request and worker until it
+# is MAX_AGE seconds old (0 turns this off). Changing a domain discards it.
+REGISTRY_SNAPSHOT_MAX_AGE = env_registry_snapshot_max_age
+
+# Each process keeps the names of the domains in the database in memory, so that
+# checking the availability of a name we already hold doesn't contact the registry.
+# Saving or deleting a domain updates the process which did it; every process
+# reloads the names when they are TTL seconds old (0 turns this off).
+REGISTERED_NAME_INDEX_TTL = env_registered_name_index_ttl
+
+# Each process remembers the registry's answers about whether names are available
+# (see registrar/models/utility/availability_cache.py): names which were taken for
+# TAKEN_TTL seconds, and names which were available for AVAILABLE_TTL seconds.
+# 0 turns either off.
+AVAILABILITY_CACHE_TAKEN_TTL = env_availability_cache_taken_ttl
+AVAILABILITY_CACHE_AVAILABLE_TTL = env_availability_cache_available_ttl
+
+# Each client may check the availability of domains through the API in bursts
+# of up to RATE_BURST registry commands, refilled at RATE_LIMIT commands a second
+# (0 turns this off). A check which is over the limit waits for up to MAX_WAIT
+# seconds, and is dropped if a newer check for the same field comes in meanwhile.
+AVAILABILITY_RATE_LIMIT = env_availability_rate_limit
+AVAILABILITY_RATE_BURST = env_availability_rate_burst
+AVAILABILITY_MAX_WAIT = env_availability_max_wait
+
+# Clients who aren't logged in are told apart by their address, which is the
+# PROXY_HOPS-th entry from the end of X-Forwarded-For, as each proxy in front
+# of us appends the address it received the request from. On cloud.gov there
+# are two: the load balancer appends the client's, then the gorouter the load
+# balancer's. Entries before those were sent by the client, so can't be trusted.
+AVAILABILITY_PROXY_HOPS = env_availability_proxy_hops
+
+# Neither the registry client nor the OpenID Connect client connects when it is
+# imported. If this is True, gunicorn workers connect both in the background
+# once they start (see gunicorn.conf.py); otherwise they connect on first use.
+WARM_UP_CLIENTS = env_warm_up_clients
 
 # endregion
 # region: Security and Privacy----------------------------------------------###
@@ -18,11 +18,12 @@ from registrar.views.admin_views import (
     ExportDataType,
     ExportDataUnmanagedDomains,
     AnalyticsView,
+    RegistryMetricsView,
 )
 
 from registrar.views.domain_request import Step
 from registrar.views.utility import always_404
-from api.views import available, get_current_federal, get_current_full
+from api.views import available, available_batch, get_current_federal, get_current_full
 
 
 DOMAIN_REQUEST_NAMESPACE = views.DomainRequestWizard.URL_NAMESPACE
@@ -99,6 +100,11 @@ urlpatterns = [
         AnalyticsView.as_view(),
         name="analytics",
     ),
+    path(
+        "admin/registry/metrics/",
+        admin.site.admin_view(RegistryMetricsView.as_view()),
+        name="registry_metrics",
+    ),
     path("admin/", admin.site.urls),
     path(
         "domain-request/<id>/edit/",
@@ -124,6 +130,7 @@ urlpatterns = [
     path("openid/", include("djangooidc.urls")),
     path("request/", include((domain_request_urls, DOMAIN_REQUEST_NAMESPACE))),
     path("api/v1/available/", available, name="available"),
+    path("api/v1/available/batch", available_batch, name="available-batch"),
     path("api/v1/get-report/current-federal", get_current_federal, name="get-current-federal"),
     path("api/v1/get-report/current-full", get_current_full, name="get-current-full"),
     path(
@@ -16,6 +16,7 @@ from registrar.forms.utility.wizard_form_helper import (
 from registrar.models import Contact, DomainRequest, DraftDomain, Domain, FederalAgency
 from registrar.templatetags.url_helpers import public_site_url
 from registrar.utility.enums import ValidationReturnType
+from epplibwrapper.errors import RegistryError
 
 logger = logging.getLogger(__name__)
 
@@ -271,6 +272,9 @@ CurrentSitesFormSet = forms.formset_factory(
 
 
 class AlternativeDomainForm(RegistrarForm):
+    # availability of the formset's domains, looked up together by the formset
+    availability: dict[str, bool] | None = None
+
     def clean_alternative_domain(self):
         """Validation code for domain names."""
         requested = self.cleaned_data.get("alternative_domain", None)
@@ -278,6 +282,7 @@ class AlternativeDomainForm(RegistrarForm):
             domain=requested,
             return_type=ValidationReturnType.FORM_VALIDATION_ERROR,
             blank_ok=True,
+            availability=self.availability,
         )
         return validated
 
@@ -290,6 +295,34 @@ class AlternativeDomainForm(RegistrarForm):
 class BaseAlternativeDomainFormSet(RegistrarFormSet):
     JOIN = "alternative_domains"
 
+    def full_clean(self):
+        """Check the availability of all the alternative domains in one go
+        before the forms are validated, rather than once per form."""
+        if self.is_bound:
+            availability = self._check_availability()
+            for form in self.forms:
+                form.availability = availability
+        super().full_clean()
+
+    def _check_availability(self):
+        """Return the availability of the submitted domains which are valid.
+        Returns an empty dict if the registry cannot be reached, leaving the
+        forms to look up (and report errors for) their own domain."""
+        domains = []
+        for form in self.forms:
+            try:
+                domain = DraftDomain._validate_domain_string(
+                    form.data.get(form.add_prefix("alternative_domain")), blank_ok=True
+                )
+            except ValueError:
+                continue
+            if domain:
+                domains.append(f"{domain}.gov")
+        try:
+            return Domain.available_many(domains)
+        except RegistryError:
+            return {}
+
     def should_delete(self, cleaned):
         domain = cleaned.get("alternative_domain", "")
         return domain.strip() == ""
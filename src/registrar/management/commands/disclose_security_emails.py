@@ -8,6 +8,7 @@ import logging
 import copy
 
 from django.core.management import BaseCommand
+from epplibwrapper import CLIENT as registry, Priority
 from registrar.models import Domain
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,8 @@ class Command(BaseCommand):
         # domains that skip disclose due to having contact registrar@dotgov.gov
         self.skipped_domain_contacts_count = 0
 
+    # send registry commands as batch traffic, so that they wait behind registrants
+    @registry.priority(Priority.BATCH)
     def handle(self, **options):
         """
         Converts all ready and DNS needed domains with a non-default public contact
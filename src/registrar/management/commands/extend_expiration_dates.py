@@ -5,6 +5,7 @@ from datetime import date
 import logging
 
 from django.core.management import BaseCommand
+from epplibwrapper import CLIENT as registry, Priority
 from epplibwrapper.errors import RegistryError
 from registrar.models import Domain
 from registrar.management.commands.utility.terminal_helper import TerminalColors, TerminalHelper
@@ -51,6 +52,8 @@ class Command(BaseCommand):
         )
         parser.add_argument("--debug", action=argparse.BooleanOptionalAction, help="Increases log chattiness")
 
+    # send registry commands as batch traffic, so that they wait behind registrants
+    @registry.priority(Priority.BATCH)
     def handle(self, **options):
         """
         Extends the expiration dates for valid domains.
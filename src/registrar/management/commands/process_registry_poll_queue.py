@@ -0,0 +1,106 @@
+"""Keep local domains in sync with the registry by reading its poll message queue."""
+
+import logging
+import re
+import time
+
+from django.core.management import BaseCommand
+
+from epplibwrapper import CLIENT as registry, commands, ErrorCode, Priority, RegistryError
+from registrar.models import Domain, Host, PublicContact
+
+logger = logging.getLogger(__name__)
+
+# domain names mentioned in the text of a poll message
+DOMAIN_NAME_PATTERN = re.compile(r"\b(?:[a-z0-9-]+\.)+gov\b", re.IGNORECASE)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reads messages from the registry's poll queue and refreshes the domains they refer to, "
+        "acknowledging each message once its domains are up to date. "
+        "Runs until stopped, waiting --interval seconds whenever the queue is empty."
+    )
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            "--interval", type=float, default=60, help="Seconds to wait before polling again once the queue is empty"
+        )
+        parser.add_argument("--once", action="store_true", help="Stop once the queue is empty")
+        parser.add_argument("--limit", type=int, default=0, help="Stop after this many messages (0 for no limit)")
+
+    # send registry commands as batch traffic, so that they wait behind registrants
+    @registry.priority(Priority.BATCH)
+    def handle(self, **options):
+        processed = 0
+        while True:
+            remaining = options["limit"] - processed if options["limit"] else None
+            try:
+                processed += self.drain_queue(remaining)
+            except RegistryError as err:
+                # the message which failed stays on the queue, to be tried again
+                logger.error(f"Could not process the registry's poll queue: {err}")
+            if options["once"] or (options["limit"] and processed >= options["limit"]):
+                break
+            time.sleep(options["interval"])
+
+        logger.info(f"Processed {processed} poll messages")
+
+    def drain_queue(self, limit=None) -> int:
+        """Process messages until the queue is empty, or until `limit` messages are
+        processed. Returns the number of messages processed."""
+        processed = 0
+        while limit is None or processed < limit:
+            response = registry.send(commands.PollRequest(), cleaned=True)
+            message = getattr(response, "msg_q", None)
+            if response.code == ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY_NO_MESSAGES or message is None:
+                break
+
+            self.process_message(response, message)
+            registry.send(commands.PollAcknowledgement(msg_id=message.id), cleaned=True)
+            processed += 1
+        return processed
+
+    def process_message(self, response, message):
+        """Refresh every domain the message refers to.
+
+        Raises RegistryError if the registry can't be reached, so that the message
+        is not acknowledged and is tried again. Any other error (such as a domain
+        which is no longer in the registry) won't go away by trying again, so it
+        is logged and the message is acknowledged, leaving later messages free
+        to be read."""
+        domains = self.find_domains(self.referenced_names(response, message))
+        logger.info(f"Poll message {message.id} refers to {[domain.name for domain in domains]}")
+        for domain in domains:
+            try:
+                domain.refresh_from_registry()
+            except RegistryError as err:
+                if err.is_connection_error():
+                    raise
+                logger.error(f"Could not refresh {domain.name} for poll message {message.id}: {err}")
+
+    def referenced_names(self, response, message) -> set[str]:
+        """The names and ids of registry objects which a poll message mentions: the
+        name or id of each object in its data, and the domain names in its text."""
+        names = set()
+        for data in response.res_data or []:
+            for attribute in ("name", "id"):
+                value = getattr(data, attribute, None)
+                if isinstance(value, str):
+                    names.add(value)
+        names.update(DOMAIN_NAME_PATTERN.findall(getattr(message, "msg", None) or ""))
+        return names
+
+    def find_domains(self, names: set[str]) -> list[Domain]:
+        """The local domains which are named, or which use a named host or contact.
+        Domains which are not yet (or no longer) in the registry are left out."""
+        lowered = {name.lower() for name in names}
+        domain_ids = set(Domain.objects.filter(name__in=lowered).values_list("id", flat=True))
+        domain_ids.update(Host.objects.filter(name__in=lowered).values_list("domain_id", flat=True))
+        domain_ids.update(PublicContact.objects.filter(registry_id__in=names).values_list("domain_id", flat=True))
+        return list(
+            Domain.objects.filter(id__in=domain_ids)
+            .exclude(state__in=[Domain.State.UNKNOWN, Domain.State.DELETED])
+            .order_by("name")
+        )
@@ -0,0 +1,191 @@
+"""Sweep domains through the registry, fixing what has drifted from it in our database."""
+
+import logging
+import time
+from collections import Counter
+from datetime import date
+
+from auditlog.models import LogEntry  # type: ignore
+from django.core.management import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from epplibwrapper import CLIENT as registry, commands, ErrorCode, Priority, RegistryError
+from registrar.models import Domain, DomainRegistrySnapshot, Host
+
+logger = logging.getLogger(__name__)
+
+HOLD_STATUSES = {Domain.Status.CLIENT_HOLD, Domain.Status.SERVER_HOLD}
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetches each domain's info from the registry, in batches and at no more than --rate "
+        "commands a second, and records where our database has drifted from it. "
+        "Expiration dates are fixed in bulk; domains whose nameservers drifted are refreshed. "
+        "Domains checked least recently go first."
+    )
+
+    def __init__(self):
+        """Sets global variables for code tidyness"""
+        super().__init__()
+        self.drift: Counter = Counter()
+        self.checked = 0
+        self.failed: list[str] = []
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument("--rate", type=float, default=5, help="Most registry commands to send a second")
+        parser.add_argument("--batch-size", type=int, default=20, help="Domains to fetch at once")
+        parser.add_argument("--limit", type=int, default=0, help="Most domains to check (0 for all)")
+        parser.add_argument("--dry-run", action="store_true", help="Record drift without fixing it")
+
+    # send registry commands as batch traffic, so that they wait behind registrants
+    @registry.priority(Priority.BATCH)
+    def handle(self, **options):
+        if options["rate"] <= 0:
+            raise CommandError("--rate must be more than 0")
+
+        domain_ids = list(self.prioritized_domains().values_list("id", flat=True))
+        if options["limit"]:
+            domain_ids = domain_ids[: options["limit"]]
+        logger.info(f"Checking {len(domain_ids)} domains against the registry")
+
+        batch_size = max(1, options["batch_size"])
+        for i in range(0, len(domain_ids), batch_size):
+            started = time.monotonic()
+            batch = list(Domain.objects.filter(id__in=domain_ids[i : i + batch_size]))
+            sent = self.reconcile_batch(batch, options["dry_run"])
+            # stay within the rate budget, counting every command the batch sent
+            time.sleep(max(0.0, sent / options["rate"] - (time.monotonic() - started)))
+
+        logger.info(
+            f"Checked {self.checked} domains. Drift found: {dict(self.drift) or 'none'}. "
+            f"Could not check {len(self.failed)} domains: {self.failed}"
+        )
+
+    def prioritized_domains(self):
+        """Domains which should be in the registry, those never checked (or checked
+        longest ago) first and then those expiring soonest."""
+        return Domain.objects.exclude(state__in=[Domain.State.UNKNOWN, Domain.State.DELETED]).order_by(
+            F("registry_snapshot__fetched_at").asc(nulls_first=True),
+            F("expiration_date").asc(nulls_last=True),
+            "id",
+        )
+
+    def reconcile_batch(self, domains: list[Domain], dry_run: bool) -> int:
+        """Fetch every domain in the batch at once and fix what drifted.
+        Returns the number of registry commands sent."""
+        # reconcile against the registry as it is now, not a recently cached answer
+        for domain in domains:
+            registry.info_cache.invalidate("domain", domain.name)
+        requests = [commands.InfoDomain(name=domain.name) for domain in domains]
+        responses = registry.send_many(requests, cleaned=True)
+        sent = len(requests)
+
+        host_names: dict[int, set] = {domain.id: set() for domain in domains}
+        for domain_id, name in Host.objects.filter(domain__in=domains).values_list("domain_id", "name"):
+            host_names[domain_id].add(name)
+
+        expired = []
+        to_refresh = []
+        for domain, response in zip(domains, responses):
+            if isinstance(response, RegistryError):
+                self.record_error(domain, response)
+                continue
+            self.checked += 1
+            cleaned = domain._clean_cache(domain._extract_data_from_response(response), response)
+            old_expiration_date = domain.expiration_date
+            if self.expiration_date_drifted(domain, cleaned):
+                expired.append((domain, old_expiration_date))
+            if self.hosts_drifted(domain, cleaned, host_names[domain.id]):
+                to_refresh.append(domain)
+            self.check_hold(domain, cleaned)
+            if not dry_run:
+                domain._mark_fetched(cleaned, "core", "dnssec")
+                self.store_snapshot(domain, cleaned)
+
+        if not dry_run:
+            self.save_expiration_dates(expired)
+            sent += self.refresh(to_refresh)
+        return sent
+
+    def save_expiration_dates(self, expired: list[tuple[Domain, date | None]]):
+        """Save the fixed expiration dates in one query. bulk_update skips auditlog's
+        signals, so each change is logged here, as save() would have."""
+        if not expired:
+            return
+        now = timezone.now()
+        with transaction.atomic():
+            for domain, _ in expired:
+                domain.updated_at = now
+            Domain.objects.bulk_update([domain for domain, _ in expired], ["expiration_date", "updated_at"])
+            for domain, old_expiration_date in expired:
+                LogEntry.objects.log_create(
+                    domain,
+                    action=LogEntry.Action.UPDATE,
+                    changes={"expiration_date": [str(old_expiration_date), str(domain.expiration_date)]},
+                )
+
+    def store_snapshot(self, domain: Domain, cleaned: dict):
+        """Record what was fetched, which also marks the domain as checked. Like
+        Domain._save_snapshot, a snapshot which can't be saved is only logged,
+        so that it doesn't stop the rest of the sweep."""
+        try:
+            with transaction.atomic():
+                DomainRegistrySnapshot.store(domain, cleaned)
+        except (DatabaseError, TypeError) as err:
+            logger.warning(f"{domain.name}: couldn't save the registry snapshot: {err}")
+
+    def record_error(self, domain: Domain, error: RegistryError):
+        if error.code == ErrorCode.OBJECT_DOES_NOT_EXIST:
+            self.drift["missing"] += 1
+            logger.warning(f"{domain.name}: in our database as {domain.state}, but not in the registry")
+        else:
+            self.failed.append(domain.name)
+            logger.error(f"{domain.name}: could not fetch from the registry: {error}")
+
+    def expiration_date_drifted(self, domain: Domain, cleaned: dict) -> bool:
+        """Whether the expiration date drifted, setting the registry's on the domain if so."""
+        ex_date = cleaned.get("ex_date")
+        if ex_date is None or ex_date == domain.expiration_date:
+            return False
+        self.drift["expiration_date"] += 1
+        logger.warning(f"{domain.name}: expires {domain.expiration_date} in our database, {ex_date} in the registry")
+        domain.expiration_date = ex_date
+        return True
+
+    def hosts_drifted(self, domain: Domain, cleaned: dict, host_names: set) -> bool:
+        registry_hosts = set(cleaned.get("_hosts", []))
+        if registry_hosts == host_names:
+            return False
+        self.drift["hosts"] += 1
+        logger.warning(
+            f"{domain.name}: nameservers {sorted(host_names)} in our database, {sorted(registry_hosts)} in the registry"
+        )
+        return True
+
+    def check_hold(self, domain: Domain, cleaned: dict):
+        """Record drift between the domain's state and whether the registry holds it.
+        Holds are placed through the registry, so this is left for an analyst to fix."""
+        on_hold = bool(HOLD_STATUSES.intersection(cleaned.get("statuses", [])))
+        if on_hold != (domain.state == Domain.State.ON_HOLD):
+            self.drift["state"] += 1
+            logger.warning(
+                f"{domain.name}: {domain.state} in our database, statuses {cleaned.get('statuses')} in the registry"
+            )
+
+    def refresh(self, domains: list[Domain]) -> int:
+        """Refresh each domain's hosts and contacts from the registry.
+        Returns about how many registry commands this sent."""
+        sent = 0
+        for domain in domains:
+            try:
+                domain.refresh_from_registry()
+            except RegistryError as err:
+                self.failed.append(domain.name)
+                logger.error(f"{domain.name}: could not refresh from the registry: {err}")
+            cache = domain._cache
+            sent += 1 + len(cache.get("_hosts", [])) + len(cache.get("_contacts", []))
+        return sent
@@ -0,0 +1,57 @@
+"""Run a fake EPP registry, for developing and load testing without the real one."""
+
+import logging
+
+from django.core.management import BaseCommand
+
+from epplibwrapper.fake_server import FakeEPPServer
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a fake EPP registry server which keeps domains, contacts and hosts in memory. "
+        "Point REGISTRY_HOSTNAME and REGISTRY_PORT at it. Latency and failures can be injected."
+    )
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+        parser.add_argument("--port", type=int, default=7000, help="Port to listen on")
+        parser.add_argument("--certfile", help="Server certificate, to serve over TLS as the real registry does")
+        parser.add_argument("--keyfile", help="Private key of the server certificate")
+        parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering a command")
+        parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many more seconds to wait")
+        parser.add_argument(
+            "--failure-rate", type=float, default=0.0, help="Share of commands to answer with 2400 Command failed"
+        )
+        parser.add_argument(
+            "--drop-rate", type=float, default=0.0, help="Share of commands to drop the connection on, unanswered"
+        )
+        parser.add_argument("--session-limit", type=int, help="Most sessions which may be logged in at once")
+        parser.add_argument("--idle-timeout", type=float, help="Close connections idle for this many seconds")
+        parser.add_argument("--seed", type=int, help="Seed for the random failures, to repeat a run")
+
+    def handle(self, **options):
+        ssl_args = {}
+        if options["certfile"]:
+            ssl_args = {"certfile": options["certfile"], "keyfile": options["keyfile"]}
+
+        server = FakeEPPServer(
+            (options["host"], options["port"]),
+            latency=options["latency"],
+            jitter=options["jitter"],
+            failure_rate=options["failure_rate"],
+            drop_rate=options["drop_rate"],
+            session_limit=options["session_limit"],
+            idle_timeout=options["idle_timeout"],
+            seed=options["seed"],
+            **ssl_args,
+        )
+        scheme = "TLS" if ssl_args else "plain TCP"
+        logger.info(f"Fake registry listening on {options['host']}:{options['port']} over {scheme}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Fake registry stopped")
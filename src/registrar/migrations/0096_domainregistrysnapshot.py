@@ -0,0 +1,41 @@
+# Generated by Django 4.2.10 on 2026-10-16 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrar", "0095_user_middle_name_user_title"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DomainRegistrySnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("data", models.JSONField(default=dict, help_text="The domain's cache of registry info")),
+                (
+                    "fetched_at",
+                    models.DateTimeField(
+                        help_text="When the domain's InfoDomain response was fetched from the registry"
+                    ),
+                ),
+                (
+                    "domain",
+                    models.OneToOneField(
+                        help_text="Domain whose registry info this is",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="registry_snapshot",
+                        to="registrar.domain",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
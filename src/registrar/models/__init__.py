@@ -3,6 +3,7 @@ from .contact import Contact
 from .domain_request import DomainRequest
 from .domain_information import DomainInformation
 from .domain import Domain
+from .domain_registry_snapshot import DomainRegistrySnapshot
 from .draft_domain import DraftDomain
 from .federal_agency import FederalAgency
 from .host_ip import HostIP
@@ -23,6 +24,7 @@ __all__ = [
     "DomainRequest",
     "DomainInformation",
     "Domain",
+    "DomainRegistrySnapshot",
     "DraftDomain",
     "DomainInvitation",
     "FederalAgency",
@@ -7,7 +7,8 @@ from typing import Optional
 
 from django_fsm import FSMField, transition, TransitionNotAllowed  # type: ignore
 
-from django.db import models
+from django.conf import settings
+from django.db import DatabaseError, models, transaction
 from django.utils import timezone
 from typing import Any
 from registrar.models.host import Host
@@ -33,11 +34,16 @@ from epplibwrapper import (
 
 from registrar.models.utility.contact_error import ContactError, ContactErrorCodes
 
-from django.db.models import DateField, TextField
+from django.db.models import DateField, Q, TextField
 from .utility.domain_field import DomainField
+from .utility.availability_cache import availability_cache
 from .utility.domain_helper import DomainHelper
+from .utility.domain_suggestions import candidate_names
+from .utility.nameserver_change_plan import NameserverChangePlan
+from .utility.registered_name_index import registered_names
 from .utility.time_stamped_model import TimeStampedModel
 
+from .domain_registry_snapshot import DomainRegistrySnapshot
 from .public_contact import PublicContact
 
 logger = logging.getLogger(__name__)
@@ -230,8 +236,68 @@ class Domain(TimeStampedModel, DomainHelper):
             raise errors.InvalidDomainError()
 
         domain_name = domain.lower()
+        known = cls._known_availability([domain_name])
+        if domain_name in known:
+            return known[domain_name]
         req = commands.CheckDomain([domain_name])
-        return registry.send(req, cleaned=True).res_data[0].avail
+        available = registry.send(req, cleaned=True).res_data[0].avail
+        availability_cache.set(domain_name, available)
+        return available
+
+    @classmethod
+    def available_many(cls, domains: list[str]) -> dict[str, bool]:
+        """Check if several domains are available, in as few registry
+        round trips as the registry allows.
+
+        Returns a dict of each domain, lowercased, to whether it is available.
+
+        throws- RegistryError or InvalidDomainError"""
+        for domain in domains:
+            if not cls.string_could_be_domain(domain):
+                logger.warning("Not a valid domain: %s" % str(domain))
+                raise errors.InvalidDomainError()
+
+        # dict.fromkeys drops duplicates but keeps the order
+        domain_names = list(dict.fromkeys(domain.lower() for domain in domains))
+        availability = cls._known_availability(domain_names)
+        unknown = [name for name in domain_names if name not in availability]
+        if unknown:
+            checked = registry.check_domains(unknown, cleaned=True)
+            for name, available in checked.items():
+                availability_cache.set(name, available)
+            availability.update(checked)
+        return {name: availability[name] for name in domain_names}
+
+    @classmethod
+    def suggest_available(cls, domain: str, state: str | None = None, limit: int = 5) -> list[str]:
+        """Suggest up to `limit` available domains like `domain`, for when it
+        is taken (see candidate_names). Adds `state`'s abbreviation to some, if given.
+
+        Candidates known to be taken are left out first, so that the rest can
+        be checked with the registry in one command.
+
+        throws- RegistryError or InvalidDomainError"""
+        if not cls.string_could_be_domain(domain):
+            raise errors.InvalidDomainError()
+
+        candidates = [f"{name}.gov" for name in candidate_names(cls.sld(domain), state)]
+        known = cls._known_availability(candidates)
+        candidates = [name for name in candidates if known.get(name, True)]
+        candidates = candidates[: max(1, settings.REGISTRY_CHECK_BATCH_SIZE)]
+        availability = cls.available_many(candidates)
+        return [name for name in candidates if availability[name]][:limit]
+
+    @classmethod
+    def _known_availability(cls, domain_names: list[str]) -> dict[str, bool]:
+        """The availability of those domains which can be answered without
+        asking the registry: the domains in our database, which are registered,
+        and those in the availability cache."""
+        availability = {}
+        for name in domain_names:
+            available = False if registered_names.is_registered(name) else availability_cache.get(name)
+            if available is not None:
+                availability[name] = available
+        return availability
 
     @classmethod
     def registered(cls, domain: str) -> bool:
@@ -317,6 +383,7 @@ class Domain(TimeStampedModel, DomainHelper):
             self._cache["ex_date"] = registry.send(request, cleaned=True).res_data[0].ex_date
             self.expiration_date = self._cache["ex_date"]
             self.save()
+            self._discard_snapshot()
         except RegistryError as err:
             # if registry error occurs, log the error, and raise it as well
             logger.error(f"registry error renewing domain: {err}")
@@ -367,28 +434,13 @@ class Domain(TimeStampedModel, DomainHelper):
             hostList.append((host["name"], host["addrs"]))
         return hostList
 
-    def _create_host(self, host, addrs):
-        """Creates the host object in the registry
-        doesn't add the created host to the domain
-        returns ErrorCode (int)"""
+    def _create_host_request(self, host, addrs):
+        """Build the command to create the host object in the registry.
+        Doesn't add the created host to the domain."""
         if addrs is not None and addrs != []:
             addresses = [epp.Ip(addr=addr, ip="v6" if self.is_ipv6(addr) else None) for addr in addrs]
-            request = commands.CreateHost(name=host, addrs=addresses)
-        else:
-            request = commands.CreateHost(name=host)
-
-        try:
-            logger.info("_create_host()-> sending req as %s" % request)
-            response = registry.send(request, cleaned=True)
-            return response.code
-        except RegistryError as e:
-            logger.error("Error _create_host, code was %s error was %s" % (e.code, e))
-            # OBJECT_EXISTS is an expected error code that should not raise
-            # an exception, rather return the code to be handled separately
-            if e.code == ErrorCode.OBJECT_EXISTS:
-                return e.code
-            else:
-                raise e
+            return commands.CreateHost(name=host, addrs=addresses)
+        return commands.CreateHost(name=host)
 
     def _convert_list_to_dict(self, listToConvert: list[tuple[str, list]]):
         """converts a list of hosts into a dictionary
@@ -533,37 +585,109 @@ class Domain(TimeStampedModel, DomainHelper):
 
         return (deleted_values, updated_values, new_values, previousHostDict)
 
-    def _update_host_values(self, updated_values, oldNameservers):
-        for hostTuple in updated_values:
-            updated_response_code = self._update_host(hostTuple[0], hostTuple[1], oldNameservers.get(hostTuple[0]))
-            if updated_response_code not in [
-                ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY,
-                ErrorCode.OBJECT_EXISTS,
-            ]:
-                logger.warning("Could not update host %s. Error code was: %s " % (hostTuple[0], updated_response_code))
-
-    def createNewHostList(self, new_values: dict):
-        """convert the dictionary of new values to a list of HostObjSet
-        for use in the UpdateDomain epp message
-        Args:
-            new_values: dict(str,list)- dict of {nameserver:ips} to add to domain
-        Returns:
-            tuple [list[epp.HostObjSet], int]
-            list[epp.HostObjSet]-epp object  for use in the UpdateDomain epp message
-                defaults to empty list
-            int-number of items being created default 0
-        """
+    def plan_nameserver_changes(self, hosts: list[tuple[str, list]]) -> NameserverChangePlan:
+        """Work out the changes which setting the nameservers to hosts would make,
+        without making them. Use this to preview a change.
 
-        hostStringList = []
-        for key, value in new_values.items():
-            createdCode = self._create_host(host=key, addrs=value)  # creates in registry
-            if createdCode == ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY or createdCode == ErrorCode.OBJECT_EXISTS:
-                hostStringList.append(key)
-        if hostStringList == []:
-            return [], 0
+        May fetch the current nameservers from the registry.
+        Throws:
+            NameserverError or ActionNotAllowed, as setting the nameservers would"""
+        if len(hosts) > 13:
+            raise NameserverError(code=nsErrorCodes.TOO_MANY_HOSTS)
 
-        addToDomainObject = epp.HostObjSet(hosts=hostStringList)
-        return [addToDomainObject], len(hostStringList)
+        if self.state not in [
+            self.State.DNS_NEEDED,
+            self.State.READY,
+            self.State.UNKNOWN,
+        ]:
+            raise ActionNotAllowed("Nameservers can not be " "set in the current state")
+
+        # get the changes made by user and old nameserver values
+        (
+            deleted_values,
+            updated_values,
+            new_values,
+            oldNameservers,
+        ) = self.getNameserverChanges(hosts=hosts)
+
+        return NameserverChangePlan(
+            domain=self.name,
+            creates=new_values,
+            updates={name: (ips, oldNameservers.get(name)) for name, ips in updated_values},
+            deletes=deleted_values,
+            previous_count=len(oldNameservers),
+        )
+
+    def _apply_nameserver_plan(self, plan: NameserverChangePlan):
+        """Carry out the plan: see NameserverChangePlan for its steps.
+
+        The domain is only updated once every host it needs has been created,
+        so an error creating a host leaves the domain as it was.
+        Throws:
+            RegistryError or NameserverError"""
+        requests = {}
+        for name, (ips, old_ips) in plan.updates.items():
+            request = self._update_host_request(name, ips, old_ips)
+            if request is None:
+                plan.results[name] = ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY
+            else:
+                requests[name] = request
+        for name, ips in plan.creates.items():
+            requests[name] = self._create_host_request(name, ips)
+        self._send_host_requests(plan, requests)
+
+        succeeded = [ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY, ErrorCode.OBJECT_EXISTS]
+        created = [name for name in plan.creates if plan.results[name] in succeeded]
+
+        addToDomainList = [epp.HostObjSet(hosts=created)] if created else []
+        deleteHostList, deleteCount = self.createDeleteHostList(plan.deletes)
+        responseCode = self.addAndRemoveHostsFromDomain(hostsToAdd=addToDomainList, hostsToDelete=deleteHostList)
+
+        # if unable to update domain raise error and stop
+        if responseCode != ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY:
+            raise NameserverError(code=nsErrorCodes.BAD_DATA)
+
+        self._delete_hosts_if_not_used(hostsToDelete=plan.deletes)
+        self._update_state_for_nameservers(plan.previous_count - deleteCount + len(created))
+
+    def _send_host_requests(self, plan: NameserverChangePlan, requests: dict):
+        """Send the commands to create or update hosts, keyed by host name, all at once,
+        recording their result codes in the plan.
+        Raises the first RegistryError, other than OBJECT_EXISTS, once all are done."""
+        names = list(requests)
+        if not names:
+            return
+        logger.info("_send_host_requests()-> sending reqs as %s" % list(requests.values()))
+        responses = registry.send_many([requests[name] for name in names], cleaned=True)
+
+        failures = []
+        for name, response in zip(names, responses):
+            plan.results[name] = response.code
+            if isinstance(response, RegistryError):
+                logger.error(
+                    "Error sending command for host %s, code was %s error was %s" % (name, response.code, response)
+                )
+                # OBJECT_EXISTS is an expected error code that should not raise
+                # an exception, rather return the code to be handled separately
+                if response.code != ErrorCode.OBJECT_EXISTS:
+                    failures.append(response)
+        if failures:
+            raise failures[0]
+
+    def _update_state_for_nameservers(self, successTotalNameservers: int):
+        """Move the domain to DNS needed or ready, depending on how many nameservers it has."""
+        if successTotalNameservers < 2:
+            try:
+                self.dns_needed()
+                self.save()
+            except Exception as err:
+                logger.info("nameserver setter checked for dns_needed state and it did not succeed. Warning: %s" % err)
+        elif successTotalNameservers >= 2 and successTotalNameservers <= 13:
+            try:
+                self.ready()
+                self.save()
+            except Exception as err:
+                logger.info("nameserver setter checked for create state and it did not succeed. Warning: %s" % err)
 
     def createDeleteHostList(self, hostsToDelete: list[str]):
         """
@@ -679,51 +803,12 @@ class Domain(TimeStampedModel, DomainHelper):
         Fully qualified host name, addresses associated with the host
         example: [(ns1.okay.gov, [127.0.0.1, others ips])]"""
 
-        if len(hosts) > 13:
-            raise NameserverError(code=nsErrorCodes.TOO_MANY_HOSTS)
-
-        if self.state not in [
-            self.State.DNS_NEEDED,
-            self.State.READY,
-            self.State.UNKNOWN,
-        ]:
-            raise ActionNotAllowed("Nameservers can not be " "set in the current state")
-
         logger.info("Setting nameservers")
         logger.info(hosts)
 
-        # get the changes made by user and old nameserver values
-        (
-            deleted_values,
-            updated_values,
-            new_values,
-            oldNameservers,
-        ) = self.getNameserverChanges(hosts=hosts)
-
-        _ = self._update_host_values(updated_values, oldNameservers)  # returns nothing, just need to be run and errors
-        addToDomainList, addToDomainCount = self.createNewHostList(new_values)
-        deleteHostList, deleteCount = self.createDeleteHostList(deleted_values)
-        responseCode = self.addAndRemoveHostsFromDomain(hostsToAdd=addToDomainList, hostsToDelete=deleteHostList)
-
-        # if unable to update domain raise error and stop
-        if responseCode != ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY:
-            raise NameserverError(code=nsErrorCodes.BAD_DATA)
-
-        successTotalNameservers = len(oldNameservers) - deleteCount + addToDomainCount
-
-        self._delete_hosts_if_not_used(hostsToDelete=deleted_values)
-        if successTotalNameservers < 2:
-            try:
-                self.dns_needed()
-                self.save()
-            except Exception as err:
-                logger.info("nameserver setter checked for dns_needed state and it did not succeed. Warning: %s" % err)
-        elif successTotalNameservers >= 2 and successTotalNameservers <= 13:
-            try:
-                self.ready()
-                self.save()
-            except Exception as err:
-                logger.info("nameserver setter checked for create state and it did not succeed. Warning: %s" % err)
+        plan = self.plan_nameserver_changes(hosts)
+        logger.info(plan.summary())
+        self._apply_nameserver_plan(plan)
 
     @Cache
     def statuses(self) -> list[str]:
@@ -1545,27 +1630,14 @@ class Domain(TimeStampedModel, DomainHelper):
                 )
             return err.code
 
-    def _fetch_contacts(self, contact_data):
-        """Fetch contact info."""
-        choices = PublicContact.ContactTypeChoices
-        # We expect that all these fields get populated,
-        # so we can create these early, rather than waiting.
-        contacts_dict = {
-            choices.ADMINISTRATIVE: None,
-            choices.SECURITY: None,
-            choices.TECHNICAL: None,
-        }
-        for domainContact in contact_data:
-            req = commands.InfoContact(id=domainContact.contact)
-            data = registry.send(req, cleaned=True).res_data[0]
-
-            # Map the object we recieved from EPP to a PublicContact
-            mapped_object = self.map_epp_contact_to_public_contact(data, domainContact.contact, domainContact.type)
-
-            # Find/create it in the DB
-            in_db = self._get_or_create_public_contact(mapped_object)
-            contacts_dict[in_db.contact_type] = in_db.registry_id
-        return contacts_dict
+    def _send_many_or_raise(self, requests):
+        """Send independent requests to the registry concurrently.
+        Returns their responses in order, or raises the first RegistryError."""
+        responses = registry.send_many(requests, cleaned=True)
+        for response in responses:
+            if isinstance(response, RegistryError):
+                raise response
+        return responses
 
     def _get_or_create_contact(self, contact: PublicContact):
         """Try to fetch info about a contact. Create it if it does not exist."""
@@ -1596,22 +1668,18 @@ class Domain(TimeStampedModel, DomainHelper):
         ip_addr = ipaddress.ip_address(ip)
         return ip_addr.version == 6
 
-    def _fetch_hosts(self, host_data):
-        """Fetch host info."""
-        hosts = []
-        for name in host_data:
-            req = commands.InfoHost(name=name)
-            data = registry.send(req, cleaned=True).res_data[0]
-            host = {
-                "name": name,
-                "addrs": [item.addr for item in getattr(data, "addrs", [])],
-                "cr_date": getattr(data, "cr_date", ...),
-                "statuses": getattr(data, "statuses", ...),
-                "tr_date": getattr(data, "tr_date", ...),
-                "up_date": getattr(data, "up_date", ...),
-            }
-            hosts.append({k: v for k, v in host.items() if v is not ...})
-        return hosts
+    def _map_epp_host(self, name, response):
+        """Map the response to an InfoHost command to a dict of the host's info."""
+        data = response.res_data[0]
+        host = {
+            "name": name,
+            "addrs": [item.addr for item in getattr(data, "addrs", [])],
+            "cr_date": getattr(data, "cr_date", ...),
+            "statuses": getattr(data, "statuses", ...),
+            "tr_date": getattr(data, "tr_date", ...),
+            "up_date": getattr(data, "up_date", ...),
+        }
+        return {k: v for k, v in host.items() if v is not ...}
 
     def _convert_ips(self, ip_list: list[str]):
         """Convert Ips to a list of epp.Ip objects
@@ -1633,41 +1701,27 @@ class Domain(TimeStampedModel, DomainHelper):
 
         return edited_ip_list
 
-    def _update_host(self, nameserver: str, ip_list: list[str], old_ip_list: list[str]):
-        """Update an existing host object in EPP. Sends the update host command
-        can result in a RegistryError
+    def _update_host_request(self, nameserver: str, ip_list: list[str], old_ip_list: list[str]):
+        """Build the command to update an existing host object in EPP.
         Args:
             nameserver (str): nameserver or subdomain
             ip_list (list[str]): the new list of ips, may be empty
             old_ip_list  (list[str]): the old ip list, may also be empty
 
         Returns:
-            errorCode (int): one of ErrorCode enum type values
-
+            commands.UpdateHost, or None if there is nothing to send
         """
-        try:
-            if ip_list is None or len(ip_list) == 0 and isinstance(old_ip_list, list) and len(old_ip_list) != 0:
-                return ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY
+        if ip_list is None or len(ip_list) == 0 and isinstance(old_ip_list, list) and len(old_ip_list) != 0:
+            return None
 
-            added_ip_list = set(ip_list).difference(old_ip_list)
-            removed_ip_list = set(old_ip_list).difference(ip_list)
+        added_ip_list = set(ip_list).difference(old_ip_list)
+        removed_ip_list = set(old_ip_list).difference(ip_list)
 
-            request = commands.UpdateHost(
-                name=nameserver,
-                add=self._convert_ips(list(added_ip_list)),
-                rem=self._convert_ips(list(removed_ip_list)),
-            )
-            response = registry.send(request, cleaned=True)
-            logger.info("_update_host()-> sending req as %s" % request)
-            return response.code
-        except RegistryError as e:
-            logger.error("Error _update_host, code was %s error was %s" % (e.code, e))
-            # OBJECT_EXISTS is an expected error code that should not raise
-            # an exception, rather return the code to be handled separately
-            if e.code == ErrorCode.OBJECT_EXISTS:
-                return e.code
-            else:
-                raise e
+        return commands.UpdateHost(
+            name=nameserver,
+            add=self._convert_ips(list(added_ip_list)),
+            rem=self._convert_ips(list(removed_ip_list)),
+        )
 
     def addAndRemoveHostsFromDomain(self, hostsToAdd: list[str], hostsToDelete: list[str]):
         """sends an UpdateDomain message to the registry with the hosts provided
@@ -1695,9 +1749,9 @@ class Domain(TimeStampedModel, DomainHelper):
             return e.code
 
     def _delete_hosts_if_not_used(self, hostsToDelete: list[str]):
-        """delete the host object in registry,
+        """delete the host objects in registry, all at once,
         will only delete the host object, if it's not being used by another domain
-        Performs just the DeleteHost epp call
+        Performs just the DeleteHost epp calls
         Supresses regstry error, as registry can disallow delete for various reasons
         Args:
             hostsToDelete (list[str])- list of nameserver/host names to remove
@@ -1705,17 +1759,19 @@ class Domain(TimeStampedModel, DomainHelper):
             None
 
         """
-        try:
-            for nameserver in hostsToDelete:
-                deleteHostReq = commands.DeleteHost(name=nameserver)
-                registry.send(deleteHostReq, cleaned=True)
-                logger.info("_delete_hosts_if_not_used()-> sending delete host req as %s" % deleteHostReq)
-
-        except RegistryError as e:
-            if e.code == ErrorCode.OBJECT_ASSOCIATION_PROHIBITS_OPERATION:
+        if not hostsToDelete:
+            return
+        deleteHostReqs = [commands.DeleteHost(name=nameserver) for nameserver in hostsToDelete]
+        logger.info("_delete_hosts_if_not_used()-> sending delete host reqs as %s" % deleteHostReqs)
+        responses = registry.send_many(deleteHostReqs, cleaned=True)
+
+        for nameserver, response in zip(hostsToDelete, responses):
+            if not isinstance(response, RegistryError):
+                continue
+            if response.code == ErrorCode.OBJECT_ASSOCIATION_PROHIBITS_OPERATION:
                 logger.info("Did not remove host %s because it is in use on another domain." % nameserver)
             else:
-                logger.error("Error _delete_hosts_if_not_used, code was %s error was %s" % (e.code, e))
+                logger.error("Error _delete_hosts_if_not_used, code was %s error was %s" % (response.code, response))
 
     def _fix_unknown_state(self, cleaned):
         """
@@ -1771,26 +1827,91 @@ class Domain(TimeStampedModel, DomainHelper):
                 technical_contact.save()
 
     def _fetch_cache(self, fetch_hosts=False, fetch_contacts=False):
-        """Contact registry for info about a domain."""
+        """Contact registry for info about a domain, logging any RegistryError.
+        See `_fetch_cache_or_raise`."""
         try:
-            data_response = self._get_or_create_domain()
-            cache = self._extract_data_from_response(data_response)
-            cleaned = self._clean_cache(cache, data_response)
-            self._update_hosts_and_contacts(cleaned, fetch_hosts, fetch_contacts)
-
-            if self.state == self.State.UNKNOWN:
-                self._fix_unknown_state(cleaned)
-            if fetch_hosts:
-                self._update_hosts_and_ips_in_db(cleaned)
-            if fetch_contacts:
-                self._update_security_contact_in_db(cleaned)
+            self._fetch_cache_or_raise(fetch_hosts, fetch_contacts)
+        except RegistryError as e:
+            logger.error(e)
+
+    def _fetch_cache_or_raise(self, fetch_hosts=False, fetch_contacts=False, fresh=False):
+        """Contact registry for info about a domain.
+
+        Everything is fetched from the registry first, with the info for all
+        the domain's contacts and hosts asked for at once. Then the database is
+        brought in line with what was fetched, in a single transaction.
+
+        If `fresh`, none of it is read from the registry info cache."""
+        if fresh:
+            registry.info_cache.invalidate("domain", self.name)
+        data_response = self._get_or_create_domain()
+        cache = self._extract_data_from_response(data_response)
+        cleaned = self._clean_cache(cache, data_response)
+        if fresh:
+            self._invalidate_shared_hosts_and_contacts(cleaned)
+        contacts, hosts = self._fetch_contacts_and_hosts(cleaned, fetch_hosts, fetch_contacts)
+
+        with transaction.atomic():
+            self._reconcile_cache(cleaned, contacts, hosts)
             self._update_dates(cleaned)
 
+        if self.state == self.State.UNKNOWN:
+            self._fix_unknown_state(cleaned)
+
+        self._mark_fetched(cleaned, "core", "dnssec")
+        self._cache = cleaned
+        self._save_snapshot()
+
+    def _invalidate_shared_hosts_and_contacts(self, cleaned):
+        """Remove the info about the domain's hosts and contacts (as named in
+        cleaned) from the registry cache shared between requests."""
+        for name in cleaned.get("_hosts", []):
+            registry.info_cache.invalidate("host", name)
+        for contact in cleaned.get("_contacts", []):
+            registry.info_cache.invalidate("contact", contact.contact)
+
+    def _fetch_cache_section(self, fetch_hosts=False, fetch_contacts=False):
+        """Contact registry for info about the domain's hosts and/or contacts,
+        reusing the InfoDomain response already in the cache rather than
+        asking for it again."""
+        cleaned = dict(self._cache)
+        try:
+            contacts, hosts = self._fetch_contacts_and_hosts(cleaned, fetch_hosts, fetch_contacts)
+            with transaction.atomic():
+                self._reconcile_cache(cleaned, contacts, hosts)
             self._cache = cleaned
+            self._save_snapshot()
 
         except RegistryError as e:
             logger.error(e)
 
+    def _reconcile_cache(self, cleaned, contacts, hosts):
+        """Bring the database in line with the contacts and hosts fetched
+        (either of which may be None, if not fetched), and add them to cleaned."""
+        self._update_hosts_and_contacts(cleaned, contacts, hosts)
+        if hosts is not None:
+            self._update_hosts_and_ips_in_db(cleaned)
+            self._mark_fetched(cleaned, "hosts")
+        if contacts is not None:
+            self._update_security_contact_in_db(cleaned)
+            self._mark_fetched(cleaned, "contacts")
+
+    def _mark_fetched(self, cleaned, *sections):
+        """Record in cleaned["fetched_at"] that the given sections of the cache were
+        fetched just now. Sections carried over from the current cache keep the time
+        they were fetched.
+
+        The sections are "core" (the InfoDomain response), "dnssec" (which is part of
+        the InfoDomain response, so always fetched with it), "hosts" and "contacts"."""
+        fetched_at = {
+            section: time for section, time in self._cache.get("fetched_at", {}).items() if section in cleaned
+        }
+        fetched_at.update(cleaned.get("fetched_at", {}))
+        now = timezone.now()
+        for section in sections:
+            fetched_at[section] = now
+        cleaned["fetched_at"] = fetched_at
+
     def _extract_data_from_response(self, data_response):
         """extract data from response from registry"""
         data = data_response.res_data[0]
@@ -1829,73 +1950,96 @@ class Domain(TimeStampedModel, DomainHelper):
                 dnssec_data = extension
         return dnssec_data
 
-    def _update_hosts_and_contacts(self, cleaned, fetch_hosts, fetch_contacts):
+    def _update_hosts_and_contacts(self, cleaned, contacts, hosts):
         """
-        Update hosts and contacts if fetch_hosts and/or fetch_contacts.
+        Update hosts and contacts in cleaned with those fetched (if not None),
+        finding or creating the contacts in the database.
         Additionally, capture and cache old hosts and contacts from cache if they
-        don't exist in cleaned
+        weren't fetched
         """
         old_cache_hosts = self._cache.get("hosts")
         old_cache_contacts = self._cache.get("contacts")
 
-        if fetch_contacts:
-            cleaned["contacts"] = self._get_contacts(cleaned.get("_contacts", []))
-            if old_cache_hosts is not None:
-                logger.debug("resetting cleaned['hosts'] to old_cache_hosts")
-                cleaned["hosts"] = old_cache_hosts
+        if contacts is not None:
+            cleaned["contacts"] = self._get_or_create_public_contacts(contacts)
+        elif hosts is not None and old_cache_contacts is not None:
+            cleaned["contacts"] = old_cache_contacts
 
-        if fetch_hosts:
-            cleaned["hosts"] = self._get_hosts(cleaned.get("_hosts", []))
-            if old_cache_contacts is not None:
-                cleaned["contacts"] = old_cache_contacts
+        if hosts is not None:
+            cleaned["hosts"] = hosts
+        elif contacts is not None and old_cache_hosts is not None:
+            logger.debug("resetting cleaned['hosts'] to old_cache_hosts")
+            cleaned["hosts"] = old_cache_hosts
 
     def _update_hosts_and_ips_in_db(self, cleaned):
         """Update hosts and host_ips in database if retrieved from registry.
         Only called when fetch_hosts is True.
 
+        Existing hosts and ips are read in one query each and compared with cleaned
+        in memory, so only the hosts and ips which changed add queries.
+
         Parameters:
             self: the domain to be updated with hosts and ips from cleaned
             cleaned: dict containing hosts.  Hosts are provided as a list of dicts, e.g.
                 [{"name": "ns1.example.com",}, {"name": "ns1.example.gov"}, "addrs": ["0.0.0.0"])]
         """
-        cleaned_hosts = cleaned["hosts"]
-        # Get all existing hosts from the database for this domain
-        existing_hosts_in_db = Host.objects.filter(domain=self)
-        # Identify hosts to delete
-        cleaned_host_names = set(cleaned_host["name"] for cleaned_host in cleaned_hosts)
-        hosts_to_delete_from_db = [
-            existing_host for existing_host in existing_hosts_in_db if existing_host.name not in cleaned_host_names
-        ]
-        # Delete hosts and their associated HostIP instances
-        for host_to_delete in hosts_to_delete_from_db:
-            # Delete associated HostIP instances
-            HostIP.objects.filter(host=host_to_delete).delete()
-            # Delete the host itself
-            host_to_delete.delete()
-        # Update or create Hosts and HostIPs
-        for cleaned_host in cleaned_hosts:
-            # Check if the cleaned_host already exists
-            host_in_db, host_created = Host.objects.get_or_create(domain=self, name=cleaned_host["name"])
+        cleaned_ips_by_host = {}
+        for cleaned_host in cleaned["hosts"]:
             # Check if the nameserver is a subdomain of the current domain
             # If it is NOT a subdomain, we remove the IP address
             if not Domain.isSubdomain(self.name, cleaned_host["name"]):
                 cleaned_host["addrs"] = []
-            # Get cleaned list of ips for update
-            cleaned_ips = cleaned_host["addrs"]
-            if not host_created:
-                # Get all existing ips from the database for this host
-                existing_ips_in_db = HostIP.objects.filter(host=host_in_db)
-                # Identify IPs to delete
-                ips_to_delete_from_db = [
-                    existing_ip for existing_ip in existing_ips_in_db if existing_ip.address not in cleaned_ips
-                ]
-                # Delete IPs
-                for ip_to_delete in ips_to_delete_from_db:
-                    # Delete the ip
-                    ip_to_delete.delete()
-            # Update or create HostIP instances
-            for ip_address in cleaned_ips:
-                HostIP.objects.get_or_create(address=ip_address, host=host_in_db)
+            cleaned_ips_by_host.setdefault(cleaned_host["name"], set()).update(cleaned_host["addrs"])
+
+        # Get all existing hosts from the database for this domain, keeping
+        # one per name; hosts not in cleaned (and duplicates) are deleted
+        hosts_in_db = {}
+        host_ids_to_delete = []
+        for host in Host.objects.filter(domain=self).order_by("id"):
+            if host.name in cleaned_ips_by_host and host.name not in hosts_in_db:
+                hosts_in_db[host.name] = host
+            else:
+                host_ids_to_delete.append(host.id)
+
+        ip_ids_to_delete, existing_ips = self._find_host_ips_in_db(hosts_in_db, cleaned_ips_by_host)
+
+        # Delete IPs first, since hosts can't be deleted while IPs refer to them
+        if ip_ids_to_delete or host_ids_to_delete:
+            HostIP.objects.filter(Q(id__in=ip_ids_to_delete) | Q(host_id__in=host_ids_to_delete)).delete()
+        if host_ids_to_delete:
+            Host.objects.filter(id__in=host_ids_to_delete).delete()
+
+        self._create_missing_hosts_and_ips(hosts_in_db, cleaned_ips_by_host, existing_ips)
+
+    def _create_missing_hosts_and_ips(self, hosts_in_db, cleaned_ips_by_host, existing_ips):
+        """Create the hosts and HostIPs in cleaned_ips_by_host which aren't in the database.
+
+        They are saved one at a time, rather than in bulk, so that their creation
+        is in the audit log like their deletion."""
+        for name, addresses in cleaned_ips_by_host.items():
+            if name not in hosts_in_db:
+                hosts_in_db[name] = Host.objects.create(domain=self, name=name)
+            for address in sorted(addresses):
+                if (name, address) not in existing_ips:
+                    HostIP.objects.create(host=hosts_in_db[name], address=address)
+
+    def _find_host_ips_in_db(self, hosts_in_db, cleaned_ips_by_host):
+        """Compare the IPs in the database for hosts_in_db with those in cleaned_ips_by_host.
+
+        Returns the ids of the HostIPs to delete, and the set of (host name, address)
+        pairs which are already in the database and should be kept."""
+        host_names = {host.id: name for name, host in hosts_in_db.items()}
+        ip_ids_to_delete = []
+        existing_ips = set()
+        for ip_id, host_id, address in HostIP.objects.filter(host_id__in=host_names).values_list(
+            "id", "host_id", "address"
+        ):
+            key = (host_names[host_id], address)
+            if address in cleaned_ips_by_host[key[0]] and key not in existing_ips:
+                existing_ips.add(key)
+            else:
+                ip_ids_to_delete.append(ip_id)
+        return ip_ids_to_delete, existing_ips
 
     def _update_security_contact_in_db(self, cleaned):
         """Update security contact registry id in database if retrieved from registry.
@@ -1934,71 +2078,143 @@ class Domain(TimeStampedModel, DomainHelper):
         if requires_save:
             self.save()
 
-    def _get_contacts(self, contacts):
+    def _fetch_contacts_and_hosts(self, cleaned, fetch_hosts, fetch_contacts):
+        """Fetch info for the domain's contacts and/or hosts from the registry,
+        asking for them all at once as they are independent of one another.
+
+        Returns the contacts, as PublicContacts not yet saved, and the hosts.
+        Either is None if it was not asked for."""
+        contact_data = cleaned.get("_contacts", []) if fetch_contacts else []
+        host_data = cleaned.get("_hosts", []) if fetch_hosts else []
+        if not isinstance(contact_data, list):
+            contact_data = []
+        if not isinstance(host_data, list):
+            host_data = []
+
+        requests = [commands.InfoContact(id=domainContact.contact) for domainContact in contact_data]
+        requests += [commands.InfoHost(name=name) for name in host_data]
+        responses = self._send_many_or_raise(requests) if requests else []
+        contact_responses = responses[: len(contact_data)]
+        host_responses = responses[len(contact_data) :]
+
+        contacts = None
+        if fetch_contacts:
+            contacts = [
+                # Map the object we recieved from EPP to a PublicContact
+                self.map_epp_contact_to_public_contact(response.res_data[0], domainContact.contact, domainContact.type)
+                for domainContact, response in zip(contact_data, contact_responses)
+            ]
+        hosts = None
+        if fetch_hosts:
+            hosts = [self._map_epp_host(name, response) for name, response in zip(host_data, host_responses)]
+        return contacts, hosts
+
+    def _get_or_create_public_contacts(self, contacts: list[PublicContact]) -> dict:
+        """Find or create each of the given PublicContacts in our DB.
+        Returns a dict of each contact type to the registry id of its contact."""
         choices = PublicContact.ContactTypeChoices
         # We expect that all these fields get populated,
         # so we can create these early, rather than waiting.
-        cleaned_contacts = {
+        contacts_dict = {
             choices.ADMINISTRATIVE: None,
             choices.SECURITY: None,
             choices.TECHNICAL: None,
         }
-        if contacts and isinstance(contacts, list) and len(contacts) > 0:
-            cleaned_contacts = self._fetch_contacts(contacts)
-        return cleaned_contacts
-
-    def _get_hosts(self, hosts):
-        cleaned_hosts = []
-        if hosts and isinstance(hosts, list):
-            cleaned_hosts = self._fetch_hosts(hosts)
-        return cleaned_hosts
+        for in_db in self._reconcile_public_contacts(contacts):
+            contacts_dict[in_db.contact_type] = in_db.registry_id
+        return contacts_dict
 
     def _get_or_create_public_contact(self, public_contact: PublicContact):
         """Tries to find a PublicContact object in our DB.
         If it can't, it'll create it. Returns PublicContact"""
-        db_contact = PublicContact.objects.filter(
-            registry_id=public_contact.registry_id,
-            contact_type=public_contact.contact_type,
-            domain=self,
-        )
-
-        # If we find duplicates, log it and delete the oldest ones.
-        if db_contact.count() > 1:
-            logger.warning("_get_or_create_public_contact() -> Duplicate contacts found. Deleting duplicate.")
-
-            newest_duplicate = db_contact.order_by("-created_at").first()
-
-            duplicates_to_delete = db_contact.exclude(id=newest_duplicate.id)  # type: ignore
-
-            # Delete all duplicates
-            duplicates_to_delete.delete()
-
-            # Do a second filter to grab the latest content
-            db_contact = PublicContact.objects.filter(
-                registry_id=public_contact.registry_id,
-                contact_type=public_contact.contact_type,
-                domain=self,
-            )
-
-        # Save to DB if it doesn't exist already.
-        if db_contact.count() == 0:
-            # Doesn't run custom save logic, just saves to DB
-            public_contact.save(skip_epp_save=True)
-            logger.info(f"Created a new PublicContact: {public_contact}")
-            # Append the item we just created
-            return public_contact
-
-        existing_contact = db_contact.get()
+        return self._reconcile_public_contacts([public_contact])[0]
+
+    # fields of a PublicContact which are filled in from the registry's info
+    _PUBLIC_CONTACT_EPP_FIELDS = (
+        "name",
+        "org",
+        "street1",
+        "street2",
+        "street3",
+        "city",
+        "sp",
+        "pc",
+        "cc",
+        "email",
+        "voice",
+        "fax",
+        "pw",
+    )
 
-        # Does the item we're grabbing match what we have in our DB?
-        if existing_contact.email != public_contact.email or existing_contact.registry_id != public_contact.registry_id:
-            existing_contact.delete()
-            public_contact.save()
-            logger.warning("Requested PublicContact is out of sync " "with DB.")
-            return public_contact
+    def _reconcile_public_contacts(self, public_contacts: list[PublicContact]) -> list[PublicContact]:
+        """Find each of the given PublicContacts (mapped from the registry) in our DB,
+        creating those which are missing and updating those which are out of sync.
+
+        Every contact is looked up in one query, so only the contacts which changed
+        add queries. Returns the PublicContacts in the DB, in the same order as
+        public_contacts."""
+        keys = [(contact.registry_id, contact.contact_type) for contact in public_contacts]
+        # newest first, so that the newest of any duplicates is the one kept
+        db_contacts = PublicContact.objects.filter(
+            domain=self, registry_id__in={registry_id for registry_id, _ in keys}
+        ).order_by("-created_at")
+
+        existing: dict[tuple, PublicContact] = {}
+        duplicate_ids = []
+        for db_contact in db_contacts:
+            key = (db_contact.registry_id, db_contact.contact_type)
+            if key not in keys:
+                continue
+            if key in existing:
+                duplicate_ids.append(db_contact.id)
+            else:
+                existing[key] = db_contact
 
-        # If it already exists, we can assume that the DB instance was updated during set, so we should just use that.
-        return existing_contact
+        # If we find duplicates, log it and delete the oldest ones.
+        if duplicate_ids:
+            logger.warning("_reconcile_public_contacts() -> Duplicate contacts found. Deleting duplicates.")
+            PublicContact.objects.filter(id__in=duplicate_ids).delete()
+
+        to_create, to_update = self._diff_public_contacts(dict(zip(keys, public_contacts)), existing)
+        # Saved one at a time, rather than in bulk, so that the changes are in the
+        # audit log. skip_epp_save saves to the DB without sending them to the registry.
+        for contact in to_create:
+            contact.save(skip_epp_save=True)
+        if to_create:
+            logger.info(f"Created new PublicContacts: {to_create}")
+        for contact in to_update:
+            contact.save(skip_epp_save=True)
+        if to_update:
+            logger.warning(f"Requested PublicContacts are out of sync with DB: {to_update}")
+
+        return [existing[key] for key in keys]
+
+    def _diff_public_contacts(self, mapped: dict, existing: dict) -> tuple[list, list]:
+        """Compare the contacts mapped from the registry with those in existing, both
+        keyed by (registry id, contact type). Contacts missing from existing are added
+        to it, and the existing contacts are updated with the registry's info.
+
+        Returns the contacts to create and the contacts to update."""
+        to_create = []
+        to_update = []
+        for key, public_contact in mapped.items():
+            existing_contact = existing.get(key)
+            if existing_contact is None:
+                public_contact.domain = self
+                existing[key] = public_contact
+                to_create.append(public_contact)
+                continue
+
+            # Does the item we're grabbing match what we have in our DB?
+            changed = False
+            for field in self._PUBLIC_CONTACT_EPP_FIELDS:
+                value = getattr(public_contact, field)
+                if getattr(existing_contact, field) != value:
+                    setattr(existing_contact, field, value)
+                    changed = True
+            if changed:
+                to_update.append(existing_contact)
+        return to_create, to_update
 
     def _registrant_to_public_contact(self, registry_id: str):
         """EPPLib returns the registrant as a string,
@@ -2018,14 +2234,100 @@ class Domain(TimeStampedModel, DomainHelper):
     def _invalidate_cache(self):
         """Remove cache data when updates are made."""
         self._cache = {}
+        self._discard_snapshot()
+
+    def _snapshots_enabled(self) -> bool:
+        """Whether registry info is kept in a DomainRegistrySnapshot, which needs a saved domain."""
+        return bool(settings.REGISTRY_SNAPSHOT_MAX_AGE) and self.pk is not None
+
+    def _load_snapshot(self):
+        """Fill the cache from the domain's registry snapshot, if it has a recent one."""
+        if self._snapshots_enabled():
+            self._cache = DomainRegistrySnapshot.load(self, settings.REGISTRY_SNAPSHOT_MAX_AGE)
+
+    def _save_snapshot(self):
+        """Share the cache with other requests and workers through the domain's registry snapshot.
+        The snapshot is only a cache, so failing to save it is logged rather than raised."""
+        if not self._snapshots_enabled():
+            return
+        try:
+            with transaction.atomic():
+                DomainRegistrySnapshot.store(self, self._cache)
+        except (DatabaseError, TypeError) as err:
+            logger.warning(f"Couldn't save the registry snapshot of {self.name}: {err}")
+
+    def _discard_snapshot(self):
+        """Delete the domain's registry snapshot, as the domain has changed."""
+        if self._snapshots_enabled():
+            DomainRegistrySnapshot.discard(self)
+
+    def _invalidate_shared_cache(self):
+        """Remove this domain's info from the registry cache shared between
+        requests, so that the next read comes from the registry itself."""
+        registry.info_cache.invalidate("domain", self.name)
+        self._invalidate_cache()
+
+    # plain values from the registry cache which are kept in a session snapshot;
+    # the rest (which holds epplib objects) is fetched again when needed
+    SESSION_CACHE_KEYS = ("cr_date", "ex_date", "statuses", "contacts")
+
+    def session_snapshot(self) -> dict:
+        """A compact copy of the domain to keep in a user's session in place of the
+        domain itself: its id, when it was last saved, and the plain values in its
+        registry cache. See `restore_session_snapshot`."""
+        cache = {key: self._cache[key] for key in self.SESSION_CACHE_KEYS if key in self._cache}
+        if "hosts" in self._cache:
+            cache["hosts"] = [{"name": host["name"], "addrs": host.get("addrs", [])} for host in self._cache["hosts"]]
+        return {"id": self.pk, "version": self._session_version(), "cache": cache}
+
+    def restore_session_snapshot(self, snapshot) -> bool:
+        """Fill the registry cache from a session snapshot of this domain, unless the
+        domain was saved after the snapshot was taken. Returns whether it was used."""
+        if not isinstance(snapshot, dict) or snapshot.get("id") != self.pk:
+            return False
+        if snapshot.get("version") != self._session_version():
+            return False
+        self._cache = dict(snapshot.get("cache", {}))
+        return True
+
+    def _session_version(self):
+        return self.updated_at.isoformat() if self.updated_at else None
+
+    def refresh_from_registry(self):
+        """Fetch the domain's info, hosts and contacts from the registry afresh and
+        bring the database in line with them, for when the domain was changed
+        outside this app. Also moves the domain between DNS needed and ready to
+        match its nameservers.
+
+        Nothing is read from the registry info cache, so that hosts and contacts
+        changed since they were cached are fetched afresh too.
+
+        Raises RegistryError if the registry could not be reached or would not answer."""
+        self._invalidate_cache()
+        self._fetch_cache_or_raise(fetch_hosts=True, fetch_contacts=True, fresh=True)
+        self._update_state_for_nameservers(len(self._cache.get("hosts", [])))
 
     def _get_property(self, property):
-        """Get some piece of info about a domain."""
+        """Get some piece of info about a domain.
+
+        If it is missing from the cache, only the section of the cache it
+        belongs to is fetched. The InfoDomain response ("core") is reused if
+        it was already fetched, so asking for the hosts and then the contacts
+        sends InfoDomain just once.
+
+        Before contacting the registry, the cache is filled from the domain's
+        registry snapshot, so that info fetched by other requests is reused."""
+        if property not in self._cache and "fetched_at" not in self._cache:
+            self._load_snapshot()
+
         if property not in self._cache:
-            self._fetch_cache(
-                fetch_hosts=(property == "hosts"),
-                fetch_contacts=(property == "contacts"),
-            )
+            fetched_at = self._cache.get("fetched_at", {})
+            fetch_hosts = property == "hosts"
+            fetch_contacts = property == "contacts"
+            if "core" not in fetched_at:
+                self._fetch_cache(fetch_hosts=fetch_hosts, fetch_contacts=fetch_contacts)
+            elif fetch_hosts or fetch_contacts:
+                self._fetch_cache_section(fetch_hosts=fetch_hosts, fetch_contacts=fetch_contacts)
 
         if property in self._cache:
             return self._cache[property]
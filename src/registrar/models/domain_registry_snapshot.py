@@ -0,0 +1,137 @@
+import dataclasses
+import logging
+from datetime import date, datetime, timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from epplibwrapper import common, extensions
+
+from .utility.time_stamped_model import TimeStampedModel
+
+logger = logging.getLogger(__name__)
+
+
+class DomainRegistrySnapshot(TimeStampedModel):
+    """
+    The info about a domain last fetched from the registry.
+
+    This is a copy of the domain's cache (see `Domain._get_property`), kept so
+    that every request and worker can read a domain's info without contacting
+    the registry, until it is older than REGISTRY_SNAPSHOT_MAX_AGE seconds.
+    Changing the domain deletes its snapshot.
+
+    The cache is stored as JSON (see `encode`), and a snapshot which can't be
+    read back is deleted, as if there were none.
+
+    The registry is the source of truth for this data.
+    """
+
+    # the sections of the cache which may be fetched after the InfoDomain response,
+    # and so may be older than it
+    SEPARATE_SECTIONS = ("hosts", "contacts")
+
+    domain = models.OneToOneField(
+        "registrar.Domain",
+        on_delete=models.CASCADE,
+        related_name="registry_snapshot",
+        help_text="Domain whose registry info this is",
+    )
+
+    data = models.JSONField(
+        default=dict,
+        help_text="The domain's cache of registry info",
+    )
+
+    fetched_at = models.DateTimeField(
+        help_text="When the domain's InfoDomain response was fetched from the registry",
+    )
+
+    def __str__(self):
+        return f"{self.domain.name} as of {self.fetched_at}"
+
+    @classmethod
+    def store(cls, domain, cache: dict) -> None:
+        """Save a snapshot of the domain's cache, replacing any earlier one.
+
+        Two workers may store a snapshot of the same domain at once. If the
+        other one creates it first, this one updates it instead."""
+        defaults = {"data": encode(cache), "fetched_at": cache["fetched_at"]["core"]}
+        try:
+            with transaction.atomic():
+                cls.objects.update_or_create(domain=domain, defaults=defaults)
+        except IntegrityError:
+            cls.objects.filter(domain=domain).update(**defaults)
+
+    @classmethod
+    def load(cls, domain, max_age: float) -> dict:
+        """Return the domain's cache from its snapshot, without any sections
+        fetched more than `max_age` seconds ago. Returns an empty dict if there
+        is no snapshot, if its InfoDomain response is older than that, or if
+        it can't be read (in which case it is deleted)."""
+        oldest = timezone.now() - timedelta(seconds=max_age)
+        snapshot = cls.objects.filter(domain=domain, fetched_at__gte=oldest).first()
+        if snapshot is None:
+            return {}
+
+        try:
+            cache = decode(snapshot.data)
+            fetched_at = cache["fetched_at"]
+        except (AttributeError, KeyError, TypeError, ValueError) as err:
+            logger.warning(f"Deleting the registry snapshot of {domain.name}, which can't be read: {err}")
+            snapshot.delete()
+            return {}
+
+        for section in cls.SEPARATE_SECTIONS:
+            if section in fetched_at and fetched_at[section] < oldest:
+                del fetched_at[section]
+                cache.pop(section, None)
+        return cache
+
+    @classmethod
+    def discard(cls, domain) -> None:
+        """Delete the domain's snapshot, if it has one."""
+        cls.objects.filter(domain_id=domain.pk).delete()
+
+
+def encode(value):
+    """Convert a domain's cache to JSON-safe values, which `decode` converts back.
+
+    Dates, and the epplib objects the cache holds (such as DomainContact and
+    DNSSECExtension), are written as dicts tagged with their type."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): encode(item) for key, item in value.items()}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        fields = {field.name: encode(getattr(value, field.name)) for field in dataclasses.fields(value) if field.init}
+        return {"__epp__": type(value).__name__, "fields": fields}
+    raise TypeError(f"Can't store {type(value).__name__} in a registry snapshot")
+
+
+def decode(value):
+    """Convert values written by `encode` back into a domain's cache.
+
+    Only the epplib models in `common` and `extensions` are rebuilt; any other
+    type raises AttributeError."""
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    if "__date__" in value:
+        return date.fromisoformat(value["__date__"])
+    if "__epp__" in value:
+        name = value["__epp__"]
+        model = getattr(common, name, None) or getattr(extensions, name, None)
+        if not dataclasses.is_dataclass(model):
+            raise AttributeError(f"{name} is not an epplib model")
+        return model(**{key: decode(item) for key, item in value["fields"].items()})
+    return {key: decode(item) for key, item in value.items()}
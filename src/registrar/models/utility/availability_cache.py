@@ -0,0 +1,69 @@
+from threading import Lock
+
+from cachetools import TTLCache
+from django.conf import settings
+
+
+class AvailabilityCache:
+    """
+    The registry's recent answers about whether names are available.
+
+    Names which were taken are kept for AVAILABILITY_CACHE_TAKEN_TTL seconds,
+    since a registered name seldom becomes free. Names which were available are
+    kept for AVAILABILITY_CACHE_AVAILABLE_TTL seconds, which should be short,
+    as anyone may register them. Each is off when its TTL is 0. At most
+    MAX_SIZE names of each kind are kept, the least recently checked going first.
+    """
+
+    MAX_SIZE = 10000
+
+    def __init__(self):
+        self._ttls: tuple[float, float] | None = None
+        self._taken: TTLCache = TTLCache(self.MAX_SIZE, 1)
+        self._available: TTLCache = TTLCache(self.MAX_SIZE, 1)
+        self._lock = Lock()
+
+    def get(self, name: str) -> bool | None:
+        """Whether `name` was available, or None if that isn't known."""
+        name = name.lower()
+        with self._lock:
+            self._apply_settings()
+            if name in self._taken:
+                return False
+            if name in self._available:
+                return True
+        return None
+
+    def set(self, name: str, available: bool) -> None:
+        name = name.lower()
+        with self._lock:
+            taken_ttl, available_ttl = self._apply_settings()
+            if available and available_ttl > 0:
+                self._taken.pop(name, None)
+                self._available[name] = True
+            elif not available and taken_ttl > 0:
+                self._available.pop(name, None)
+                self._taken[name] = True
+
+    def discard(self, name: str) -> None:
+        name = name.lower()
+        with self._lock:
+            self._taken.pop(name, None)
+            self._available.pop(name, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._taken.clear()
+            self._available.clear()
+
+    def _apply_settings(self) -> tuple[float, float]:
+        """Start afresh with the current TTLs, if they have changed."""
+        ttls = (settings.AVAILABILITY_CACHE_TAKEN_TTL, settings.AVAILABILITY_CACHE_AVAILABLE_TTL)
+        if ttls != self._ttls:
+            self._taken = TTLCache(self.MAX_SIZE, max(ttls[0], 1))
+            self._available = TTLCache(self.MAX_SIZE, max(ttls[1], 1))
+            self._ttls = ttls
+        return ttls
+
+
+availability_cache = AvailabilityCache()
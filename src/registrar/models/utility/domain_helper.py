@@ -28,14 +28,20 @@ class DomainHelper:
         return bool(cls.DOMAIN_REGEX.match(domain))
 
     @classmethod
-    def validate(cls, domain: str, blank_ok=False) -> str:
-        """Attempt to determine if a domain name could be requested."""
+    def validate(cls, domain: str, blank_ok=False, availability: dict[str, bool] | None = None) -> str:
+        """Attempt to determine if a domain name could be requested.
+
+        `availability` may hold availability already looked up for some
+        domains (see Domain.available_many), keyed by their full name."""
         # Split into pieces for the linter
         domain = cls._validate_domain_string(domain, blank_ok)
 
         if domain != "":
             try:
-                if not check_domain_available(domain):
+                available = (availability or {}).get(f"{domain}.gov")
+                if available is None:
+                    available = check_domain_available(domain)
+                if not available:
                     raise errors.DomainUnavailableError()
             except RegistryError as err:
                 raise errors.RegistrySystemError() from err
@@ -73,7 +79,7 @@ class DomainHelper:
         return domain
 
     @classmethod
-    def validate_and_handle_errors(cls, domain, return_type, blank_ok=False):
+    def validate_and_handle_errors(cls, domain, return_type, blank_ok=False, availability=None):
         """
         Validates a domain and returns an appropriate response based on the validation result.
 
@@ -82,8 +88,9 @@ class DomainHelper:
 
         Args:
             domain (str): The domain to validate.
-            return_type (ValidationReturnType): Determines the type of response (JSON or form validation error).
+            return_type (ValidationReturnType): Determines the type of response (JSON, dict or form validation error).
             blank_ok (bool, optional): If True, blank input does not raise an exception. Defaults to False.
+            availability (dict, optional): Availability already looked up for some domains, passed to `validate`.
 
         Returns:
             tuple: The validated domain (or None if validation failed), and the response (success or error).
@@ -103,7 +110,7 @@ class DomainHelper:
 
         try:
             # Attempt to validate the domain
-            validated = cls.validate(domain, blank_ok)
+            validated = cls.validate(domain, blank_ok, availability)
 
         # Get a list of each possible exception, and the code to return
         except tuple(error_map.keys()) as error:
@@ -127,7 +134,8 @@ class DomainHelper:
 
         If `return_type` is `FORM_VALIDATION_ERROR`, raises a form validation error.
         If `return_type` is `JSON_RESPONSE`, returns a JSON response with 'available', 'code', and 'message' fields.
-        If `return_type` is neither, raises a ValueError.
+        If `return_type` is `JSON_DICT`, returns those fields as a dict.
+        If `return_type` is none of these, raises a ValueError.
 
         Args:
             return_type (ValidationReturnType): The type of error response.
@@ -135,16 +143,18 @@ class DomainHelper:
             available (bool, optional): Availability, only used for JSON responses. Defaults to False.
 
         Returns:
-            A JSON response or a form validation error.
+            A JSON response, its content as a dict, or a form validation error.
 
         Raises:
-            ValueError: If `return_type` is neither `FORM_VALIDATION_ERROR` nor `JSON_RESPONSE`.
+            ValueError: If `return_type` is not `FORM_VALIDATION_ERROR`, `JSON_RESPONSE` or `JSON_DICT`.
         """  # noqa
         match return_type:
             case ValidationReturnType.FORM_VALIDATION_ERROR:
                 raise forms.ValidationError(DOMAIN_API_MESSAGES[code], code=code)
             case ValidationReturnType.JSON_RESPONSE:
                 return JsonResponse({"available": available, "code": code, "message": DOMAIN_API_MESSAGES[code]})
+            case ValidationReturnType.JSON_DICT:
+                return {"available": available, "code": code, "message": DOMAIN_API_MESSAGES[code]}
             case _:
                 raise ValueError("Invalid return type specified")
 
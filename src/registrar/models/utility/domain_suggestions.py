@@ -0,0 +1,50 @@
+import re
+
+from .domain_helper import DomainHelper
+
+# words often shortened in .gov domains, and how
+ABBREVIATIONS = {
+    "county": "co",
+    "township": "twp",
+    "department": "dept",
+    "national": "natl",
+    "services": "svcs",
+    "information": "info",
+    "technology": "tech",
+    "center": "ctr",
+    "saint": "st",
+    "fort": "ft",
+    "mount": "mt",
+}
+
+
+def candidate_names(sld: str, state: str | None = None) -> list[str]:
+    """
+    Variants of the second level domain `sld` which a registrant might
+    request instead, most likely to be wanted first.
+
+    Variants drop the hyphens, shorten common words (see ABBREVIATIONS) and,
+    if a state or territory is given, add its abbreviation. Each variant is a
+    valid second level domain, and none is `sld` itself.
+
+    A word is only shortened where it is the whole name or one of its
+    hyphenated parts, as in "harris-county". Names aren't split into words
+    otherwise, so "fortune" and "mountainview" are left alone.
+    """
+    sld = sld.lower()
+    bases = [sld, sld.replace("-", "")]
+    for word, abbreviation in ABBREVIATIONS.items():
+        shortened = re.sub(rf"(?<![^-]){word}(?![^-])", abbreviation, sld)
+        if shortened != sld:
+            bases += [shortened, shortened.replace("-", "")]
+
+    candidates = bases[1:]
+    if state:
+        state = state.lower()
+        for base in bases:
+            candidates += [f"{base}{state}", f"{base}-{state}"]
+
+    # dict.fromkeys drops duplicates but keeps the order
+    return [
+        name for name in dict.fromkeys(candidates) if name != sld and DomainHelper.string_could_be_domain(f"{name}.gov")
+    ]
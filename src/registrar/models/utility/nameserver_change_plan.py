@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class NameserverChangePlan:
+    """
+    The changes to a domain's nameservers which setting them would make.
+
+    Made by `Domain.plan_nameserver_changes`, which does not change anything,
+    so that the plan can be previewed. Setting `Domain.nameservers` carries out
+    a plan in three steps:
+
+        1. create the new hosts and update the changed ones, all at once
+        2. add the new hosts to the domain and remove the deleted ones
+        3. delete the removed hosts, if no other domain uses them
+
+    Once a plan is carried out, `results` holds the result code of each
+    host's command.
+    """
+
+    domain: str
+    # new hosts, with their ips (or None)
+    creates: dict[str, list | None] = field(default_factory=dict)
+    # changed hosts, with their new ips and old ips
+    updates: dict[str, tuple[list, list]] = field(default_factory=dict)
+    # hosts to remove from the domain
+    deletes: list[str] = field(default_factory=list)
+    # how many nameservers the domain had before the change
+    previous_count: int = 0
+    results: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.creates or self.updates or self.deletes)
+
+    @property
+    def expected_count(self) -> int:
+        """How many nameservers the domain will have if every change succeeds."""
+        return self.previous_count - len(self.deletes) + len(self.creates)
+
+    def summary(self) -> str:
+        """Describe the plan in one line, for logging and previews."""
+        if self.is_empty:
+            return f"{self.domain}: no nameserver changes"
+        changes = [f"create {name} {ips or []}" for name, ips in self.creates.items()]
+        changes += [f"update {name} {old or []} -> {new}" for name, (new, old) in self.updates.items()]
+        changes += [f"remove {name}" for name in self.deletes]
+        return f"{self.domain}: " + "; ".join(changes)
@@ -0,0 +1,66 @@
+import time
+from threading import Lock
+
+from django.apps import apps
+from django.conf import settings
+
+
+class RegisteredNameIndex:
+    """
+    The names of the domains in our database, held in memory.
+
+    Every domain we hold is registered, so checking the availability of one of
+    these names need not contact the registry. The index is loaded on first use
+    and reloaded once it is REGISTERED_NAME_INDEX_TTL seconds old; in between,
+    saving or deleting a domain updates it (see registrar/signals.py). Other
+    processes only see those changes once they reload.
+
+    The registry is the source of truth: a name missing from the index may
+    still be registered, so only "taken" can be answered from here.
+    """
+
+    def __init__(self):
+        self._names: set[str] = set()
+        self._loaded_at: float | None = None
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.REGISTERED_NAME_INDEX_TTL > 0
+
+    def is_registered(self, name: str) -> bool:
+        """Whether `name` is known to be registered. False if the index is off."""
+        if not self.enabled:
+            return False
+        self._load_if_stale()
+        return name.lower() in self._names
+
+    # add and discard wait for a reload in progress, so that the set it swaps in
+    # doesn't overwrite their change
+
+    def add(self, name: str) -> None:
+        with self._lock:
+            self._names.add(name.lower())
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            self._names.discard(name.lower())
+
+    def clear(self) -> None:
+        """Forget every name, so that the index is reloaded on next use."""
+        with self._lock:
+            self._names = set()
+            self._loaded_at = None
+
+    def _load_if_stale(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded_at is not None and now - self._loaded_at < settings.REGISTERED_NAME_INDEX_TTL:
+                return
+            Domain = apps.get_model("registrar", "Domain")
+            names = Domain.objects.exclude(state=Domain.State.DELETED).values_list("name", flat=True)
+            self._names = {name.lower() for name in names}
+            self._loaded_at = now
+
+
+registered_names = RegisteredNameIndex()
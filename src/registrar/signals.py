@@ -1,9 +1,10 @@
 import logging
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import User, Contact
+from .models import Domain, User, Contact
+from .models.utility.registered_name_index import registered_names
 
 
 logger = logging.getLogger(__name__)
@@ -53,3 +54,17 @@ def handle_profile(sender, instance, **kwargs):
                 "There are multiple Contacts with the same email address."
                 f" Picking #{contacts[0].id} for User #{instance.id}."
             )
+
+
+@receiver(post_save, sender=Domain)
+def handle_domain_saved(sender, instance, **kwargs):
+    """Keep the registered name index of this process up to date."""
+    if instance.state == Domain.State.DELETED:
+        registered_names.discard(instance.name)
+    else:
+        registered_names.add(instance.name)
+
+
+@receiver(post_delete, sender=Domain)
+def handle_domain_deleted(sender, instance, **kwargs):
+    registered_names.discard(instance.name)
@@ -4,7 +4,7 @@ import logging
 from contextlib import contextmanager
 from string import ascii_uppercase
 import uuid
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from unittest.mock import MagicMock, Mock, patch
 from typing import List, Dict
 from django.contrib.sessions.middleware import SessionMiddleware
@@ -927,6 +927,16 @@ def generic_domain_object(domain_type, object_name):
     return domain_request
 
 
+# Share no registry info or answers between requests, and don't limit how fast
+# availability is checked, so that tests see every registry command. Tests of
+# those features turn them back on with override_settings.
+@override_settings(
+    REGISTRY_SNAPSHOT_MAX_AGE=0,
+    REGISTERED_NAME_INDEX_TTL=0,
+    AVAILABILITY_CACHE_TAKEN_TTL=0,
+    AVAILABILITY_CACHE_AVAILABLE_TTL=0,
+    AVAILABILITY_RATE_LIMIT=0,
+)
 class MockEppLib(TestCase):
     class fakedEppObject(object):
         """"""
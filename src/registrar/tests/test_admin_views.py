@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase, Client
 from django.urls import reverse
 from registrar.tests.common import create_superuser
@@ -40,3 +41,24 @@ class TestAdminViews(TestCase):
         # Check if the filename in the Content-Disposition header matches the expected pattern
         expected_filename = f"domain-growth-report-{start_date}-to-{end_date}.csv"
         self.assertIn(f'attachment; filename="{expected_filename}"', response["Content-Disposition"])
+
+    def test_registry_metrics_view(self):
+        """Test that staff can read the registry metrics as JSON"""
+        self.client.force_login(self.superuser)
+
+        response = self.client.get(reverse("registry_metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("commands", response.json())
+        self.assertIn("pool", response.json())
+
+    def test_registry_metrics_view_requires_staff(self):
+        """Test that users who cannot use the admin site are sent to its login page"""
+        user = get_user_model().objects.create(username="registrant", email="registrant@example.com")
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("registry_metrics"))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse("admin:login"), response["Location"])
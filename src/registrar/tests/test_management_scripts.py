@@ -17,11 +17,16 @@ from registrar.models import (
     VerifiedByStaff,
     PublicContact,
     FederalAgency,
+    DomainRegistrySnapshot,
+    Host,
+    HostIP,
 )
 
 from django.core.management import call_command
-from unittest.mock import patch, call
-from epplibwrapper import commands, common
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch, call
+from auditlog.models import LogEntry  # type: ignore
+from epplibwrapper import commands, common, ErrorCode, RegistryError
 
 from .common import MockEppLib, less_console_noise, completed_domain_request
 from api.tests.common import less_console_noise_decorator
@@ -767,3 +772,183 @@ class TestDiscloseEmails(MockEppLib):
                     )
                 ]
             )
+
+
+class TestProcessRegistryPollQueue(MockEppLib):
+    def setUp(self):
+        super().setUp()
+        self.domain, _ = Domain.objects.get_or_create(name="fake.gov", state=Domain.State.READY)
+        self.messages = [SimpleNamespace(id="42", msg="Domain fake.gov was updated by the registry")]
+        self.mockedSendFunction.side_effect = self.mockPollSend
+
+    def tearDown(self):
+        super().tearDown()
+        PublicContact.objects.all().delete()
+        Domain.objects.all().delete()
+
+    def mockPollSend(self, _request, cleaned):
+        """Serves self.messages from the poll queue, and everything else as MockEppLib does"""
+        if isinstance(_request, commands.PollRequest):
+            if not self.messages:
+                return MagicMock(code=ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY_NO_MESSAGES, msg_q=None, res_data=[])
+            return MagicMock(
+                code=ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY_ACK_TO_DEQUEUE, msg_q=self.messages[0], res_data=[]
+            )
+        if isinstance(_request, commands.PollAcknowledgement):
+            self.messages.pop(0)
+            return MagicMock(code=ErrorCode.COMMAND_COMPLETED_SUCCESSFULLY)
+        return self.mockSend(_request, cleaned)
+
+    def run_process_registry_poll_queue(self):
+        with less_console_noise():
+            call_command("process_registry_poll_queue", once=True)
+
+    def test_message_refreshes_domain_and_is_acknowledged(self):
+        """
+        Tests that a poll message refreshes the domain it names from the registry,
+        and is then acknowledged.
+        """
+        self.run_process_registry_poll_queue()
+
+        self.mockedSendFunction.assert_has_calls(
+            [
+                call(commands.InfoDomain(name="fake.gov", auth_info=None), cleaned=True),
+                call(commands.PollAcknowledgement(msg_id="42"), cleaned=True),
+            ]
+        )
+        self.assertEqual(self.messages, [])
+        # the registry has one nameserver for the domain
+        self.domain.refresh_from_db()
+        self.assertEqual(self.domain.state, Domain.State.DNS_NEEDED)
+
+    def test_refresh_skips_cached_registry_info(self):
+        """
+        Tests that refreshing a domain drops the cached info for the domain,
+        its hosts and its contacts, so that none of it is stale.
+        """
+        with patch("registrar.models.domain.registry.info_cache.invalidate") as invalidate:
+            self.run_process_registry_poll_queue()
+
+        invalidate.assert_has_calls(
+            [
+                call("domain", "fake.gov"),
+                call("host", "fake.host.com"),
+                call("contact", "securityContact"),
+                call("contact", "technicalContact"),
+                call("contact", "adminContact"),
+            ]
+        )
+
+    def test_message_is_kept_if_registry_cannot_be_reached(self):
+        """
+        Tests that a poll message is not acknowledged if the registry cannot
+        be reached to refresh the domain it names.
+        """
+
+        def side_effect(_request, cleaned):
+            if isinstance(_request, commands.InfoDomain):
+                raise RegistryError("[Errno 99] Cannot assign requested address")
+            return self.mockPollSend(_request, cleaned)
+
+        self.mockedSendFunction.side_effect = side_effect
+        self.run_process_registry_poll_queue()
+
+        sent = [type(sent.args[0]) for sent in self.mockedSendFunction.call_args_list]
+        self.assertNotIn(commands.PollAcknowledgement, sent)
+        self.assertEqual(len(self.messages), 1)
+
+    def test_message_is_acknowledged_if_domain_is_gone(self):
+        """
+        Tests that a poll message naming a domain which is no longer in the
+        registry is acknowledged, so that the next message is still processed.
+        """
+        self.messages.append(SimpleNamespace(id="43", msg="Domain igorville.gov was updated by the registry"))
+        Domain.objects.get_or_create(name="igorville.gov", state=Domain.State.READY)
+
+        def side_effect(_request, cleaned):
+            if isinstance(_request, commands.InfoDomain) and _request.name == "fake.gov":
+                raise RegistryError(code=ErrorCode.OBJECT_DOES_NOT_EXIST)
+            return self.mockPollSend(_request, cleaned)
+
+        self.mockedSendFunction.side_effect = side_effect
+        self.run_process_registry_poll_queue()
+
+        self.mockedSendFunction.assert_has_calls(
+            [
+                call(commands.PollAcknowledgement(msg_id="42"), cleaned=True),
+                call(commands.InfoDomain(name="igorville.gov", auth_info=None), cleaned=True),
+                call(commands.PollAcknowledgement(msg_id="43"), cleaned=True),
+            ]
+        )
+        self.assertEqual(self.messages, [])
+
+
+class TestReconcileRegistryDomains(MockEppLib):
+    def setUp(self):
+        super().setUp()
+        # the registry has this domain expiring on 2023-05-25, with one nameserver
+        self.domain, _ = Domain.objects.get_or_create(
+            name="fake.gov", state=Domain.State.READY, expiration_date=date(2020, 1, 1)
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        DomainRegistrySnapshot.objects.all().delete()
+        HostIP.objects.all().delete()
+        Host.objects.all().delete()
+        PublicContact.objects.all().delete()
+        Domain.objects.all().delete()
+
+    def run_reconcile_registry_domains(self, **options):
+        with less_console_noise():
+            call_command("reconcile_registry_domains", rate=1000, **options)
+
+    def test_drift_is_fixed(self):
+        """
+        Tests that the expiration date and nameservers are brought in line
+        with the registry, and that the domain is marked as checked.
+        """
+        self.run_reconcile_registry_domains()
+
+        self.domain.refresh_from_db()
+        self.assertEqual(self.domain.expiration_date, date(2023, 5, 25))
+        self.assertGreater(self.domain.updated_at, self.domain.created_at)
+        self.assertTrue(
+            LogEntry.objects.get_for_object(self.domain)
+            .filter(action=LogEntry.Action.UPDATE, changes__expiration_date=["2020-01-01", "2023-05-25"])
+            .exists()
+        )
+        self.assertEqual(
+            list(Host.objects.filter(domain=self.domain).values_list("name", flat=True)), ["fake.host.com"]
+        )
+        self.assertTrue(DomainRegistrySnapshot.objects.filter(domain=self.domain).exists())
+
+    def test_sweep_reads_the_registry_not_the_cache(self):
+        """
+        Tests that the sweep drops any cached InfoDomain response before fetching,
+        and carries on if a snapshot can't be saved.
+        """
+        with patch(
+            "registrar.management.commands.reconcile_registry_domains.registry.info_cache.invalidate"
+        ) as invalidate:
+            with patch.object(DomainRegistrySnapshot, "store", side_effect=TypeError("Can't store it")):
+                self.run_reconcile_registry_domains()
+
+        invalidate.assert_any_call("domain", "fake.gov")
+        self.domain.refresh_from_db()
+        self.assertEqual(self.domain.expiration_date, date(2023, 5, 25))
+        self.assertFalse(DomainRegistrySnapshot.objects.exists())
+
+    def test_dry_run_changes_nothing(self):
+        """
+        Tests that a dry run only sends InfoDomain, and leaves the database alone.
+        """
+        self.run_reconcile_registry_domains(dry_run=True)
+
+        self.mockedSendFunction.assert_called_once_with(
+            commands.InfoDomain(name="fake.gov", auth_info=None), cleaned=True
+        )
+        self.domain.refresh_from_db()
+        self.assertEqual(self.domain.expiration_date, date(2020, 1, 1))
+        self.assertFalse(Host.objects.filter(domain=self.domain).exists())
+        self.assertFalse(DomainRegistrySnapshot.objects.exists())
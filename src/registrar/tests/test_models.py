@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.db.utils import IntegrityError
 from unittest.mock import patch
 
@@ -17,6 +17,7 @@ from registrar.models import (
 
 import boto3_mocking
 from registrar.models.transition_domain import TransitionDomain
+from registrar.models.utility.availability_cache import availability_cache
 from registrar.models.verified_by_staff import VerifiedByStaff  # type: ignore
 from .common import MockSESClient, less_console_noise, completed_domain_request, set_domain_request_investigators
 from django_fsm import TransitionNotAllowed
@@ -539,6 +540,21 @@ class TestDomainRequest(TestCase):
         # Assert that no emails were sent
         self.assertEqual(len(self.mock_client.EMAILS_SENT), 0)
 
+    @override_settings(AVAILABILITY_CACHE_AVAILABLE_TTL=30)
+    def test_approve_discards_cached_availability(self):
+        """
+        Test that approving a domain request forgets that its domain was available
+        """
+        name = self.submitted_domain_request.requested_domain.name
+        availability_cache.set(name, True)
+        self.addCleanup(availability_cache.clear)
+
+        with boto3_mocking.clients.handler_for("sesv2", self.mock_client):
+            with less_console_noise():
+                self.submitted_domain_request.approve(send_email=False)
+
+        self.assertIsNone(availability_cache.get(name))
+
     def test_approved_transition_not_allowed(self):
         """
         Test that calling action_needed against transition rules raises TransitionNotAllowed.
@@ -4,12 +4,15 @@ Feature being tested: Registry Integration
 This file tests the various ways in which the registrar interacts with the registry.
 """
 
-from django.test import TestCase
-from django.db.utils import IntegrityError
+from django.test import TestCase, override_settings
+from django.db.utils import DatabaseError, IntegrityError
 from unittest.mock import MagicMock, patch, call
 import datetime
+import json
+import threading
+from django.utils import timezone
 from django.utils.timezone import make_aware
-from registrar.models import Domain, Host, HostIP
+from registrar.models import Domain, DomainRegistrySnapshot, Host, HostIP
 
 from unittest import skip
 from registrar.models.domain_request import DomainRequest
@@ -19,7 +22,10 @@ from registrar.models.public_contact import PublicContact
 from registrar.models.user import User
 from registrar.utility.errors import ActionNotAllowed, NameserverError
 
+from registrar.models.utility.availability_cache import availability_cache
 from registrar.models.utility.contact_error import ContactError, ContactErrorCodes
+from registrar.models.utility.domain_suggestions import candidate_names
+from registrar.models.utility.registered_name_index import RegisteredNameIndex, registered_names
 from registrar.utility import errors
 
 from django_fsm import TransitionNotAllowed  # type: ignore
@@ -34,6 +40,7 @@ from epplibwrapper import (
 from .common import MockEppLib, MockSESClient, less_console_noise
 import logging
 import boto3_mocking  # type: ignore
+from auditlog.models import LogEntry  # type: ignore
 
 logger = logging.getLogger(__name__)
 
@@ -201,6 +208,52 @@ class TestDomainCache(MockEppLib):
             self.assertEqual(domain._cache["hosts"], [expectedHostsDict])
             self.assertEqual(domain._cache["contacts"], expectedContactsDict)
 
+    def test_fetch_cache_fetches_contacts_and_hosts_together(self):
+        """Contacts and hosts asked for together are fetched and cached in one go,
+        with one info command per contact and host"""
+        with less_console_noise():
+            domain, _ = Domain.objects.get_or_create(name="igorville.gov", state=Domain.State.DNS_NEEDED)
+            domain._fetch_cache(fetch_hosts=True, fetch_contacts=True)
+
+            self.assertEqual(
+                domain._cache["contacts"],
+                {
+                    PublicContact.ContactTypeChoices.ADMINISTRATIVE: "adminContact",
+                    PublicContact.ContactTypeChoices.SECURITY: "securityContact",
+                    PublicContact.ContactTypeChoices.TECHNICAL: "technicalContact",
+                },
+            )
+            self.assertEqual(len(domain._cache["hosts"]), len(self.mockDataInfoDomain.hosts))
+            self.assertEqual(Host.objects.filter(domain=domain).count(), len(self.mockDataInfoDomain.hosts))
+
+            sent = [type(sent_call.args[0]) for sent_call in self.mockedSendFunction.call_args_list]
+            self.assertEqual(sent.count(commands.InfoDomain), 1)
+            self.assertEqual(sent.count(commands.InfoContact), len(self.mockDataInfoDomain.contacts))
+            self.assertEqual(sent.count(commands.InfoHost), len(self.mockDataInfoDomain.hosts))
+
+    def test_get_property_fetches_only_missing_section(self):
+        """Hosts and contacts read one after the other reuse the cached InfoDomain
+        response, and the time each section was fetched is recorded"""
+        with less_console_noise():
+            domain, _ = Domain.objects.get_or_create(name="igorville.gov", state=Domain.State.DNS_NEEDED)
+            domain._get_property("hosts")
+            domain._get_property("contacts")
+            domain._get_property("cr_date")
+
+            sent = [type(sent_call.args[0]) for sent_call in self.mockedSendFunction.call_args_list]
+            self.assertEqual(sent.count(commands.InfoDomain), 1)
+            self.assertEqual(sent.count(commands.InfoHost), len(self.mockDataInfoDomain.hosts))
+            self.assertEqual(sent.count(commands.InfoContact), len(self.mockDataInfoDomain.contacts))
+
+            fetched_at = domain._cache["fetched_at"]
+            self.assertEqual(set(fetched_at), {"core", "dnssec", "hosts", "contacts"})
+            self.assertLessEqual(fetched_at["hosts"], fetched_at["contacts"])
+
+            # a key the registry did not send is not fetched again
+            with self.assertRaises(KeyError):
+                domain._get_property("tr_date")
+            self.assertEqual(self.mockedSendFunction.call_count, len(sent))
+
     def test_map_epp_contact_to_public_contact(self):
         # Tests that the mapper is working how we expect
         with less_console_noise():
@@ -259,6 +312,55 @@ class TestDomainCache(MockEppLib):
             self.assertEqual(cached_contact, in_db.registry_id)
             self.assertEqual(domain.security_contact.email, "123test@mail.gov")
 
+    def test_reconcile_public_contacts(self):
+        """
+        Scenario: Contacts mapped from the registry are reconciled with the db
+            Missing contacts are created and out of sync contacts are updated in place,
+            with both in the audit log. Reconciling again without changes takes a single query.
+        """
+        with less_console_noise():
+            domain, _ = Domain.objects.get_or_create(name="registry.gov", state=Domain.State.DNS_NEEDED)
+            choices = PublicContact.ContactTypeChoices
+
+            def mapped_contacts():
+                return [
+                    domain.map_epp_contact_to_public_contact(contact, contact.id, contact_type)
+                    for contact, contact_type in [
+                        (self.mockDataSecurityContact, choices.SECURITY),
+                        (self.mockTechnicalContact, choices.TECHNICAL),
+                        (self.mockAdministrativeContact, choices.ADMINISTRATIVE),
+                    ]
+                ]
+
+            out_of_sync = mapped_contacts()[0]
+            out_of_sync.email = "old@mail.gov"
+            out_of_sync.save(skip_epp_save=True)
+
+            contacts_dict = domain._get_or_create_public_contacts(mapped_contacts())
+
+            self.assertEqual(
+                contacts_dict,
+                {
+                    choices.SECURITY: "securityContact",
+                    choices.TECHNICAL: "technicalContact",
+                    choices.ADMINISTRATIVE: "adminContact",
+                },
+            )
+            self.assertEqual(PublicContact.objects.filter(domain=domain).count(), 3)
+            updated = PublicContact.objects.get(id=out_of_sync.id)
+            self.assertEqual(updated.email, "security@mail.gov")
+            # the update and the creations are in the audit log
+            self.assertTrue(LogEntry.objects.get_for_object(updated).filter(action=LogEntry.Action.UPDATE).exists())
+            created = PublicContact.objects.filter(domain=domain).exclude(id=out_of_sync.id)
+            for contact in created:
+                self.assertTrue(LogEntry.objects.get_for_object(contact).filter(action=LogEntry.Action.CREATE).exists())
+            # no registry commands are sent to save contacts which came from the registry
+            self.mockedSendFunction.assert_not_called()
+
+            with self.assertNumQueries(1):
+                in_db = domain._reconcile_public_contacts(mapped_contacts())
+            self.assertEqual(in_db[0].id, out_of_sync.id)
+
     def test_errors_map_epp_contact_to_public_contact(self):
         """
         Scenario: Registrant gets invalid data from EPPLib
@@ -526,6 +628,99 @@ class TestDomainStatuses(MockEppLib):
         super().tearDown()
 
 
+@override_settings(REGISTRY_SNAPSHOT_MAX_AGE=120)
+class TestDomainRegistrySnapshot(MockEppLib):
+    """Test that registry info is shared between Domain instances through DomainRegistrySnapshot"""
+
+    def setUp(self):
+        super().setUp()
+        self.domain, _ = Domain.objects.get_or_create(name="igorville.gov", state=Domain.State.DNS_NEEDED)
+
+    def tearDown(self):
+        DomainRegistrySnapshot.objects.all().delete()
+        PublicContact.objects.all().delete()
+        HostIP.objects.all().delete()
+        Host.objects.all().delete()
+        Domain.objects.all().delete()
+        super().tearDown()
+
+    def test_snapshot_read_by_other_instances(self):
+        """A second instance of the domain reads the info the first fetched, without contacting the registry"""
+        with less_console_noise():
+            _ = self.domain.creation_date
+            _ = self.domain.nameservers
+            calls = self.mockedSendFunction.call_count
+
+            domain = Domain.objects.get(pk=self.domain.pk)
+            self.assertEqual(domain.creation_date, self.mockDataInfoDomain.cr_date)
+            self.assertEqual(domain.nameservers, self.domain.nameservers)
+            self.assertEqual(self.mockedSendFunction.call_count, calls)
+
+    def test_snapshot_discarded_on_change(self):
+        """Changing the domain discards its snapshot"""
+        with less_console_noise():
+            _ = self.domain.creation_date
+            self.assertTrue(DomainRegistrySnapshot.objects.filter(domain=self.domain).exists())
+
+            self.domain.dnssecdata = []
+            self.assertFalse(DomainRegistrySnapshot.objects.filter(domain=self.domain).exists())
+
+    def test_stale_snapshot_ignored(self):
+        """A snapshot older than REGISTRY_SNAPSHOT_MAX_AGE is not used"""
+        with less_console_noise():
+            _ = self.domain.creation_date
+            calls = self.mockedSendFunction.call_count
+            DomainRegistrySnapshot.objects.filter(domain=self.domain).update(
+                fetched_at=timezone.now() - datetime.timedelta(seconds=121)
+            )
+
+            domain = Domain.objects.get(pk=self.domain.pk)
+            _ = domain.creation_date
+            self.assertEqual(self.mockedSendFunction.call_count, calls + 1)
+
+    def test_snapshot_stored_as_json(self):
+        """The snapshot holds JSON, from which the same cache is read back"""
+        with less_console_noise():
+            _ = self.domain.nameservers
+            snapshot = DomainRegistrySnapshot.objects.get(domain=self.domain)
+            self.assertEqual(json.loads(json.dumps(snapshot.data)), snapshot.data)
+
+            domain = Domain.objects.get(pk=self.domain.pk)
+            domain._load_snapshot()
+            self.assertEqual(domain._cache.keys(), self.domain._cache.keys())
+            self.assertEqual(domain._cache["hosts"], self.domain._cache["hosts"])
+            self.assertEqual(domain._cache["_contacts"], self.domain._cache["_contacts"])
+            self.assertEqual(domain._cache["fetched_at"], self.domain._cache["fetched_at"])
+
+    def test_unreadable_snapshot_discarded(self):
+        """A snapshot which can't be read is deleted, and the info is fetched from the registry"""
+        with less_console_noise():
+            _ = self.domain.creation_date
+            calls = self.mockedSendFunction.call_count
+            DomainRegistrySnapshot.objects.filter(domain=self.domain).update(
+                data={"fetched_at": {"__epp__": "NotAModel", "fields": {}}}
+            )
+
+            domain = Domain.objects.get(pk=self.domain.pk)
+            self.assertEqual(domain.creation_date, self.mockDataInfoDomain.cr_date)
+            self.assertEqual(self.mockedSendFunction.call_count, calls + 1)
+
+    def test_concurrent_snapshot_store(self):
+        """A snapshot created by another worker in the meantime is updated rather than raising"""
+        with less_console_noise():
+            _ = self.domain.creation_date
+            cache = self.domain._cache
+            with patch.object(DomainRegistrySnapshot.objects, "update_or_create", side_effect=IntegrityError):
+                DomainRegistrySnapshot.store(self.domain, cache)
+            self.assertEqual(DomainRegistrySnapshot.objects.filter(domain=self.domain).count(), 1)
+
+    def test_snapshot_failure_does_not_break_fetch(self):
+        """Failing to save the snapshot still leaves the domain's info fetched"""
+        with less_console_noise():
+            with patch.object(DomainRegistrySnapshot, "store", side_effect=DatabaseError):
+                self.assertEqual(self.domain.creation_date, self.mockDataInfoDomain.cr_date)
+
+
 class TestDomainAvailable(MockEppLib):
     """Test Domain.available"""
 
@@ -640,6 +835,187 @@ class TestDomainAvailable(MockEppLib):
                 Domain.available("raises-error.gov")
             patcher.stop()
 
+    @override_settings(REGISTRY_CHECK_BATCH_SIZE=2)
+    def test_domain_available_many(self):
+        """
+        Scenario: Testing the availability of several domains at once
+            Should check up to REGISTRY_CHECK_BATCH_SIZE domains per command
+
+            Validate duplicates are checked once
+            Validate each domain is mapped to its availability
+        """
+
+        def side_effect(_request, cleaned):
+            return MagicMock(
+                res_data=[
+                    responses.check.CheckDomainResultData(name=name, avail=name != "taken.gov", reason=None)
+                    for name in _request.names
+                ],
+            )
+
+        with less_console_noise():
+            patcher = patch("registrar.models.domain.registry.send")
+            mocked_send = patcher.start()
+            mocked_send.side_effect = side_effect
+
+            available = Domain.available_many(["free.gov", "Taken.gov", "other.gov", "taken.gov"])
+            self.assertEqual(mocked_send.call_count, 2)
+            mocked_send.assert_has_calls(
+                [
+                    call(commands.CheckDomain(["free.gov", "taken.gov"]), cleaned=True),
+                    call(commands.CheckDomain(["other.gov"]), cleaned=True),
+                ],
+                any_order=True,
+            )
+            self.assertEqual(available, {"free.gov": True, "taken.gov": False, "other.gov": True})
+            patcher.stop()
+
+    @override_settings(REGISTERED_NAME_INDEX_TTL=300)
+    def test_domain_available_from_registered_name_index(self):
+        """
+        Scenario: Testing the availability of domains which are in our database
+            Should answer for those domains without contacting the registry
+
+            Validate a deleted domain is checked with the registry
+            Validate a domain saved since the index loaded is known to it
+        """
+        registered_names.clear()
+        self.addCleanup(registered_names.clear)
+        Domain.objects.create(name="held.gov", state=Domain.State.READY)
+        Domain.objects.create(name="gone.gov", state=Domain.State.DELETED)
+
+        def side_effect(_request, cleaned):
+            return MagicMock(
+                res_data=[
+                    responses.check.CheckDomainResultData(name=name, avail=True, reason=None) for name in _request.names
+                ],
+            )
+
+        with less_console_noise():
+            patcher = patch("registrar.models.domain.registry.send")
+            mocked_send = patcher.start()
+            mocked_send.side_effect = side_effect
+
+            self.assertFalse(Domain.available("Held.gov"))
+            mocked_send.assert_not_called()
+
+            Domain.objects.create(name="new.gov")
+            available = Domain.available_many(["gone.gov", "held.gov", "new.gov"])
+            mocked_send.assert_called_once_with(commands.CheckDomain(["gone.gov"]), cleaned=True)
+            self.assertEqual(available, {"gone.gov": True, "held.gov": False, "new.gov": False})
+            patcher.stop()
+
+    @override_settings(REGISTERED_NAME_INDEX_TTL=300)
+    def test_registered_name_index_keeps_names_added_while_loading(self):
+        """
+        Scenario: A domain is saved while the registered name index is reloading
+            Should know the new name once the reload is done
+        """
+        index = RegisteredNameIndex()
+        adding = threading.Thread(target=index.add, args=["new.gov"])
+
+        def load_names(*args, **kwargs):
+            # the domain is saved, and its signal fires, while the names are read
+            adding.start()
+            adding.join(timeout=0.2)
+            return ["held.gov"]
+
+        with patch("registrar.models.utility.registered_name_index.apps.get_model") as get_model:
+            get_model.return_value.objects.exclude.return_value.values_list.side_effect = load_names
+            self.assertTrue(index.is_registered("held.gov"))
+        adding.join()
+        self.assertTrue(index.is_registered("new.gov"))
+
+    @override_settings(AVAILABILITY_CACHE_TAKEN_TTL=600, AVAILABILITY_CACHE_AVAILABLE_TTL=30)
+    def test_domain_available_cached(self):
+        """
+        Scenario: Testing the availability of domains checked before
+            Should answer from the availability cache without contacting the registry
+
+            Validate both available and taken domains are cached
+            Validate available_many only checks the domains which aren't cached
+        """
+        availability_cache.clear()
+        self.addCleanup(availability_cache.clear)
+
+        def side_effect(_request, cleaned):
+            return MagicMock(
+                res_data=[
+                    responses.check.CheckDomainResultData(name=name, avail=name != "taken.gov", reason=None)
+                    for name in _request.names
+                ],
+            )
+
+        with less_console_noise():
+            patcher = patch("registrar.models.domain.registry.send")
+            mocked_send = patcher.start()
+            mocked_send.side_effect = side_effect
+
+            self.assertTrue(Domain.available("free.gov"))
+            self.assertFalse(Domain.available("taken.gov"))
+            self.assertTrue(Domain.available("Free.gov"))
+            self.assertFalse(Domain.available("taken.gov"))
+            self.assertEqual(mocked_send.call_count, 2)
+
+            available = Domain.available_many(["free.gov", "taken.gov", "other.gov"])
+            self.assertEqual(mocked_send.call_count, 3)
+            mocked_send.assert_called_with(commands.CheckDomain(["other.gov"]), cleaned=True)
+            self.assertEqual(available, {"free.gov": True, "taken.gov": False, "other.gov": True})
+            patcher.stop()
+
+    @override_settings(REGISTERED_NAME_INDEX_TTL=300)
+    def test_suggest_available(self):
+        """
+        Scenario: Testing suggestions of domains like a taken one
+            Should check the candidates not known to be taken in one command
+
+            Validate domains in our database are not sent to the registry
+            Validate only the available candidates are suggested
+        """
+        registered_names.clear()
+        self.addCleanup(registered_names.clear)
+        Domain.objects.create(name="fortbendcotx.gov", state=Domain.State.READY)
+
+        def side_effect(_request, cleaned):
+            return MagicMock(
+                res_data=[
+                    responses.check.CheckDomainResultData(name=name, avail=name != "ftbendco.gov", reason=None)
+                    for name in _request.names
+                ],
+            )
+
+        with less_console_noise():
+            patcher = patch("registrar.models.domain.registry.send")
+            mocked_send = patcher.start()
+            mocked_send.side_effect = side_effect
+
+            suggestions = Domain.suggest_available("fort-bend-co.gov", state="TX", limit=3)
+            mocked_send.assert_called_once()
+            self.assertNotIn("fortbendcotx.gov", mocked_send.call_args.args[0].names)
+            self.assertEqual(suggestions, ["fortbendco.gov", "ft-bend-co.gov", "fort-bend-cotx.gov"])
+            patcher.stop()
+
+    def test_candidate_names_shorten_whole_words(self):
+        """Words are only shortened where they are the whole name or one of its hyphenated parts"""
+        self.assertEqual(candidate_names("comfort"), [])
+        self.assertEqual(candidate_names("fortune"), [])
+        self.assertEqual(candidate_names("mountainview"), [])
+        self.assertEqual(candidate_names("harris-county"), ["harriscounty", "harris-co", "harrisco"])
+        self.assertEqual(candidate_names("fort-worth"), ["fortworth", "ft-worth", "ftworth"])
+
+    def test_domain_available_many_with_invalid_error(self):
+        """
+        Scenario: Testing the availability of several domains, one of them invalid
+            Should throw InvalidDomainError without contacting the registry
+        """
+        with less_console_noise():
+            patcher = patch("registrar.models.domain.registry.send")
+            mocked_send = patcher.start()
+            with self.assertRaises(errors.InvalidDomainError):
+                Domain.available_many(["available.gov", "invalid-string"])
+            mocked_send.assert_not_called()
+            patcher.stop()
+
 
 class TestRegistrantContacts(MockEppLib):
     """Rule: Registrants may modify their WHOIS data"""
@@ -1520,6 +1896,55 @@ class TestRegistrantNameservers(MockEppLib):
             self.mockedSendFunction.assert_has_calls(expectedCalls, any_order=True)
             self.assertTrue(self.domainWithThreeNS.is_active())
 
+    def test_plan_nameserver_changes_sends_no_updates(self):
+        """
+        Scenario: Registrant previews replacing some nameservers
+            When `domain.plan_nameserver_changes` is called with the new nameservers
+            Then the plan lists the hosts to create and remove
+            And only info commands are sent to the registry
+        """
+        with less_console_noise():
+            plan = self.domainWithThreeNS.plan_nameserver_changes(
+                [(self.nameserver1,), ("ns1.cats-are-superior1.com",), ("ns1.cats-are-superior2.com",)]
+            )
+
+            self.assertEqual(plan.creates, {"ns1.cats-are-superior1.com": None, "ns1.cats-are-superior2.com": None})
+            self.assertEqual(plan.updates, {})
+            self.assertEqual(plan.deletes, ["ns1.my-nameserver-2.com", "ns1.cats-are-superior3.com"])
+            self.assertEqual(plan.expected_count, 3)
+            self.assertIn("create ns1.cats-are-superior1.com", plan.summary())
+            self.assertIn("remove ns1.cats-are-superior3.com", plan.summary())
+            for sent in self.mockedSendFunction.call_args_list:
+                self.assertIsInstance(sent.args[0], (commands.InfoDomain, commands.InfoHost))
+
+    def test_failed_host_create_leaves_domain_unchanged(self):
+        """
+        Scenario: Registrant adds nameservers and the registry fails to create one
+            When `domain.nameservers` is set to an array with two new nameservers
+            Then both `commands.CreateHost` are sent
+            And the error is raised without sending `commands.UpdateDomain`
+        """
+        with less_console_noise():
+            failing_host = "ns1.cats-are-superior2.com"
+
+            def side_effect(_request, cleaned):
+                if isinstance(_request, commands.CreateHost) and _request.name == failing_host:
+                    raise RegistryError(code=ErrorCode.COMMAND_FAILED)
+                return self.mockSend(_request, cleaned)
+
+            self.mockedSendFunction.side_effect = side_effect
+            with self.assertRaises(RegistryError):
+                self.domainWithThreeNS.nameservers = [
+                    (self.nameserver1,),
+                    ("ns1.cats-are-superior1.com",),
+                    (failing_host,),
+                ]
+
+            sent = [type(sent.args[0]) for sent in self.mockedSendFunction.call_args_list]
+            self.assertEqual(sent.count(commands.CreateHost), 2)
+            self.assertNotIn(commands.UpdateDomain, sent)
+            self.assertNotIn(commands.DeleteHost, sent)
+
     def test_user_cannot_add_subordinate_without_ip(self):
         """
         Scenario: Registrant adds a nameserver which is a subdomain of their .gov
@@ -1683,6 +2108,15 @@ class TestRegistrantNameservers(MockEppLib):
             self.assertEqual(nameservers[0][1], ["1.1.1.1"])
             patcher.stop()
 
+    def assertHostsInDb(self, domain, expected):
+        """Helper function to assert that the domain's hosts and host ips in the
+        database are those in expected, a dict of host names to lists of addresses"""
+        actual = {
+            host.name: sorted(host.ip.values_list("address", flat=True)) for host in Host.objects.filter(domain=domain)
+        }
+        self.assertEqual(Host.objects.filter(domain=domain).count(), len(expected))
+        self.assertEqual(actual, expected)
+
     def test_nameservers_stored_on_fetch_cache_a_subdomain_with_ip(self):
         """
         #1: Nameserver is a subdomain, and has an IP address
@@ -1692,21 +2126,25 @@ class TestRegistrantNameservers(MockEppLib):
             # make the domain
             domain, _ = Domain.objects.get_or_create(name="meow.gov", state=Domain.State.READY)
 
-            # mock the get_or_create methods for Host and HostIP
-            with patch.object(Host.objects, "get_or_create") as mock_host_get_or_create, patch.object(
-                HostIP.objects, "get_or_create"
-            ) as mock_host_ip_get_or_create:
-                mock_host_get_or_create.return_value = (Host(domain=domain), True)
-                mock_host_ip_get_or_create.return_value = (HostIP(), True)
+            # force fetch_cache to be called, which will return above documented mocked hosts
+            domain.nameservers
+
+            self.assertHostsInDb(domain, {"fake.meow.gov": ["2.0.0.8"]})
 
-                # force fetch_cache to be called, which will return above documented mocked hosts
-                domain.nameservers
+    def test_nameservers_stored_on_fetch_cache_are_audited(self):
+        """
+        Scenario: A fetch adds a host and its ip to the db
+            Their creation is in the audit log
+        """
+        with less_console_noise():
+            domain, _ = Domain.objects.get_or_create(name="meow.gov", state=Domain.State.READY)
+
+            domain.nameservers
 
-                mock_host_get_or_create.assert_called_once_with(domain=domain, name="fake.meow.gov")
-                # Retrieve the mocked_host from the return value of the mock
-                actual_mocked_host, _ = mock_host_get_or_create.return_value
-                mock_host_ip_get_or_create.assert_called_with(address="2.0.0.8", host=actual_mocked_host)
-                self.assertEqual(mock_host_ip_get_or_create.call_count, 1)
+            host = Host.objects.get(domain=domain, name="fake.meow.gov")
+            host_ip = HostIP.objects.get(host=host)
+            self.assertTrue(LogEntry.objects.get_for_object(host).filter(action=LogEntry.Action.CREATE).exists())
+            self.assertTrue(LogEntry.objects.get_for_object(host_ip).filter(action=LogEntry.Action.CREATE).exists())
 
     def test_nameservers_stored_on_fetch_cache_a_subdomain_without_ip(self):
         """
@@ -1717,24 +2155,15 @@ class TestRegistrantNameservers(MockEppLib):
             # make the domain
             domain, _ = Domain.objects.get_or_create(name="subdomainwoip.gov", state=Domain.State.READY)
 
-            # mock the get_or_create methods for Host and HostIP
-            with patch.object(Host.objects, "get_or_create") as mock_host_get_or_create, patch.object(
-                HostIP.objects, "get_or_create"
-            ) as mock_host_ip_get_or_create:
-                mock_host_get_or_create.return_value = (Host(domain=domain), True)
-                mock_host_ip_get_or_create.return_value = (HostIP(), True)
-
-                # force fetch_cache to be called, which will return above documented mocked hosts
-                domain.nameservers
+            # force fetch_cache to be called, which will return above documented mocked hosts
+            domain.nameservers
 
-                mock_host_get_or_create.assert_called_once_with(domain=domain, name="fake.subdomainwoip.gov")
-                mock_host_ip_get_or_create.assert_not_called()
-                self.assertEqual(mock_host_ip_get_or_create.call_count, 0)
+            self.assertHostsInDb(domain, {"fake.subdomainwoip.gov": []})
 
     def test_nameservers_stored_on_fetch_cache_not_subdomain_with_ip(self):
         """
         Scenario: Nameservers are stored in db when they are retrieved from fetch_cache.
-            Verify the success of this by asserting get_or_create calls to db.
+            Verify the success of this by checking the hosts in the db.
             The mocked data for the EPP calls returns a host name
             of 'fake.host.com' from InfoDomain and an array of 2 IPs: 1.2.3.4 and 2.3.4.5
             from InfoHost
@@ -1745,18 +2174,10 @@ class TestRegistrantNameservers(MockEppLib):
         with less_console_noise():
             domain, _ = Domain.objects.get_or_create(name="fake.gov", state=Domain.State.READY)
 
-            with patch.object(Host.objects, "get_or_create") as mock_host_get_or_create, patch.object(
-                HostIP.objects, "get_or_create"
-            ) as mock_host_ip_get_or_create:
-                mock_host_get_or_create.return_value = (Host(domain=domain), True)
-                mock_host_ip_get_or_create.return_value = (HostIP(), True)
-
-                # force fetch_cache to be called, which will return above documented mocked hosts
-                domain.nameservers
+            # force fetch_cache to be called, which will return above documented mocked hosts
+            domain.nameservers
 
-                mock_host_get_or_create.assert_called_once_with(domain=domain, name="fake.host.com")
-                mock_host_ip_get_or_create.assert_not_called()
-                self.assertEqual(mock_host_ip_get_or_create.call_count, 0)
+            self.assertHostsInDb(domain, {"fake.host.com": []})
 
     def test_nameservers_stored_on_fetch_cache_not_subdomain_without_ip(self):
         """
@@ -1766,17 +2187,46 @@ class TestRegistrantNameservers(MockEppLib):
         with less_console_noise():
             domain, _ = Domain.objects.get_or_create(name="fakemeow.gov", state=Domain.State.READY)
 
-            with patch.object(Host.objects, "get_or_create") as mock_host_get_or_create, patch.object(
-                HostIP.objects, "get_or_create"
-            ) as mock_host_ip_get_or_create:
-                mock_host_get_or_create.return_value = (Host(domain=domain), True)
-                mock_host_ip_get_or_create.return_value = (HostIP(), True)
-
-                # force fetch_cache to be called, which will return above documented mocked hosts
-                domain.nameservers
-                mock_host_get_or_create.assert_called_once_with(domain=domain, name="fake.meow.com")
-                mock_host_ip_get_or_create.assert_not_called()
-                self.assertEqual(mock_host_ip_get_or_create.call_count, 0)
+            # force fetch_cache to be called, which will return above documented mocked hosts
+            domain.nameservers
+
+            self.assertHostsInDb(domain, {"fake.meow.com": []})
+
+    def test_update_hosts_and_ips_in_db_reconciles_existing_rows(self):
+        """
+        Scenario: Hosts and host ips are already in the db when they are retrieved again
+            Stale and duplicate rows are deleted, missing ones are created and the rest
+            are kept. Reconciling again without changes only reads from the db.
+        """
+        with less_console_noise():
+            domain, _ = Domain.objects.get_or_create(name="meow.gov", state=Domain.State.READY)
+            kept = Host.objects.create(domain=domain, name="ns1.meow.gov")
+            kept_ip = HostIP.objects.create(host=kept, address="1.1.1.1")
+            HostIP.objects.create(host=kept, address="1.1.1.1")
+            HostIP.objects.create(host=kept, address="2.2.2.2")
+            HostIP.objects.create(host=Host.objects.create(domain=domain, name="ns1.meow.gov"), address="9.9.9.9")
+            HostIP.objects.create(host=Host.objects.create(domain=domain, name="old.meow.gov"), address="3.3.3.3")
+
+            def cleaned():
+                return {
+                    "hosts": [
+                        {"name": "ns1.meow.gov", "addrs": ["1.1.1.1", "4.4.4.4"]},
+                        {"name": "ns2.meow.gov", "addrs": ["5.5.5.5"]},
+                        {"name": "ns1.example.com", "addrs": ["6.6.6.6"]},
+                    ]
+                }
+
+            domain._update_hosts_and_ips_in_db(cleaned())
+
+            expected = {"ns1.meow.gov": ["1.1.1.1", "4.4.4.4"], "ns2.meow.gov": ["5.5.5.5"], "ns1.example.com": []}
+            self.assertHostsInDb(domain, expected)
+            self.assertTrue(Host.objects.filter(id=kept.id).exists())
+            self.assertTrue(HostIP.objects.filter(id=kept_ip.id).exists())
+
+            # one query for the hosts and one for their ips
+            with self.assertNumQueries(2):
+                domain._update_hosts_and_ips_in_db(cleaned())
+            self.assertHostsInDb(domain, expected)
 
     @skip("not implemented yet")
     def test_update_is_unsuccessful(self):
@@ -740,6 +740,22 @@ class TestDomainNameservers(TestDomainOverview, MockEppLib):
         page = self.client.get(reverse("domain-dns-nameservers", kwargs={"pk": self.domain.id}))
         self.assertContains(page, "DNS name servers")
 
+    def test_domain_nameservers_session_keeps_compact_snapshot(self):
+        """The session keeps a compact snapshot of the domain rather than the domain,
+        and the next page load uses its nameservers without asking the registry."""
+        Domain.objects.filter(id=self.domain.id).update(state=Domain.State.DNS_NEEDED)
+        self.client.get(reverse("domain-dns-nameservers", kwargs={"pk": self.domain.id}))
+
+        snapshot = self.client.session["domain:" + str(self.domain.id)]
+        self.assertEqual(snapshot["id"], self.domain.id)
+        self.assertIn("hosts", snapshot["cache"])
+        self.assertNotIn("_contacts", snapshot["cache"])
+
+        self.mockedSendFunction.reset_mock()
+        page = self.client.get(reverse("domain-dns-nameservers", kwargs={"pk": self.domain.id}))
+        self.assertContains(page, "DNS name servers")
+        self.mockedSendFunction.assert_not_called()
+
     def test_domain_nameservers_form_submit_one_nameserver(self):
         """Nameserver form submitted with one nameserver throws error.
 
@@ -7,6 +7,8 @@ class ValidationReturnType(Enum):
     """Determines the return value of the validate_and_handle_errors class"""
 
     JSON_RESPONSE = "JSON_RESPONSE"
+    # the content of the JSON response, as a dict
+    JSON_DICT = "JSON_DICT"
     FORM_VALIDATION_ERROR = "FORM_VALIDATION_ERROR"
 
 
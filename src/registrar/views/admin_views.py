@@ -1,6 +1,6 @@
 """Admin-related views."""
 
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.views import View
 from django.shortcuts import render
 from django.contrib import admin
@@ -10,6 +10,7 @@ import datetime
 from django.utils import timezone
 
 from registrar.utility import csv_export
+from epplibwrapper import CLIENT as registry
 
 import logging
 
@@ -220,3 +221,10 @@ class ExportDataUnmanagedDomains(View):
         csv_export.export_data_unmanaged_domains_to_csv(response, start_date, end_date)
 
         return response
+
+
+class RegistryMetricsView(View):
+    """Timings and outcomes of the registry commands sent by the worker which answers the request."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(registry.metrics_snapshot())
@@ -78,29 +78,37 @@ class DomainBaseView(DomainPermissionView):
 
     def _get_domain(self, request):
         """
-        get domain from session cache or from db and set
-        to self.object
+        get domain from db and set to self.object, with the
+        registry info kept in the session snapshot of it
         set session to self for downstream functions to
         update session cache
         """
         self.session = request.session
+        self.object = self.get_object()
+        self.object.restore_session_snapshot(self.session.get(self._domain_session_key()))
+        self._update_session_with_domain()
+
+    def _domain_session_key(self):
         # domain:private_key is the session key to use for
         # caching the domain in the session
-        domain_pk = "domain:" + str(self.kwargs.get("pk"))
-        cached_domain = self.session.get(domain_pk)
-
-        if cached_domain:
-            self.object = cached_domain
-        else:
-            self.object = self.get_object()
-        self._update_session_with_domain()
+        return "domain:" + str(self.kwargs.get("pk"))
 
     def _update_session_with_domain(self):
         """
-        update domain in the session cache
+        update domain in the session cache, keeping a compact
+        snapshot of it rather than the domain itself
         """
-        domain_pk = "domain:" + str(self.kwargs.get("pk"))
-        self.session[domain_pk] = self.object
+        key = self._domain_session_key()
+        snapshot = self.object.session_snapshot()
+        # setting the key marks the session as modified, so only do so on a change
+        if self.session.get(key) != snapshot:
+            self.session[key] = snapshot
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        # keep what the page fetched from the registry while rendering for the next request
+        response.add_post_render_callback(lambda _: self._update_session_with_domain())
+        return response
 
 
 class DomainFormBaseView(DomainBaseView, FormMixin):
@@ -339,8 +347,6 @@ class DomainNameserversView(DomainFormBaseView):
     def form_valid(self, formset):
         """The formset is valid, perform something with it."""
 
-        self.request.session["nameservers_form_domain"] = self.object
-
         # Set the nameservers from the formset
         nameservers = []
         for form in formset: